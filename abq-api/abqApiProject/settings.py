@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 import os
 import certifi
+from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
 from urllib.parse import urlparse, parse_qsl
 from django.core.exceptions import ImproperlyConfigured
@@ -192,7 +193,7 @@ else:
 # EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # For development, prints emails to console
 
 # In production, configure SMTP or other email services accordingly
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
 EMAIL_HOST = os.getenv("EMAIL_HOST")
 EMAIL_PORT = int(os.getenv("EMAIL_PORT", "587"))
 EMAIL_USE_SSL = os.getenv("EMAIL_USE_SSL", "false").lower() == "true"
@@ -210,6 +211,31 @@ if EMAIL_USE_SSL:
 EMAIL_SSL_CERTFILE = os.getenv("EMAIL_SSL_CERTFILE") or None
 EMAIL_SSL_KEYFILE = os.getenv("EMAIL_SSL_KEYFILE") or None
 
+# Outbox: the forms only queue e-mails and answer at once. They are sent by
+# `manage.py send_outbox_emails --loop` where a worker runs, or by the Vercel cron in
+# vercel.json (every 5 minutes; Hobby plans only run crons daily, so there point an external
+# scheduler at it), which calls /landing-api/outbox/drain/ with
+# "Authorization: Bearer $CRON_SECRET"; the endpoint is disabled while no token is set.
+# EMAIL_OUTBOX_SEND_ON_COMMIT also tries each message right after the commit, within the
+# request, giving up after EMAIL_OUTBOX_INLINE_TIMEOUT seconds instead of EMAIL_TIMEOUT.
+EMAIL_OUTBOX_SEND_ON_COMMIT = os.getenv("EMAIL_OUTBOX_SEND_ON_COMMIT", "false").lower() == "true"
+EMAIL_OUTBOX_INLINE_TIMEOUT = int(os.getenv("EMAIL_OUTBOX_INLINE_TIMEOUT", "5"))
+EMAIL_OUTBOX_DRAIN_TOKEN = os.getenv("EMAIL_OUTBOX_DRAIN_TOKEN") or os.getenv("CRON_SECRET", "")
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "50"))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "8"))
+# Retry after base * 2^(attempt-1) seconds, capped at max
+EMAIL_OUTBOX_RETRY_BASE = int(os.getenv("EMAIL_OUTBOX_RETRY_BASE", "60"))
+EMAIL_OUTBOX_RETRY_MAX = int(os.getenv("EMAIL_OUTBOX_RETRY_MAX", "3600"))
+# Seconds a claimed message stays reserved to one worker; must exceed a batch's send time
+EMAIL_OUTBOX_LEASE = int(os.getenv("EMAIL_OUTBOX_LEASE", "300"))
+# Consecutive connection failures that suspend sending, and for how many seconds (shared by
+# every instance through the CircuitBreakerState table)
+EMAIL_OUTBOX_BREAKER_THRESHOLD = int(os.getenv("EMAIL_OUTBOX_BREAKER_THRESHOLD", "3"))
+EMAIL_OUTBOX_BREAKER_COOLDOWN = int(os.getenv("EMAIL_OUTBOX_BREAKER_COOLDOWN", "300"))
+
+# Rows per server-side cursor fetch (and per streamed block) in the admin CSV/JSONL exports
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "2000"))
+
 # Garante cadeia de confiança usando o bundle do certifi (não configura client cert).
 os.environ.setdefault("SSL_CERT_FILE", certifi.where())
 os.environ.setdefault("REQUESTS_CA_BUNDLE", certifi.where())
@@ -221,7 +247,106 @@ AWS_STORAGE_BUCKET_NAME = os.getenv("AWS_STORAGE_BUCKET_NAME", "albuquerque-enge
 
 AWS_S3_FILE_OVERWRITE = True
 AWS_DEFAULT_ACL = None
+# Set to false when the bucket is public: media URLs are then built without signing
+AWS_QUERYSTRING_AUTH = os.getenv("AWS_QUERYSTRING_AUTH", "true").lower() == "true"
+AWS_QUERYSTRING_EXPIRE = int(os.getenv("AWS_QUERYSTRING_EXPIRE", str(6 * 60 * 60)))
+AWS_S3_CUSTOM_DOMAIN = os.getenv("AWS_S3_CUSTOM_DOMAIN") or None
+# Points the S3 client at a local stand-in (MinIO, moto server) for development and tests
+AWS_S3_ENDPOINT_URL = os.getenv("AWS_S3_ENDPOINT_URL") or None
+# A cached signed URL is reused only while it has at least this many seconds left,
+# which must cover every downstream cache (snapshots, response cache, CDN, validators)
+MEDIA_URL_MIN_LIFETIME = int(os.getenv("MEDIA_URL_MIN_LIFETIME", str(3 * 60 * 60)))
+# Name image uploads by content hash ("<folder>/<sha256><ext>"): identical uploads reuse
+# one S3 object, and new objects are written with an immutable Cache-Control.
+CONTENT_ADDRESSED_UPLOADS = os.getenv("CONTENT_ADDRESSED_UPLOADS", "false").lower() == "true"
+# Admin uploads of VentureImages, SiteImages and Ebook go from the browser straight to S3
+# (presigned POST). Requires a bucket CORS rule allowing POST from the admin origin.
+DIRECT_UPLOADS = os.getenv("DIRECT_UPLOADS", "false").lower() == "true"
+DIRECT_UPLOAD_MAX_SIZE = int(os.getenv("DIRECT_UPLOAD_MAX_SIZE", str(200 * 1024 * 1024)))
+DIRECT_UPLOAD_EXPIRE = int(os.getenv("DIRECT_UPLOAD_EXPIRE", "3600"))
+# Concurrent S3 uploads in the venture gallery bulk upload
+BULK_UPLOAD_WORKERS = int(os.getenv("BULK_UPLOAD_WORKERS", "8"))
 DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
+# Connection pooling/timeouts for the shared S3 client (landingPgApp.storage)
+AWS_S3_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_S3_MAX_POOL_CONNECTIONS", "10"))
+AWS_S3_CONNECT_TIMEOUT = int(os.getenv("AWS_S3_CONNECT_TIMEOUT", "5"))
+AWS_S3_READ_TIMEOUT = int(os.getenv("AWS_S3_READ_TIMEOUT", "30"))
+AWS_S3_MAX_ATTEMPTS = int(os.getenv("AWS_S3_MAX_ATTEMPTS", "3"))
+
+# Cache framework. LocMem is per process: model version bumps only reach the
+# process that saved, so point CACHE_BACKEND/CACHE_LOCATION at a shared cache in production.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "landing-api"),
+    }
+}
+
+# Landing API caching
+# Seconds the in-process SiteImages resolver keeps its per-page lookup (save/delete also invalidate it)
+SITE_IMAGES_CACHE_TTL = int(os.getenv("SITE_IMAGES_CACHE_TTL", "300"))
+# Page snapshots embed signed S3 URLs; rebuild them well within MEDIA_URL_MIN_LIFETIME. 0 disables.
+PAGE_SNAPSHOT_MAX_AGE = int(os.getenv("PAGE_SNAPSHOT_MAX_AGE", "1800"))
+# Cache holding the responses and the per-model versions that invalidate them. It must be
+# shared by every instance: with LocMem a save only bumps the versions of the process that
+# handled it, so the others serve stale pages. `manage.py check` and the logs warn when
+# DEBUG is off.
+LANDING_API_CACHE_ALIAS = os.getenv("LANDING_API_CACHE_ALIAS", "default")
+# Response cache TTL
+LANDING_API_CACHE_TIMEOUT = int(os.getenv("LANDING_API_CACHE_TIMEOUT", "600"))
+# Extra seconds an expired entry may be served while a single worker rebuilds it,
+# per endpoint (overrides the view defaults).
+LANDING_API_STALE_WHILE_REVALIDATE = {}
+# ETag/Last-Modified roll over every N seconds so a 304 never revives expired signed URLs. 0 disables.
+LANDING_API_VALIDATOR_BUCKET = int(os.getenv("LANDING_API_VALIDATOR_BUCKET", "900"))
+# Serve the GET endpoints with native async views (landingPgApp.async_views). Turn on only
+# under ASGI (abqApiProject.asgi:app); under WSGI every async view needs its own event loop.
+LANDING_API_ASYNC_VIEWS = os.getenv("LANDING_API_ASYNC_VIEWS", "false").lower() == "true"
+# Repeated form POSTs replay the first response instead of sending again: for this many
+# seconds per Idempotency-Key header, or per identical (normalized) form fields without one.
+# Kept in the IdempotencyRecord table, which every instance shares (a LocMem cache would not);
+# expired rows are swept on each new submission.
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", str(24 * 60 * 60)))
+IDEMPOTENCY_CONTENT_TTL = int(os.getenv("IDEMPOTENCY_CONTENT_TTL", "600"))
+# Token buckets for the public form POSTs, per endpoint and scope ("ip", "global"):
+# "<requests>/<period>" such as "5/10m" or "120/h", where requests is also the burst.
+# Overrides the view defaults; None disables a scope.
+LANDING_API_THROTTLES = {}
+# Cache holding the buckets. It must be shared by every instance (Redis, Memcached or
+# DatabaseCache): with LocMem each process keeps its own buckets, so the global limit no
+# longer protects the SMTP quota. `manage.py check` and the logs warn when DEBUG is off.
+LANDING_API_THROTTLE_CACHE_ALIAS = os.getenv("LANDING_API_THROTTLE_CACHE_ALIAS", "default")
+# META key holding the client IP set by the proxy (its rightmost entry is used); empty uses REMOTE_ADDR
+LANDING_API_CLIENT_IP_HEADER = os.getenv("LANDING_API_CLIENT_IP_HEADER", "HTTP_X_FORWARDED_FOR")
+# Edge caching: per-endpoint overrides of max_age / s_maxage / stale_while_revalidate
+LANDING_API_CDN_CACHE = {}
+
+# Purges by surrogate key after admin saves. Backends live in landingPgApp.cdn:
+# NullPurgeBackend (default), LocMemPurgeBackend (records purges) and HttpPurgeBackend.
+CDN_PURGE_BACKEND = os.getenv("CDN_PURGE_BACKEND", "landingPgApp.cdn.NullPurgeBackend")
+CDN_PURGE_URL = os.getenv("CDN_PURGE_URL", "")
+CDN_PURGE_TOKEN = os.getenv("CDN_PURGE_TOKEN", "")
+CDN_PURGE_BATCH_SIZE = int(os.getenv("CDN_PURGE_BATCH_SIZE", "100"))
+
+# Responsive image variants, stored next to the original as "<name>__w<width>.<format>".
+# IMAGE_VARIANTS_MODE: "queue" (saves record an ImageVariantJob, rendered by the
+# /landing-api/image-variants/drain/ cron or `generate_image_variants --pending`; a 12 MP
+# photo takes seconds to encode, too long for the admin request), "background" (thread
+# after commit; only on long-lived servers, Vercel freezes the function once it has
+# responded) or "off" (only the generate_image_variants command).
+IMAGE_VARIANTS_MODE = os.getenv("IMAGE_VARIANTS_MODE", "queue")
+# Bearer token of the drain endpoint (Vercel sends CRON_SECRET); disabled while empty
+IMAGE_VARIANTS_DRAIN_TOKEN = os.getenv("IMAGE_VARIANTS_DRAIN_TOKEN") or os.getenv("CRON_SECRET", "")
+# Seconds one drain call keeps starting new images; keep well under the function timeout
+IMAGE_VARIANTS_DRAIN_SECONDS = int(os.getenv("IMAGE_VARIANTS_DRAIN_SECONDS", "20"))
+# Seconds a claimed job stays reserved to one drain, and attempts before it is given up
+IMAGE_VARIANTS_LEASE = int(os.getenv("IMAGE_VARIANTS_LEASE", "300"))
+IMAGE_VARIANTS_MAX_ATTEMPTS = int(os.getenv("IMAGE_VARIANTS_MAX_ATTEMPTS", "5"))
+IMAGE_VARIANT_WIDTHS = (320, 640, 1024, 1600)
+IMAGE_VARIANT_FORMATS = ("webp", "avif")
+IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", "75"))
+# Resizing worker processes (None: one per CPU)
+IMAGE_VARIANT_PROCESSES = int(os.getenv("IMAGE_VARIANT_PROCESSES", "0")) or None
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -241,6 +366,9 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
+# Lets browser clients send Idempotency-Key and read Idempotent-Replayed / Retry-After
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
+CORS_EXPOSE_HEADERS = ["Idempotent-Replayed", "Retry-After"]
 
 CSRF_TRUSTED_ORIGINS = [
     "http://localhost:3000",
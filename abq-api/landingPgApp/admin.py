@@ -1,12 +1,31 @@
+import json
+
 from django import forms
 from django.contrib import admin
+from django.contrib import messages
+from django.core.exceptions import ValidationError
+from django.http import HttpResponseRedirect, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils import timezone
 from django.utils.html import format_html
 
+from . import direct_uploads, outbox
+from .bulk_upload import upload_gallery
+from .invalidation import content_changed
+from .direct_uploads import DirectUploadAdminMixin
+from .exports import csv_response, jsonl_response
+from .media_urls import file_url
 from .models import (
 	BlogArticle,
 	BlogTag,
+	ContactMessage,
 	Ebook,
+	ImageVariantJob,
 	InstructionalVideo,
+	OutboxEmail,
+	ServiceSolicitation,
 	ServiceSolicitationTerm,
 	SiteImages,
 	Venture,
@@ -26,7 +45,8 @@ class CustomAdminSite(admin.AdminSite):
 		'Empreendimentos': ['Venture', 'VentureStatus', 'VentureCategory', 'VentureImages'],
 		'Blog': ['BlogArticle', 'BlogTag'],
 		'Materiais': ['Ebook', 'InstructionalVideo'],
-		'Site': ['SiteImages', 'ServiceSolicitationTerm'],
+		'Site': ['SiteImages', 'ServiceSolicitationTerm', 'ImageVariantJob'],
+		'Contato': ['ServiceSolicitation', 'ContactMessage', 'OutboxEmail'],
 	}
 
 	def get_app_list(self, request, app_label=None):
@@ -55,6 +75,31 @@ class CustomAdminSite(admin.AdminSite):
 
 		return grouped
 
+	def get_urls(self):
+		return [
+			path('direct-upload/<str:target>/', self.admin_view(self.direct_upload_view), name='direct_upload'),
+		] + super().get_urls()
+
+	def direct_upload_view(self, request, target):
+		# Presigned S3 POST for the admin file widgets (see direct_uploads)
+		if request.method != 'POST' or target not in direct_uploads.TARGETS or not direct_uploads.is_enabled():
+			return JsonResponse({'error': 'Not found'}, status=404)
+
+		opts = direct_uploads.TARGETS[target][0]._meta
+		if not (
+			request.user.has_perm(f'{opts.app_label}.add_{opts.model_name}')
+			or request.user.has_perm(f'{opts.app_label}.change_{opts.model_name}')
+		):
+			return JsonResponse({'error': 'Forbidden'}, status=403)
+
+		try:
+			data = json.loads(request.body)
+			return JsonResponse(direct_uploads.presigned_post(target, data['filename'], data['content_type']))
+		except (ValueError, KeyError, TypeError):
+			return JsonResponse({'error': 'Invalid request'}, status=400)
+		except ValidationError as error:
+			return JsonResponse({'error': error.messages[0]}, status=400)
+
 
 admin_site = CustomAdminSite(name='admin')
 admin_site.site_header = "Painel do Site - Albuquerque Engenharia"
@@ -84,7 +129,65 @@ class StringListField(forms.MultiValueField):
 		return [item for item in (data_list or []) if item]
 
 
-class VentureImagesInline(admin.TabularInline):
+class MultipleFileInput(forms.ClearableFileInput):
+	allow_multiple_selected = True
+
+
+class MultipleImageField(forms.ImageField):
+	def __init__(self, *args, **kwargs):
+		kwargs.setdefault('widget', MultipleFileInput())
+		super().__init__(*args, **kwargs)
+
+	def clean(self, data, initial=None):
+		if isinstance(data, (list, tuple)):
+			return [super(MultipleImageField, self).clean(item, initial) for item in data]
+		return [super().clean(data, initial)]
+
+
+class VentureBulkUploadForm(forms.Form):
+	files = MultipleImageField(label='Imagens')
+	area = forms.ModelChoiceField(queryset=VentureAreas.objects.none(), required=False, label='Área')
+	floorPlan = forms.ModelChoiceField(queryset=VentureFloorPlans.objects.none(), required=False, label='Planta')
+	is_high_light = forms.BooleanField(required=False, label='Imagens destacadas')
+
+	def __init__(self, *args, venture, **kwargs):
+		super().__init__(*args, **kwargs)
+		if direct_uploads.is_enabled():
+			# Straight to S3 from the browser: the POST only carries the keys
+			self.fields['files'] = direct_uploads.MultipleDirectUploadField(target='ventureimages', label='Imagens')
+		self.fields['area'].queryset = venture.areas.all()
+		self.fields['floorPlan'].queryset = venture.floor_plans.all()
+
+
+class ExportAdminMixin:
+	# export_columns = [(field lookup, header)]; the actions stream the selection
+	# (or the whole filtered list with "select all") without loading it in memory
+	export_columns = ()
+	# Lookups holding phone numbers: "+55 ..." is exported as is, not escaped as a formula
+	export_phone_fields = ()
+	actions = ('export_csv', 'export_jsonl')
+
+	def _export_filename(self):
+		return f"{self.model._meta.model_name}s"
+
+	@admin.action(description='Exportar selecionados (CSV)')
+	def export_csv(self, request, queryset):
+		return csv_response(
+			queryset, self.export_columns, self._export_filename(), phone_fields=self.export_phone_fields
+		)
+
+	@admin.action(description='Exportar selecionados (JSONL)')
+	def export_jsonl(self, request, queryset):
+		return jsonl_response(queryset, self.export_columns, self._export_filename())
+
+
+@admin.action(description='Reenviar e-mail de notificação')
+def resend_notification(modeladmin, request, queryset):
+	updated = outbox.requeue(OutboxEmail.objects.filter(pk__in=queryset.values('outbox_email')))
+	modeladmin.message_user(request, f'{updated} e-mail(s) colocado(s) de volta na fila.', messages.SUCCESS)
+
+
+class VentureImagesInline(DirectUploadAdminMixin, admin.TabularInline):
 	model = VentureImages
 	extra = 0
 	ordering = ('order',)
@@ -112,7 +215,7 @@ class VentureImagesInline(admin.TabularInline):
 
 	def preview(self, obj):
 		if getattr(obj, 'image', None):
-			return format_html('<img src="{}" style="max-height: 200px; max-width: 200px;" />', obj.image.url)
+			return format_html('<img src="{}" style="max-height: 200px; max-width: 200px;" />', file_url(obj.image))
 		return "(Sem imagem)"
 	preview.short_description = "Pré-visualização"
 
@@ -188,6 +291,64 @@ class VentureAdmin(admin.ModelAdmin):
 		('Controle', {'fields': ('created_at', 'updated_at'), 'classes': ('collapse',)}),
 	)
 
+	def get_urls(self):
+		return [
+			path(
+				'<path:object_id>/bulk-upload/',
+				self.admin_site.admin_view(self.bulk_upload_view),
+				name='landingPgApp_venture_bulk_upload',
+			),
+			path(
+				'<path:object_id>/reorder-images/',
+				self.admin_site.admin_view(self.reorder_images_view),
+				name='landingPgApp_venture_reorder_images',
+			),
+		] + super().get_urls()
+
+	def bulk_upload_view(self, request, object_id):
+		venture = get_object_or_404(Venture, pk=object_id)
+		if not self.has_change_permission(request, venture):
+			return HttpResponseRedirect(reverse('admin:index'))
+
+		form = VentureBulkUploadForm(request.POST or None, request.FILES or None, venture=venture)
+		if request.method == 'POST' and form.is_valid():
+			created = upload_gallery(
+				venture,
+				form.cleaned_data['files'],
+				area=form.cleaned_data['area'],
+				floor_plan=form.cleaned_data['floorPlan'],
+				is_high_light=form.cleaned_data['is_high_light'],
+			)
+			self.message_user(request, f"{len(created)} imagem(ns) adicionada(s) à galeria.", messages.SUCCESS)
+			return HttpResponseRedirect(reverse('admin:landingPgApp_venture_change', args=[venture.pk]))
+
+		return TemplateResponse(request, 'admin/landingpgapp/venture/bulk_upload.html', {
+			**self.admin_site.each_context(request),
+			'opts': self.model._meta,
+			'original': venture,
+			'title': f'Enviar imagens em lote: {venture}',
+			'form': form,
+		})
+
+
+	def reorder_images_view(self, request, object_id):
+		# POST {"ids": [...]} with every image id of the venture, in the new order
+		venture = get_object_or_404(Venture, pk=object_id)
+		if request.method != 'POST':
+			return JsonResponse({'error': 'Method not allowed'}, status=405)
+		if not self.has_change_permission(request, venture):
+			return JsonResponse({'error': 'Forbidden'}, status=403)
+
+		try:
+			image_ids = [int(image_id) for image_id in json.loads(request.body)['ids']]
+			changed = VentureImages.apply_order(venture.pk, image_ids)
+		except (ValueError, KeyError, TypeError) as error:
+			return JsonResponse({'error': str(error) or 'Invalid request'}, status=400)
+
+		if changed:
+			content_changed(VentureImages, changed[0])
+		return JsonResponse({'updated': len(changed)})
+
 
 @admin.register(VentureStatus, site=admin_site)
 class VentureStatusAdmin(admin.ModelAdmin):
@@ -203,7 +364,7 @@ class VentureCategoryAdmin(admin.ModelAdmin):
   readonly_fields = ('created_at', 'updated_at')
 
 @admin.register(VentureImages, site=admin_site)
-class VentureImagesAdmin(admin.ModelAdmin):
+class VentureImagesAdmin(DirectUploadAdminMixin, admin.ModelAdmin):
 	list_display = ('id', 'venture', 'caption', 'is_cover', 'is_high_light', 'order', 'preview')
 	list_filter = ('is_cover', 'is_high_light', 'venture', 'area', 'floorPlan')
 	search_fields = ('caption', 'venture__name')
@@ -213,12 +374,12 @@ class VentureImagesAdmin(admin.ModelAdmin):
 
 	def preview(self, obj):
 		if getattr(obj, 'image', None):
-			return format_html('<img src="{}" style="max-height: 200px; max-width: 200px;" />', obj.image.url)
+			return format_html('<img src="{}" style="max-height: 200px; max-width: 200px;" />', file_url(obj.image))
 		return "(Sem imagem)"
 	preview.short_description = "Pré-visualização"
 
 @admin.register(SiteImages, site=admin_site)
-class SiteImagesAdmin(admin.ModelAdmin):
+class SiteImagesAdmin(DirectUploadAdminMixin, admin.ModelAdmin):
 	list_display = ('id', 'page', 'is_active', 'is_desktop', 'is_mobile', 'description', 'preview', 'created_at')
 	list_filter = ('page', 'is_active', 'is_desktop', 'is_mobile', 'created_at')
 	list_editable = ('is_active', 'is_desktop', 'is_mobile')
@@ -228,7 +389,7 @@ class SiteImagesAdmin(admin.ModelAdmin):
 
 	def preview(self, obj):
 		if getattr(obj, 'image', None):
-			return format_html('<img src="{}" style="max-height: 200px; max-width: 200px;" />', obj.image.url)
+			return format_html('<img src="{}" style="max-height: 200px; max-width: 200px;" />', file_url(obj.image))
 		return "(Sem imagem)"
 	preview.short_description = "Pré-visualização"
 
@@ -259,7 +420,7 @@ class BlogArticleAdmin(admin.ModelAdmin):
 
 	def preview(self, obj):
 		if getattr(obj, 'cover_image', None):
-			return format_html('<img src="{}" style="max-height: 200px; max-width: 200px;" />', obj.cover_image.url)
+			return format_html('<img src="{}" style="max-height: 200px; max-width: 200px;" />', file_url(obj.cover_image))
 		return "(Sem imagem)"
 	preview.short_description = "Pré-visualização"
 
@@ -271,7 +432,7 @@ class BlogTagAdmin(admin.ModelAdmin):
 	readonly_fields = ('created_at', 'updated_at')
 
 @admin.register(Ebook, site=admin_site)
-class EbookAdmin(admin.ModelAdmin):
+class EbookAdmin(DirectUploadAdminMixin, admin.ModelAdmin):
 	list_display = ('id', 'title', 'is_active', 'created_at', 'updated_at')
 	list_editable = ('is_active',)
 	list_filter = ('is_active',)
@@ -293,3 +454,87 @@ class ServiceSolicitationTermAdmin(admin.ModelAdmin):
 	list_filter = ('is_active',)
 	readonly_fields = ('created_at', 'updated_at')
 
+@admin.register(ServiceSolicitation, site=admin_site)
+class ServiceSolicitationAdmin(ExportAdminMixin, admin.ModelAdmin):
+	list_display = ('id', 'created_at', 'venture_name', 'venture', 'unit', 'name', 'phone', 'email', 'accepted_terms')
+	list_filter = ('venture', 'accepted_terms', 'created_at')
+	list_select_related = ('venture',)
+	search_fields = ('name', 'document', 'email', 'phone', 'venture_name', 'unit')
+	date_hierarchy = 'created_at'
+	readonly_fields = (
+		'venture', 'venture_name', 'unit', 'name', 'document', 'phone', 'email', 'description',
+		'accepted_terms', 'outbox_email', 'created_at', 'updated_at',
+	)
+	actions = ExportAdminMixin.actions + (resend_notification,)
+	export_columns = (
+		('id', 'ID'),
+		('created_at', 'Data'),
+		('venture_name', 'Empreendimento Informado'),
+		('venture__name', 'Empreendimento'),
+		('unit', 'Unidade'),
+		('name', 'Nome'),
+		('document', 'Documento'),
+		('phone', 'Telefone'),
+		('email', 'E-mail'),
+		('description', 'Descrição'),
+		('accepted_terms', 'Aceitou os Termos'),
+	)
+	export_phone_fields = ('phone',)
+
+	def has_add_permission(self, request):
+		return False
+
+@admin.register(ContactMessage, site=admin_site)
+class ContactMessageAdmin(ExportAdminMixin, admin.ModelAdmin):
+	list_display = ('id', 'created_at', 'name', 'phone', 'message')
+	list_filter = ('created_at',)
+	search_fields = ('name', 'phone', 'message')
+	date_hierarchy = 'created_at'
+	readonly_fields = ('name', 'phone', 'message', 'outbox_email', 'created_at', 'updated_at')
+	actions = ExportAdminMixin.actions + (resend_notification,)
+	export_columns = (
+		('id', 'ID'),
+		('created_at', 'Data'),
+		('name', 'Nome'),
+		('phone', 'Telefone'),
+		('message', 'Mensagem'),
+	)
+	export_phone_fields = ('phone',)
+
+	def has_add_permission(self, request):
+		return False
+
+@admin.register(OutboxEmail, site=admin_site)
+class OutboxEmailAdmin(admin.ModelAdmin):
+	list_display = ('id', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at')
+	list_filter = ('status', 'created_at')
+	search_fields = ('subject', 'body')
+	readonly_fields = (
+		'subject', 'body', 'html_body', 'from_email', 'recipients', 'status', 'attempts',
+		'next_attempt_at', 'last_error', 'sent_at', 'created_at', 'updated_at',
+	)
+	actions = ('requeue',)
+
+	def has_add_permission(self, request):
+		return False
+
+	@admin.action(description='Reenviar e-mails selecionados')
+	def requeue(self, request, queryset):
+		updated = outbox.requeue(queryset)
+		self.message_user(request, f'{updated} e-mail(s) colocado(s) de volta na fila.', messages.SUCCESS)
+
+
+@admin.register(ImageVariantJob, site=admin_site)
+class ImageVariantJobAdmin(admin.ModelAdmin):
+	list_display = ('model_name', 'object_id', 'attempts', 'next_attempt_at', 'created_at')
+	list_filter = ('model_name',)
+	readonly_fields = ('model_name', 'object_id', 'attempts', 'next_attempt_at', 'last_error', 'created_at')
+	actions = ('requeue',)
+
+	def has_add_permission(self, request):
+		return False
+
+	@admin.action(description='Processar novamente as imagens selecionadas')
+	def requeue(self, request, queryset):
+		updated = queryset.update(attempts=0, next_attempt_at=timezone.now(), last_error='')
+		self.message_user(request, f'{updated} imagem(ns) colocada(s) de volta na fila.', messages.SUCCESS)
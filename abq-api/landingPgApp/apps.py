@@ -5,3 +5,6 @@ class LandingPgAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'landingPgApp'
     verbose_name = "Landing Page Application"
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
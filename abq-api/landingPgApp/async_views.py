@@ -0,0 +1,69 @@
+from django.http import Http404, JsonResponse
+
+from .cdn import cdn_cache_endpoint
+from .conditional import conditional_endpoint
+from .response_cache import cached_endpoint
+from .snapshots import asnapshot_response
+
+
+# Native async versions of the read views in views.py, same decorator stack.
+# urls.py serves these instead when LANDING_API_ASYNC_VIEWS is on (ASGI).
+
+
+@cdn_cache_endpoint("ventures_page")
+@conditional_endpoint("ventures_page")
+@cached_endpoint("ventures_page", stale_while_revalidate=300)
+async def Ventures_page(request):
+    return await asnapshot_response("ventures_page")
+
+
+@cdn_cache_endpoint("venture_detail_page")
+@conditional_endpoint("venture_detail_page")
+@cached_endpoint("venture_detail_page")
+async def Venture_detail_page(request, slug):
+    return await asnapshot_response("venture_detail_page", slug)
+
+
+@cdn_cache_endpoint("about_us_page")
+@conditional_endpoint("about_us_page")
+@cached_endpoint("about_us_page")
+async def About_us_page(request):
+    return await asnapshot_response("about_us_page")
+
+
+@cdn_cache_endpoint("your_dreams_page")
+@conditional_endpoint("your_dreams_page")
+@cached_endpoint("your_dreams_page")
+async def Your_dreams_page(request):
+    return await asnapshot_response("your_dreams_page")
+
+
+@cdn_cache_endpoint("blog_page_details")
+@conditional_endpoint("blog_page_details")
+@cached_endpoint("blog_page_details")
+async def BlogPage_details(request):
+    return await asnapshot_response("blog_page_details")
+
+
+@cdn_cache_endpoint("blog_article_details")
+@conditional_endpoint("blog_article_details")
+@cached_endpoint("blog_article_details")
+async def BlogArticle_details(request, slug):
+    return await asnapshot_response("blog_article_details", slug)
+
+
+@cdn_cache_endpoint("home_page_info")
+@conditional_endpoint("home_page_info")
+@cached_endpoint("home_page_info", stale_while_revalidate=300)
+async def Home_page_info(request):
+    return await asnapshot_response("home_page_info")
+
+
+@cdn_cache_endpoint("service_solicitation_term")
+@conditional_endpoint("service_solicitation_term")
+@cached_endpoint("service_solicitation_term")
+async def service_solicitation_term(request):
+    try:
+        return await asnapshot_response("service_solicitation_term")
+    except Http404:
+        return JsonResponse({"error": "No active term found"}, status=404)
@@ -0,0 +1,66 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, models, transaction
+
+from . import imaging
+from .invalidation import content_changed
+from .models import Venture, VentureImages
+from .storage import is_content_addressed
+
+
+def _store(instance, upload, index):
+    # Runs in a pool thread; SharedS3Storage gives each thread its own client
+    imaging.fill_metadata(instance)
+    field = instance._meta.get_field("image")
+    name = field.generate_filename(instance, upload.name)
+    if not is_content_addressed(name):
+        # Timestamped names collide within one batch
+        root, ext = os.path.splitext(name)
+        name = f"{root}_{index}{ext}"
+    instance.image.name = field.storage.save(name, upload, max_length=field.max_length)
+    instance.image._committed = True
+    return instance
+
+
+def _store_and_close(instance, upload, index):
+    try:
+        return _store(instance, upload, index)
+    finally:
+        close_old_connections()
+
+
+def upload_gallery(venture, files, area=None, floor_plan=None, is_high_light=False):
+    # `files` are uploads, or keys already in the bucket (direct uploads: the
+    # browser sent them to S3 and the request only carries their names).
+    # Uploads go to S3 concurrently, then all rows are inserted with one bulk_create.
+    # Objects uploaded for a batch that then fails to insert are left for gc_s3_orphans.
+    instances, uploads = [], []
+    for index, upload in enumerate(files):
+        instance = VentureImages(venture=venture, area=area, floorPlan=floor_plan, is_high_light=is_high_light)
+        instance.image = upload
+        if not isinstance(upload, str):
+            uploads.append((instance, upload, index))
+        instances.append(instance)
+
+    if uploads:
+        with ThreadPoolExecutor(max_workers=getattr(settings, "BULK_UPLOAD_WORKERS", 8)) as executor:
+            list(executor.map(_store_and_close, *zip(*uploads)))
+
+    with transaction.atomic():
+        # Concurrent batches/saves must not hand out the same orders
+        Venture.lock(venture.pk)
+        max_order = (
+            VentureImages.objects.filter(venture=venture).aggregate(models.Max("order"))["order__max"]
+        ) or 0
+        for offset, instance in enumerate(instances, start=1):
+            instance.order = max_order + offset
+        created = VentureImages.objects.bulk_create(instances)
+
+        # bulk_create skips post_save: invalidate and queue the variants explicitly,
+        # as one batch
+        imaging.schedule_batch(VentureImages, created)
+        if created:
+            content_changed(VentureImages, created[0])
+    return created
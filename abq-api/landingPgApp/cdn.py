@@ -0,0 +1,145 @@
+import json
+import logging
+import threading
+import urllib.request
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .endpoints import ENDPOINTS, endpoints_depending_on
+
+
+logger = logging.getLogger(__name__)
+
+_pending = threading.local()
+
+
+def response_tags(endpoint_name, slug=""):
+    tag = ENDPOINTS[endpoint_name].tag
+    return [tag, f"{tag}:{slug}"] if slug else [tag]
+
+
+def _cache_control(endpoint_name, max_age, s_maxage, stale_while_revalidate):
+    # LANDING_API_CDN_CACHE = {"<endpoint>": {"max_age": .., "s_maxage": .., "stale_while_revalidate": ..}}
+    options = {"max_age": max_age, "s_maxage": s_maxage, "stale_while_revalidate": stale_while_revalidate}
+    options.update(getattr(settings, "LANDING_API_CDN_CACHE", {}).get(endpoint_name, {}))
+    return (
+        f"public, max-age={options['max_age']}, s-maxage={options['s_maxage']}, "
+        f"stale-while-revalidate={options['stale_while_revalidate']}"
+    )
+
+
+def cdn_cache_endpoint(endpoint_name, max_age=0, s_maxage=300, stale_while_revalidate=600):
+    # Browsers revalidate with the ETag (max-age=0); the edge keeps its copy
+    # until a purge or s-maxage. s-maxage + stale-while-revalidate must stay
+    # below the lifetime of the signed S3 URLs in the payload.
+    if endpoint_name not in ENDPOINTS:
+        raise ValueError(f"Unknown endpoint {endpoint_name!r}")
+
+    def add_headers(request, response, kwargs):
+        if request.method in ("GET", "HEAD") and response.status_code in (200, 304):
+            tags = response_tags(endpoint_name, kwargs.get("slug", ""))
+            response["Cache-Control"] = _cache_control(endpoint_name, max_age, s_maxage, stale_while_revalidate)
+            response["Surrogate-Key"] = " ".join(tags)
+            response["Cache-Tag"] = ",".join(tags)
+        return response
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                return add_headers(request, await view(request, *args, **kwargs), kwargs)
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            return add_headers(request, view(request, *args, **kwargs), kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def tags_for_change(model, instance):
+    tags = set()
+    for endpoint in endpoints_depending_on(model):
+        slugs = endpoint.slugs_for(instance) if endpoint.slugs_for else None
+        if slugs is None:
+            tags.add(endpoint.tag)
+        else:
+            tags.update(f"{endpoint.tag}:{slug}" for slug in slugs)
+    return tags
+
+
+def queue_purge(model, instance):
+    tags = getattr(_pending, "tags", None)
+    if tags is None:
+        tags = _pending.tags = set()
+    tags.update(tags_for_change(model, instance))
+    # Once per transaction, after commit; later callbacks find nothing left to send
+    transaction.on_commit(dispatch_pending)
+
+
+def dispatch_pending():
+    tags = getattr(_pending, "tags", None)
+    if not tags:
+        return
+    _pending.tags = set()
+    purge(sorted(tags))
+
+
+def get_purge_backend():
+    backend = getattr(settings, "CDN_PURGE_BACKEND", "landingPgApp.cdn.NullPurgeBackend")
+    return import_string(backend)()
+
+
+def purge(tags):
+    batch_size = getattr(settings, "CDN_PURGE_BATCH_SIZE", 100)
+    backend = get_purge_backend()
+    for start in range(0, len(tags), batch_size):
+        batch = tags[start:start + batch_size]
+        try:
+            backend.purge(batch)
+        except Exception:
+            # A failed purge only delays freshness until s-maxage; never break the save
+            logger.exception("CDN purge failed for %s", batch)
+
+
+class BasePurgeBackend:
+    def purge(self, tags):
+        raise NotImplementedError
+
+
+class NullPurgeBackend(BasePurgeBackend):
+    def purge(self, tags):
+        pass
+
+
+class LocMemPurgeBackend(BasePurgeBackend):
+    # Records purges in memory, like django.core.mail's locmem backend
+    purged = []
+
+    def purge(self, tags):
+        LocMemPurgeBackend.purged.append(list(tags))
+
+
+class HttpPurgeBackend(BasePurgeBackend):
+    # POSTs {"tags": [...]} to CDN_PURGE_URL with an optional bearer token
+    def purge(self, tags):
+        headers = {"Content-Type": "application/json"}
+        token = getattr(settings, "CDN_PURGE_TOKEN", "")
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        request = urllib.request.Request(
+            settings.CDN_PURGE_URL,
+            data=json.dumps({"tags": list(tags)}).encode(),
+            headers=headers,
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=getattr(settings, "CDN_PURGE_TIMEOUT", 5)) as response:
+            response.read()
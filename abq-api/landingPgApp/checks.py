@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+from django.core.cache.backends.dummy import DummyCache
+
+from . import response_cache, throttling
+
+
+@register()
+def check_throttle_cache(app_configs, **kwargs):
+    # The form throttles protect the SMTP quota only if every instance spends
+    # from the same buckets
+    if settings.DEBUG:
+        return []
+    alias = getattr(settings, "LANDING_API_THROTTLE_CACHE_ALIAS", "default")
+    hint = "Point LANDING_API_THROTTLE_CACHE_ALIAS at a shared cache (Redis, Memcached or DatabaseCache)."
+    try:
+        cache = throttling._cache()
+    except Exception as exc:
+        return [Error(f"Throttle cache {alias!r} is not configured: {exc}", hint=hint, id="landingPgApp.E001")]
+    if isinstance(cache, DummyCache):
+        return [
+            Error(f"Throttle cache {alias!r} is a DummyCache, so nothing is throttled.", hint=hint, id="landingPgApp.E002")
+        ]
+    if throttling.is_per_process(cache):
+        return [
+            Warning(
+                f"Throttle cache {alias!r} is per process, so each instance gets its own limits.",
+                hint=hint,
+                id="landingPgApp.W001",
+            )
+        ]
+    return []
+
+
+@register()
+def check_response_cache(app_configs, **kwargs):
+    # Model version bumps only reach the process that saved when the cache is
+    # per process: other instances would keep serving (and refilling the CDN
+    # with) stale bodies. A DummyCache just turns the response cache off.
+    if settings.DEBUG:
+        return []
+    alias = getattr(settings, "LANDING_API_CACHE_ALIAS", "default")
+    hint = "Point LANDING_API_CACHE_ALIAS at a shared cache (Redis, Memcached or DatabaseCache)."
+    try:
+        cache = response_cache._cache()
+    except Exception as exc:
+        return [Error(f"Response cache {alias!r} is not configured: {exc}", hint=hint, id="landingPgApp.E003")]
+    if response_cache.is_per_process(cache):
+        return [
+            Warning(
+                f"Response cache {alias!r} is per process, so other instances serve stale pages after a save.",
+                hint=hint,
+                id="landingPgApp.W002",
+            )
+        ]
+    return []
@@ -0,0 +1,75 @@
+import hashlib
+import time
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.views.decorators.http import condition
+
+from .endpoints import ENDPOINTS
+from .response_cache import model_versions
+
+
+def _url_bucket():
+    # Payloads embed signed S3 URLs; roll the validators over periodically so
+    # clients never revalidate a body whose URLs have expired.
+    bucket = getattr(settings, "LANDING_API_VALIDATOR_BUCKET", 900)
+    if not bucket:
+        return None
+    return int(time.time() // bucket) * bucket
+
+
+def endpoint_validators(request, endpoint_name, slug=""):
+    # etag_func and last_modified_func share one lookup per request
+    cache_attr = f"_landing_validators_{endpoint_name}_{slug}"
+    if hasattr(request, cache_attr):
+        return getattr(request, cache_attr)
+
+    # The model versions content_changed bumps after every commit: one cache
+    # read, no query, and the same versions that key the cached body, so an
+    # ETag always describes the body this instance would serve.
+    versions = model_versions(ENDPOINTS[endpoint_name].depends_on)
+    bucket = _url_bucket()
+
+    fingerprint = repr((endpoint_name, slug, bucket, versions))
+    etag = hashlib.sha1(fingerprint.encode()).hexdigest()
+
+    # Versions are time.time_ns() of the last change (or of the first lookup)
+    timestamps = [datetime.fromtimestamp(version / 1e9, tz=dt_timezone.utc) for version in versions]
+    if bucket is not None:
+        timestamps.append(datetime.fromtimestamp(bucket, tz=dt_timezone.utc))
+    last_modified = max(timestamps).replace(microsecond=0)
+
+    validators = (etag, last_modified)
+    setattr(request, cache_attr, validators)
+    return validators
+
+
+def conditional_endpoint(endpoint_name):
+    if endpoint_name not in ENDPOINTS:
+        raise ValueError(f"Unknown endpoint {endpoint_name!r}")
+
+    def etag_func(request, *args, **kwargs):
+        return endpoint_validators(request, endpoint_name, kwargs.get("slug", ""))[0]
+
+    def last_modified_func(request, *args, **kwargs):
+        return endpoint_validators(request, endpoint_name, kwargs.get("slug", ""))[1]
+
+    conditional = condition(etag_func=etag_func, last_modified_func=last_modified_func)
+
+    def decorator(view):
+        wrapped = conditional(view)
+        if not iscoroutinefunction(view):
+            return wrapped
+
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            # condition() calls the validator functions synchronously even for
+            # async views; read the versions in a thread first, they are memoized on the request
+            await sync_to_async(endpoint_validators)(request, endpoint_name, kwargs.get("slug", ""))
+            return await wrapped(request, *args, **kwargs)
+
+        return async_wrapper
+
+    return decorator
@@ -0,0 +1,188 @@
+import os
+import uuid
+
+from botocore.exceptions import ClientError
+from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.urls import reverse
+from django.utils.html import format_html
+from storages.utils import clean_name
+
+from .models import Ebook, SiteImages, VentureImages
+
+
+# Admin file fields that can be uploaded straight from the browser to S3
+TARGETS = {
+    "ventureimages": (VentureImages, "image"),
+    "siteimages": (SiteImages, "image"),
+    "ebook": (Ebook, "file"),
+}
+
+# Formats Pillow decodes for the variant pipeline. No SVG: it can carry
+# scripts and would be served as-is from the bucket.
+IMAGE_CONTENT_TYPES = ("image/jpeg", "image/png", "image/webp", "image/gif", "image/avif")
+
+
+def is_enabled():
+    return getattr(settings, "DIRECT_UPLOADS", False)
+
+
+def target_for(model, field_name):
+    for name, target in TARGETS.items():
+        if target == (model, field_name):
+            return name
+    return None
+
+
+def allowed_content_types(model, field_name):
+    if isinstance(model._meta.get_field(field_name), models.ImageField):
+        return IMAGE_CONTENT_TYPES
+    return ("application/pdf",)
+
+
+def _allowed_content_type(model, field_name, content_type):
+    return content_type in allowed_content_types(model, field_name)
+
+
+def _key_prefix(model, field_name):
+    # Same top-level folder as the regular upload_to, so GC and listings still apply
+    field = model._meta.get_field(field_name)
+    folder = field.generate_filename(model(), "probe").split("/")[0]
+    return f"{folder}/direct/"
+
+
+def presigned_post(target, filename, content_type):
+    model, field_name = TARGETS[target]
+    if not _allowed_content_type(model, field_name, content_type):
+        raise ValidationError(f"Tipo de arquivo não permitido: {content_type}")
+
+    storage = model._meta.get_field(field_name).storage
+    _, ext = os.path.splitext(filename)
+    name = f"{_key_prefix(model, field_name)}{uuid.uuid4().hex}{(ext or '').lower()}"
+    presigned = storage.connection.meta.client.generate_presigned_post(
+        Bucket=storage.bucket_name,
+        Key=storage._normalize_name(clean_name(name)),
+        Fields={"Content-Type": content_type},
+        Conditions=[
+            {"Content-Type": content_type},
+            ["content-length-range", 1, getattr(settings, "DIRECT_UPLOAD_MAX_SIZE", 200 * 1024 * 1024)],
+        ],
+        ExpiresIn=getattr(settings, "DIRECT_UPLOAD_EXPIRE", 3600),
+    )
+    return {"url": presigned["url"], "fields": presigned["fields"], "key": name}
+
+
+def validate_uploaded_key(model, field_name, name):
+    # The browser only sends back a key: it must be one we presigned, and the
+    # object must exist in the bucket with an acceptable type and size.
+    if not name.startswith(_key_prefix(model, field_name)) or ".." in name:
+        raise ValidationError("Chave de upload inválida.")
+
+    storage = model._meta.get_field(field_name).storage
+    try:
+        head = storage.connection.meta.client.head_object(
+            Bucket=storage.bucket_name,
+            Key=storage._normalize_name(clean_name(name)),
+        )
+    except ClientError as error:
+        if error.response.get("ResponseMetadata", {}).get("HTTPStatusCode") == 404:
+            raise ValidationError("O arquivo enviado não foi encontrado no armazenamento.")
+        raise
+
+    if not head.get("ContentLength"):
+        raise ValidationError("O arquivo enviado está vazio.")
+    if not _allowed_content_type(model, field_name, head.get("ContentType", "")):
+        raise ValidationError(f"Tipo de arquivo não permitido: {head.get('ContentType')}")
+    return name
+
+
+class DirectUploadWidget(forms.ClearableFileInput):
+    # The script swaps the chosen file for a "<name>__key" value after
+    # uploading it to S3, so the file itself never goes through Django.
+
+    class Media:
+        js = ("landingPgApp/direct_upload.js",)
+
+    def __init__(self, target, attrs=None):
+        super().__init__(attrs)
+        self.target = target
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context["widget"]["attrs"]["data-direct-upload-url"] = reverse("admin:direct_upload", args=[self.target])
+        context["widget"]["attrs"]["accept"] = ",".join(allowed_content_types(*TARGETS[self.target]))
+        return context
+
+    def render(self, name, value, attrs=None, renderer=None):
+        return super().render(name, value, attrs, renderer) + format_html(
+            '<input type="hidden" name="{}__key" value=""><span class="direct-upload-status"></span>',
+            name,
+        )
+
+    def value_from_datadict(self, data, files, name):
+        key = data.get(f"{name}__key")
+        if key:
+            return key
+        return super().value_from_datadict(data, files, name)
+
+    def value_omitted_from_data(self, data, files, name):
+        return not data.get(f"{name}__key") and super().value_omitted_from_data(data, files, name)
+
+
+class DirectUploadField(forms.FileField):
+    def __init__(self, *, target, **kwargs):
+        kwargs["widget"] = DirectUploadWidget(target)
+        super().__init__(**kwargs)
+        self.target = target
+
+    def to_python(self, data):
+        if isinstance(data, str):
+            # Assigned as the field's name; the model field treats it as already stored
+            return validate_uploaded_key(*TARGETS[self.target], data)
+        return super().to_python(data)
+
+
+class MultipleDirectUploadWidget(DirectUploadWidget):
+    # Several files: the script adds one "<name>__key" hidden input per uploaded file
+    allow_multiple_selected = True
+
+    def use_required_attribute(self, initial):
+        # The script empties the file input once the keys are in; the server still checks
+        return False
+
+    def render(self, name, value, attrs=None, renderer=None):
+        return super(DirectUploadWidget, self).render(name, value, attrs, renderer) + format_html(
+            '<span class="direct-upload-keys" data-name="{}__key"></span><span class="direct-upload-status"></span>',
+            name,
+        )
+
+    def value_from_datadict(self, data, files, name):
+        keys = [key for key in data.getlist(f"{name}__key") if key]
+        if keys:
+            return keys
+        return super(DirectUploadWidget, self).value_from_datadict(data, files, name)
+
+
+class MultipleDirectUploadField(DirectUploadField):
+    # Bulk gallery upload: a list of validated keys (or of files, without the script)
+    def __init__(self, *, target, **kwargs):
+        super().__init__(target=target, **kwargs)
+        self.widget = MultipleDirectUploadWidget(target)
+
+    def clean(self, data, initial=None):
+        if isinstance(data, (list, tuple)):
+            return [super(MultipleDirectUploadField, self).clean(item, initial) for item in data]
+        return [super().clean(data, initial)]
+
+
+class DirectUploadAdminMixin:
+    def formfield_for_dbfield(self, db_field, request, **kwargs):
+        target = target_for(self.model, db_field.name)
+        if target and is_enabled():
+            kwargs["form_class"] = DirectUploadField
+            kwargs["target"] = target
+            kwargs.pop("widget", None)
+            return db_field.formfield(**kwargs)
+        return super().formfield_for_dbfield(db_field, request, **kwargs)
@@ -0,0 +1,139 @@
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from . import serializers
+from .models import (
+    BlogArticle,
+    BlogTag,
+    Ebook,
+    InstructionalVideo,
+    ServiceSolicitationTerm,
+    SiteImages,
+    Venture,
+    VentureAmenities,
+    VentureAreas,
+    VentureFloorPlans,
+    VentureHeroHighlight,
+    VentureImages,
+    VentureStatus,
+)
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    name: str
+    build: Callable
+    # Models whose changes make the rendered payload stale
+    depends_on: tuple
+    # Slugged endpoints: every slug, and the slugs touched by a changed instance
+    # (None means "all of them")
+    all_slugs: Optional[Callable] = None
+    slugs_for: Optional[Callable] = None
+    # Surrogate key for CDN purges; slugged pages also get "<tag>:<slug>"
+    tag: str = ""
+    # Async builder running independent queries concurrently (async views);
+    # without one, build() runs in a thread
+    abuild: Optional[Callable] = None
+
+    @property
+    def is_slugged(self):
+        return self.all_slugs is not None
+
+
+def _venture_slugs():
+    return Venture.objects.values_list("slug", flat=True)
+
+
+def _venture_slugs_for(instance):
+    # Venture/VentureStatus changes (renames, deletes, status names) rebuild every detail page
+    venture_id = getattr(instance, "venture_id", None)
+    if venture_id is None:
+        return None
+    return Venture.objects.filter(pk=venture_id).values_list("slug", flat=True)
+
+
+def _blog_article_slugs():
+    return BlogArticle.objects.filter(is_active=True).values_list("slug", flat=True)
+
+
+ENDPOINTS = {
+    endpoint.name: endpoint
+    for endpoint in (
+        Endpoint(
+            "home_page_info",
+            serializers.home_page_payload,
+            depends_on=(Venture, VentureStatus, VentureImages, BlogArticle, SiteImages, InstructionalVideo, Ebook),
+            tag="home",
+            abuild=serializers.ahome_page_payload,
+        ),
+        Endpoint(
+            "ventures_page",
+            serializers.ventures_page_payload,
+            depends_on=(Venture, VentureStatus, VentureImages, SiteImages),
+            tag="ventures",
+        ),
+        Endpoint(
+            "venture_detail_page",
+            serializers.venture_detail_payload,
+            depends_on=(
+                Venture,
+                VentureStatus,
+                VentureHeroHighlight,
+                VentureAmenities,
+                VentureFloorPlans,
+                VentureAreas,
+                VentureImages,
+            ),
+            all_slugs=_venture_slugs,
+            slugs_for=_venture_slugs_for,
+            tag="venture",
+        ),
+        Endpoint(
+            "blog_page_details",
+            serializers.blog_page_payload,
+            depends_on=(BlogArticle, BlogTag, SiteImages),
+            tag="blog-page",
+        ),
+        Endpoint(
+            "blog_article_details",
+            serializers.blog_article_payload,
+            # Suggested articles reference other articles, so any change rebuilds all
+            depends_on=(BlogArticle, BlogTag),
+            all_slugs=_blog_article_slugs,
+            tag="blog",
+        ),
+        Endpoint(
+            "your_dreams_page",
+            serializers.your_dreams_payload,
+            depends_on=(SiteImages, InstructionalVideo, Ebook),
+            tag="your-dreams",
+            abuild=serializers.ayour_dreams_payload,
+        ),
+        Endpoint(
+            "about_us_page",
+            serializers.about_us_payload,
+            depends_on=(SiteImages,),
+            tag="about-us",
+        ),
+        Endpoint(
+            "service_solicitation_term",
+            serializers.service_solicitation_term_payload,
+            depends_on=(ServiceSolicitationTerm, Venture, SiteImages),
+            tag="service-solicitation",
+            abuild=serializers.aservice_solicitation_term_payload,
+        ),
+    )
+}
+
+
+def endpoints_depending_on(model):
+    return [endpoint for endpoint in ENDPOINTS.values() if model in endpoint.depends_on]
+
+
+def tracked_models():
+    models = []
+    for endpoint in ENDPOINTS.values():
+        for model in endpoint.depends_on:
+            if model not in models:
+                models.append(model)
+    return models
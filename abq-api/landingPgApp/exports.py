@@ -0,0 +1,87 @@
+import csv
+import datetime
+import json
+import re
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+
+# Cells a spreadsheet would evaluate; the rows come from public forms
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# "+55 (11) 99999-0000": digits and separators only, nothing a spreadsheet could run
+PHONE_NUMBER = re.compile(r"\+?[\d ().-]+")
+
+
+class Echo:
+    # csv.writer target that hands each encoded row back instead of buffering it
+    def write(self, value):
+        return value
+
+
+def _value(value):
+    if isinstance(value, datetime.datetime):
+        return timezone.localtime(value).isoformat()
+    return value
+
+
+def _csv_value(value, is_phone=False):
+    value = _value(value)
+    if is_phone and isinstance(value, str) and PHONE_NUMBER.fullmatch(value):
+        return value
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def _blocks(queryset, fields, encode, chunk_size):
+    # values_list + iterator: a server-side cursor, no model instances, no result
+    # cache. One string per fetched chunk keeps memory flat without a write per row.
+    chunk_size = chunk_size or getattr(settings, "EXPORT_CHUNK_SIZE", 2000)
+    lines = []
+    for row in queryset.values_list(*fields).iterator(chunk_size=chunk_size):
+        lines.append(encode(row))
+        if len(lines) >= chunk_size:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+
+def _attachment(response, filename):
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def csv_response(queryset, columns, filename, chunk_size=None, phone_fields=()):
+    # columns: [(field lookup, header)]; phone_fields keep a leading "+" on plain numbers
+    fields = [field for field, _ in columns]
+    phones = [field in phone_fields for field in fields]
+    writer = csv.writer(Echo())
+
+    def encode(row):
+        return writer.writerow([_csv_value(value, is_phone) for value, is_phone in zip(row, phones)])
+
+    def lines():
+        # BOM so Excel opens the file as UTF-8
+        yield "\ufeff" + writer.writerow([header for _, header in columns])
+        yield from _blocks(queryset, fields, encode, chunk_size)
+
+    return _attachment(StreamingHttpResponse(lines(), content_type="text/csv; charset=utf-8"), f"{filename}.csv")
+
+
+def jsonl_response(queryset, columns, filename, chunk_size=None):
+    fields = [field for field, _ in columns]
+
+    def encode(row):
+        record = {field: _value(value) for field, value in zip(fields, row)}
+        return json.dumps(record, ensure_ascii=False, cls=DjangoJSONEncoder) + "\n"
+
+    def lines():
+        yield from _blocks(queryset, fields, encode, chunk_size)
+
+    return _attachment(
+        StreamingHttpResponse(lines(), content_type="application/x-ndjson; charset=utf-8"), f"{filename}.jsonl"
+    )
@@ -0,0 +1,121 @@
+import datetime
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+
+from .models import IdempotencyRecord
+
+
+MAX_KEY_LENGTH = 255
+
+
+def _digest(value):
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def _normalize(value):
+    # Retries from the same form differ at most in whitespace and case
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    return value
+
+
+def fingerprint(body, form_class):
+    # Hash of the form's fields only; None when the body is not a JSON object
+    # (the view rejects it anyway)
+    try:
+        data = json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    fields = {name: _normalize(data.get(name)) for name in form_class.base_fields}
+    return _digest(json.dumps(fields, sort_keys=True, default=str))
+
+
+def _after(seconds):
+    return timezone.now() + datetime.timedelta(seconds=seconds)
+
+
+def claim(key, content, lock_timeout):
+    # None when this request now owns the key; otherwise the record holding it.
+    # Expired rows are swept first, which keeps the table small and lets their
+    # keys be claimed again.
+    IdempotencyRecord.objects.filter(expires_at__lte=timezone.now()).delete()
+    try:
+        with transaction.atomic():
+            IdempotencyRecord.objects.create(key=key, fingerprint=content, expires_at=_after(lock_timeout))
+        return None
+    except IntegrityError:
+        # Released between the insert and this read: report it as still in progress
+        return IdempotencyRecord.objects.filter(pk=key).first() or IdempotencyRecord(key=key, fingerprint=content)
+
+
+def _replay(record):
+    response = HttpResponse(bytes(record.content), status=record.status_code, content_type=record.content_type)
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def idempotent_endpoint(scope, form_class):
+    # A repeated POST within the window gets the stored response instead of a
+    # second submission. The client's Idempotency-Key identifies a repeat; without
+    # one, the same normalized form fields do, over a shorter window.
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != "POST":
+                return view(request, *args, **kwargs)
+
+            content = fingerprint(request.body, form_class) or ""
+            client_key = request.headers.get("Idempotency-Key", "").strip()
+            if client_key:
+                if len(client_key) > MAX_KEY_LENGTH:
+                    return JsonResponse({"error": "Invalid Idempotency-Key"}, status=400)
+                key = f"{scope}:key:{_digest(client_key)}"
+                window = getattr(settings, "IDEMPOTENCY_KEY_TTL", 24 * 60 * 60)
+            elif content:
+                key = f"{scope}:content:{content}"
+                window = getattr(settings, "IDEMPOTENCY_CONTENT_TTL", 10 * 60)
+            else:
+                return view(request, *args, **kwargs)
+
+            record = claim(key, content, getattr(settings, "IDEMPOTENCY_LOCK_TIMEOUT", 30))
+            if record is not None:
+                if record.fingerprint != content:
+                    return JsonResponse(
+                        {"error": "Idempotency-Key was already used with a different request"}, status=422
+                    )
+                if record.status_code is None:
+                    response = JsonResponse({"error": "The original request is still being processed"}, status=409)
+                    response["Retry-After"] = "1"
+                    return response
+                return _replay(record)
+
+            stored = IdempotencyRecord.objects.filter(pk=key)
+            try:
+                response = view(request, *args, **kwargs)
+            except Exception:
+                stored.delete()
+                raise
+
+            if 200 <= response.status_code < 300 and not response.streaming:
+                stored.update(
+                    status_code=response.status_code,
+                    content=response.content,
+                    content_type=response["Content-Type"],
+                    expires_at=_after(window),
+                )
+            else:
+                # Failed or rejected: let the client retry with the same key
+                stored.delete()
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,110 @@
+# Pure Pillow work, executed in spawned worker processes: importing this module
+# must not touch Django settings or models.
+import io
+import math
+
+from PIL import Image, ImageOps, features
+
+
+def render_variants(data, widths, formats, quality):
+    # Decode once, then downscale and encode every width/format pair. Never
+    # upscales; small originals get one variant at their own width.
+    formats = [fmt for fmt in formats if features.check(fmt)]
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+
+        rendered = []
+        for width in [width for width in sorted(widths) if width < image.width] or [image.width]:
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                buffer = io.BytesIO()
+                resized.save(buffer, format=fmt.upper(), quality=quality)
+                rendered.append((width, height, fmt, buffer.getvalue()))
+        return rendered
+
+
+_BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+
+def _base83(value, length):
+    return "".join(_BASE83[value // 83 ** (length - index - 1) % 83] for index in range(length))
+
+
+def _srgb_to_linear(value):
+    value = value / 255
+    return value / 12.92 if value <= 0.04045 else ((value + 0.055) / 1.055) ** 2.4
+
+
+def _linear_to_srgb(value):
+    value = max(0.0, min(1.0, value))
+    if value <= 0.0031308:
+        return int(value * 12.92 * 255 + 0.5)
+    return int((1.055 * value ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def blurhash(image, x_components=4, y_components=3):
+    # https://github.com/woltapp/blurhash encoder, on an already tiny RGB image
+    width, height = image.size
+    pixels = [tuple(_srgb_to_linear(channel) for channel in pixel) for pixel in image.getdata()]
+
+    factors = []
+    for j in range(y_components):
+        cos_y = [math.cos(math.pi * j * y / height) for y in range(height)]
+        for i in range(x_components):
+            cos_x = [math.cos(math.pi * i * x / width) for x in range(width)]
+            red = green = blue = 0.0
+            for y in range(height):
+                for x in range(width):
+                    basis = cos_y[y] * cos_x[x]
+                    pixel = pixels[y * width + x]
+                    red += basis * pixel[0]
+                    green += basis * pixel[1]
+                    blue += basis * pixel[2]
+            scale = (1 if i == j == 0 else 2) / (width * height)
+            factors.append((red * scale, green * scale, blue * scale))
+
+    dc, ac = factors[0], factors[1:]
+    encoded = _base83((x_components - 1) + (y_components - 1) * 9, 1)
+    if ac:
+        quantised_max = max(0, min(82, int(max(abs(value) for factor in ac for value in factor) * 166 - 0.5)))
+        max_value = (quantised_max + 1) / 166
+    else:
+        quantised_max, max_value = 0, 1
+    encoded += _base83(quantised_max, 1)
+    encoded += _base83((_linear_to_srgb(dc[0]) << 16) + (_linear_to_srgb(dc[1]) << 8) + _linear_to_srgb(dc[2]), 4)
+    for factor in ac:
+        red, green, blue = (
+            max(0, min(18, int(math.floor(math.copysign(abs(value / max_value) ** 0.5, value) * 9 + 9.5))))
+            for value in factor
+        )
+        encoded += _base83(red * 19 * 19 + green * 19 + blue, 2)
+    return encoded
+
+
+def dominant_color(image):
+    quantized = image.quantize(colors=8)
+    _, index = max(quantized.getcolors())
+    red, green, blue = quantized.getpalette()[index * 3:index * 3 + 3]
+    return f"#{red:02x}{green:02x}{blue:02x}"
+
+
+def image_metadata(data):
+    # Width/height of the displayed (EXIF-rotated) original, plus a dominant
+    # colour and a blurhash placeholder computed from a 32px thumbnail.
+    with Image.open(io.BytesIO(data)) as original:
+        width, height = original.size
+        if original.getexif().get(0x0112) in (5, 6, 7, 8):
+            width, height = height, width
+        # JPEGs decode straight at a reduced scale
+        original.draft("RGB", (64, 64))
+        image = ImageOps.exif_transpose(original).convert("RGB")
+        image.thumbnail((32, 32))
+        return {
+            "width": width,
+            "height": height,
+            "color": dominant_color(image),
+            "blurhash": blurhash(image),
+        }
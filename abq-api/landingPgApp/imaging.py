@@ -0,0 +1,287 @@
+import datetime
+import logging
+import mimetypes
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .image_processing import image_metadata, render_variants
+from .invalidation import content_changed
+from .models import BlogArticle, ImageVariantJob, InstructionalVideo, SiteImages, Venture, VentureImages
+
+
+logger = logging.getLogger(__name__)
+
+mimetypes.add_type("image/webp", ".webp")
+mimetypes.add_type("image/avif", ".avif")
+
+# Image field per model; variants are stored in "<field>_variants"
+VARIANT_FIELDS = {
+    VentureImages: "image",
+    SiteImages: "image",
+    BlogArticle: "cover_image",
+    InstructionalVideo: "cover_image",
+}
+MODELS = {model.__name__: model for model in VARIANT_FIELDS}
+
+_lock = threading.Lock()
+_process_pool = None
+_background = None
+
+
+def _get_process_pool():
+    global _process_pool
+    with _lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=getattr(settings, "IMAGE_VARIANT_PROCESSES", None),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _process_pool
+
+
+def _in_process_pool(function, *args):
+    try:
+        pool = _get_process_pool()
+    except (OSError, NotImplementedError):
+        # Some serverless runtimes have no /dev/shm for multiprocessing
+        logger.warning("Process pool unavailable, processing images in-process")
+        return function(*args)
+    return pool.submit(function, *args).result()
+
+
+def _render(data):
+    return _in_process_pool(
+        render_variants,
+        data,
+        getattr(settings, "IMAGE_VARIANT_WIDTHS", (320, 640, 1024, 1600)),
+        getattr(settings, "IMAGE_VARIANT_FORMATS", ("webp", "avif")),
+        getattr(settings, "IMAGE_VARIANT_QUALITY", 75),
+    )
+
+
+def variant_name(name, width, fmt):
+    root, _ = os.path.splitext(name)
+    return f"{root}__w{width}.{fmt}"
+
+
+def needs_variants(instance):
+    field_name = VARIANT_FIELDS[type(instance)]
+    field_file = getattr(instance, field_name)
+    variants = getattr(instance, f"{field_name}_variants")
+    if not field_file:
+        return bool(variants)
+    root, _ = os.path.splitext(field_file.name)
+    return not variants or any(not variant["name"].startswith(f"{root}__w") for variant in variants)
+
+
+def needs_metadata(instance):
+    field_name = VARIANT_FIELDS[type(instance)]
+    return bool(getattr(instance, field_name)) != bool(getattr(instance, f"{field_name}_metadata"))
+
+
+def fill_metadata(instance):
+    # Runs before save: a fresh upload is still in memory (or a temp file), so
+    # measuring it here costs no S3 round trip.
+    field_name = VARIANT_FIELDS[type(instance)]
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        setattr(instance, f"{field_name}_metadata", {})
+    elif not field_file._committed:
+        upload = field_file.file
+        upload.seek(0)
+        data = upload.read()
+        upload.seek(0)
+        # Kept for background rendering, which then needs no download
+        instance._image_source = data
+        try:
+            setattr(instance, f"{field_name}_metadata", image_metadata(data))
+        except Exception:
+            logger.exception("Image metadata failed for %s", field_file.name)
+            setattr(instance, f"{field_name}_metadata", {})
+
+
+def _load(model, pk, source=None):
+    # source: (name, bytes) of the file as uploaded, used while it is still current
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return None, None, None
+    field_file = getattr(instance, VARIANT_FIELDS[model])
+    if not field_file:
+        return instance, field_file, None
+    if source and source[0] == field_file.name:
+        return instance, field_file, source[1]
+    with field_file.open("rb") as stored:
+        return instance, field_file, stored.read()
+
+
+def _store(instance, field_file, values):
+    # Only if the file was not replaced meanwhile; updated_at moves the ETags
+    model = type(instance)
+    field_name = VARIANT_FIELDS[model]
+    if field_file:
+        current = Q(**{field_name: field_file.name})
+    else:
+        current = Q(**{field_name: ""}) | Q(**{f"{field_name}__isnull": True})
+    updated = model.objects.filter(current, pk=instance.pk).update(**values, updated_at=timezone.now())
+    if updated:
+        for name, value in values.items():
+            setattr(instance, name, value)
+        if model is VentureImages:
+            Venture.sync_cover_image(instance.venture_id)
+        content_changed(model, instance)
+    return updated
+
+
+def generate_variants(model, pk, source=None):
+    instance, field_file, data = _load(model, pk, source)
+    if instance is None:
+        return None
+
+    field_name = VARIANT_FIELDS[model]
+    variants, metadata = [], {}
+    if field_file:
+        for width, height, fmt, content in _render(data):
+            name = field_file.storage.save(variant_name(field_file.name, width, fmt), ContentFile(content))
+            variants.append({"name": name, "width": width, "height": height, "format": fmt})
+        # The bytes are already here; refreshes metadata for files set without an upload
+        metadata = _in_process_pool(image_metadata, data)
+
+    _store(instance, field_file, {f"{field_name}_variants": variants, f"{field_name}_metadata": metadata})
+    return variants
+
+
+def backfill_metadata(model, pk):
+    instance, field_file, data = _load(model, pk)
+    if instance is None:
+        return None
+
+    metadata = _in_process_pool(image_metadata, data) if field_file else {}
+    _store(instance, field_file, {f"{VARIANT_FIELDS[model]}_metadata": metadata})
+    return metadata
+
+
+def _generate_logged(model, pk, source=None):
+    # The original stays served; the command retries anything left behind
+    try:
+        generate_variants(model, pk, source)
+    except Exception:
+        logger.exception("Image variants failed for %s %s", model.__name__, pk)
+
+
+def _generate_in_background(model, pk, source):
+    try:
+        _generate_logged(model, pk, source)
+    finally:
+        close_old_connections()
+
+
+def _get_background():
+    global _background
+    with _lock:
+        if _background is None:
+            _background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-variants")
+        return _background
+
+
+def enqueue(model, pks):
+    # Queued (again) as due now, with a fresh attempt budget
+    now = timezone.now()
+    jobs = [ImageVariantJob(model_name=model.__name__, object_id=pk, next_attempt_at=now) for pk in pks]
+    ImageVariantJob.objects.bulk_create(
+        jobs,
+        update_conflicts=True,
+        unique_fields=["model_name", "object_id"],
+        update_fields=["attempts", "next_attempt_at", "last_error"],
+    )
+
+
+def _take_source(instance):
+    # (stored name, uploaded bytes) when fill_metadata kept them, else None
+    data = getattr(instance, "_image_source", None)
+    instance._image_source = None
+    field_file = getattr(instance, VARIANT_FIELDS[type(instance)])
+    return (field_file.name, data) if data is not None and field_file else None
+
+
+def schedule_batch(model, instances):
+    # IMAGE_VARIANTS_MODE: "queue" (default: the save only records
+    # ImageVariantJobs, one insert per batch; the cron drain renders them),
+    # "background" (thread after commit, from the uploaded bytes; long-lived
+    # servers only) or "off" (only the generate_image_variants command).
+    # Never inside the request itself.
+    jobs = []
+    for instance in instances:
+        source = _take_source(instance)
+        if needs_variants(instance):
+            jobs.append((instance.pk, source))
+    mode = getattr(settings, "IMAGE_VARIANTS_MODE", "queue")
+    if mode == "off" or not jobs:
+        return
+    if mode == "background":
+        def submit():
+            for pk, source in jobs:
+                _get_background().submit(_generate_in_background, model, pk, source)
+
+        transaction.on_commit(submit)
+    else:
+        enqueue(model, [pk for pk, _ in jobs])
+
+
+def schedule_variants(instance):
+    schedule_batch(type(instance), [instance])
+
+
+def _claim(max_attempts):
+    # The next due job, leased so concurrent drains skip it; given up after max_attempts
+    now = timezone.now()
+    lease = datetime.timedelta(seconds=getattr(settings, "IMAGE_VARIANTS_LEASE", 300))
+    with transaction.atomic():
+        job = (
+            ImageVariantJob.objects.filter(next_attempt_at__lte=now, attempts__lt=max_attempts)
+            .select_for_update(skip_locked=True)
+            .order_by("next_attempt_at", "pk")
+            .first()
+        )
+        if job is not None:
+            job.next_attempt_at = now + lease
+            job.save(update_fields=["next_attempt_at"])
+    return job
+
+
+def drain(max_seconds=None):
+    # Renders queued jobs until the queue is empty or max_seconds have passed
+    # (checked between images, so a call may overrun by one image).
+    stats = {"rendered": 0, "retried": 0, "failed": 0}
+    max_attempts = getattr(settings, "IMAGE_VARIANTS_MAX_ATTEMPTS", 5)
+    deadline = None if max_seconds is None else time.monotonic() + max_seconds
+    while deadline is None or time.monotonic() < deadline:
+        job = _claim(max_attempts)
+        if job is None:
+            break
+        # Unchanged lease: the image was not queued again while rendering
+        current = ImageVariantJob.objects.filter(pk=job.pk, next_attempt_at=job.next_attempt_at)
+        model = MODELS.get(job.model_name)
+        try:
+            if model is not None:
+                generate_variants(model, job.object_id)
+        except Exception as error:
+            logger.exception("Image variants failed for %s %s", job.model_name, job.object_id)
+            current.update(
+                attempts=F("attempts") + 1,
+                next_attempt_at=timezone.now() + datetime.timedelta(seconds=60 * 2 ** job.attempts),
+                last_error=f"{type(error).__name__}: {error}"[:2000],
+            )
+            stats["failed" if job.attempts + 1 >= max_attempts else "retried"] += 1
+        else:
+            current.delete()
+            stats["rendered"] += 1
+    return stats
@@ -0,0 +1,17 @@
+from django.db import transaction
+
+from . import cdn, response_cache, site_images, snapshots
+from .models import SiteImages
+
+
+def content_changed(model, instance):
+    # Also the entry point for writes that bypass post_save (queryset.update, bulk_create).
+    # Call order is on-commit order: drop the page images resolver, rebuild
+    # snapshots, then bump cache versions, then purge the CDN, so no layer
+    # refills itself from a stale one. Dropping the resolver before commit would
+    # let a concurrent read cache the old rows again until its TTL.
+    if model is SiteImages:
+        transaction.on_commit(site_images.invalidate)
+    snapshots.mark_stale(model, instance)
+    response_cache.bump_on_commit(model)
+    cdn.queue_purge(model, instance)
@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from landingPgApp import imaging
+
+
+class Command(BaseCommand):
+    help = (
+        "Preenche largura, altura, cor dominante e blurhash das imagens já "
+        "existentes, baixando e processando várias em paralelo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            action="append",
+            choices=[model.__name__ for model in imaging.VARIANT_FIELDS],
+            help="Limita a um modelo (pode ser repetido).",
+        )
+        parser.add_argument("--force", action="store_true", help="Recalcula mesmo os metadados já existentes.")
+        parser.add_argument("--workers", type=int, default=8, help="Imagens baixadas em paralelo (padrão: 8).")
+
+    def handle(self, *args, **options):
+        models = [
+            model for model in imaging.VARIANT_FIELDS
+            if not options["model"] or model.__name__ in options["model"]
+        ]
+        pending = []
+        for model in models:
+            field_name = imaging.VARIANT_FIELDS[model]
+            for instance in model.objects.only("pk", field_name, f"{field_name}_metadata").iterator():
+                if options["force"] or imaging.needs_metadata(instance):
+                    pending.append((model, instance.pk))
+
+        def backfill(item):
+            try:
+                return imaging.backfill_metadata(*item)
+            finally:
+                close_old_connections()
+
+        # Threads download from S3; decoding runs in imaging's process pool
+        failed = 0
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            futures = {executor.submit(backfill, item): item for item in pending}
+            for future, (model, pk) in futures.items():
+                try:
+                    metadata = future.result()
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(f"{model.__name__} {pk}: {error}")
+                else:
+                    self.stdout.write(f"{model.__name__} {pk}: {metadata}")
+
+        self.stdout.write(self.style.SUCCESS(f"{len(pending) - failed} imagem(ns) processada(s), {failed} com erro."))
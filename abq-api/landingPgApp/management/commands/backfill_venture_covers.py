@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from landingPgApp.invalidation import content_changed
+from landingPgApp.models import Venture
+
+
+class Command(BaseCommand):
+    help = (
+        "Preenche Venture.cover_image (e suas variações) a partir das imagens marcadas como capa. "
+        "A migração 0034 já faz isso no deploy; use após edições feitas direto no banco."
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = Venture.objects.update(**Venture.cover_image_values())
+            # update() sends no signals: rebuild snapshots, bump caches and purge the CDN
+            content_changed(Venture, None)
+        self.stdout.write(self.style.SUCCESS(f"{updated} empreendimento(s) atualizado(s)."))
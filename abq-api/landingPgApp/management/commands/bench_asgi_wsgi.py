@@ -0,0 +1,210 @@
+import asyncio
+import io
+import statistics
+import sys
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.test.utils import override_settings
+from django.urls import include, path
+
+from landingPgApp import async_views, views
+from landingPgApp.endpoints import ENDPOINTS
+from landingPgApp.urls import read_urlpatterns
+
+
+HOST = "127.0.0.1"
+
+
+def _urlconf(read_views):
+    urlconf = types.ModuleType(f"bench_urls_{read_views.__name__.rsplit('.', 1)[-1]}")
+    urlconf.urlpatterns = [path("landing-api/", include(read_urlpatterns(read_views)))]
+    return urlconf
+
+
+def _wsgi_request(handler, url):
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": url,
+        "QUERY_STRING": "",
+        "SCRIPT_NAME": "",
+        "SERVER_NAME": HOST,
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": HOST,
+        "REMOTE_ADDR": HOST,
+        "wsgi.input": io.BytesIO(b""),
+        "wsgi.errors": sys.stderr,
+        "wsgi.url_scheme": "http",
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+        "wsgi.version": (1, 0),
+    }
+    statuses = []
+    started = time.perf_counter()
+    response = handler(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        for _ in response:
+            pass
+    finally:
+        response.close()
+    return time.perf_counter() - started, int(statuses[0].split()[0])
+
+
+async def _asgi_request(handler, url):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": url,
+        "raw_path": url.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", HOST.encode())],
+        "client": (HOST, 50000),
+        "server": (HOST, 80),
+    }
+    disconnected = asyncio.Event()
+    sent_body = False
+    statuses = []
+
+    async def receive():
+        nonlocal sent_body
+        if not sent_body:
+            sent_body = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # The client stays connected; the handler cancels this wait once it responds
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    started = time.perf_counter()
+    await handler(scope, receive, send)
+    return time.perf_counter() - started, statuses[0]
+
+
+def run_wsgi(url, requests, concurrency):
+    handler = WSGIHandler()
+
+    def worker(_):
+        try:
+            return _wsgi_request(handler, url)
+        finally:
+            close_old_connections()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(worker, range(requests)))
+    return time.perf_counter() - started, results
+
+
+def run_asgi(url, requests, concurrency):
+    handler = ASGIHandler()
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                return await _asgi_request(handler, url)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one() for _ in range(requests)))
+        return time.perf_counter() - started, results
+
+    return asyncio.run(main())
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara a vazão dos endpoints de leitura servidos por WSGI (views síncronas) e por ASGI "
+        "(views síncronas e views assíncronas), chamando os handlers do Django no próprio processo, "
+        "e o tempo de montar os payloads de forma sequencial versus com consultas concorrentes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=300, help="Requisições por configuração (padrão: 300).")
+        parser.add_argument("--concurrency", type=int, default=16, help="Requisições simultâneas (padrão: 16).")
+        parser.add_argument(
+            "--path",
+            default="/landing-api/home-page-info/",
+            help="Endpoint medido (padrão: /landing-api/home-page-info/).",
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Ignora o cache de respostas: toda requisição lê o snapshot no banco.",
+        )
+        parser.add_argument("--builds", type=int, default=20, help="Repetições de cada montagem de payload (padrão: 20).")
+
+    def _report(self, label, elapsed, results):
+        latencies = sorted(latency * 1000 for latency, _ in results)
+        errors = sum(1 for _, status in results if status >= 400)
+        p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+        self.stdout.write(
+            f"  {label:<24} {len(results) / elapsed:8.1f} req/s   "
+            f"p50 {statistics.median(latencies):7.2f} ms   p95 {p95:7.2f} ms"
+            + (f"   {errors} erro(s)" if errors else "")
+        )
+
+    def _bench_handlers(self, options):
+        url, requests, concurrency = options["path"], options["requests"], options["concurrency"]
+        overrides = {"ALLOWED_HOSTS": [HOST]}
+        if options["no_cache"]:
+            overrides["CACHES"] = {
+                **settings.CACHES,
+                "bench": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+            }
+            overrides["LANDING_API_CACHE_ALIAS"] = "bench"
+
+        self.stdout.write(f"{url}: {requests} requisições, {concurrency} simultâneas")
+        runs = (
+            ("WSGI, views síncronas", views, run_wsgi),
+            ("ASGI, views síncronas", views, run_asgi),
+            ("ASGI, views assíncronas", async_views, run_asgi),
+        )
+        for label, read_views, run in runs:
+            with override_settings(ROOT_URLCONF=_urlconf(read_views), **overrides):
+                run(url, min(requests, concurrency), concurrency)  # warm up the snapshot and the cache
+                elapsed, results = run(url, requests, concurrency)
+            self._report(label, elapsed, results)
+
+    def _bench_builds(self, rounds):
+        self.stdout.write(f"Montagem dos payloads (média de {rounds}):")
+        for endpoint in ENDPOINTS.values():
+            if endpoint.abuild is None:
+                continue
+
+            def timed(build):
+                build()
+                started = time.perf_counter()
+                for _ in range(rounds):
+                    build()
+                return (time.perf_counter() - started) * 1000 / rounds
+
+            sequential = timed(endpoint.build)
+            concurrent = timed(lambda: asyncio.run(endpoint.abuild()))
+            self.stdout.write(
+                f"  {endpoint.name:<28} sequencial {sequential:7.2f} ms   concorrente {concurrent:7.2f} ms"
+            )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests e --concurrency devem ser positivos.")
+        if settings.DEBUG:
+            self.stderr.write("DEBUG está ativo: middlewares de depuração distorcem os números.")
+
+        self._bench_handlers(options)
+        self._bench_builds(options["builds"])
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from landingPgApp import media_urls
+from landingPgApp.models import VentureImages
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede o custo de gerar URLs de mídia por requisição: assinatura direta "
+        "via botocore versus a camada landingPgApp.media_urls."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--images", type=int, default=120, help="Imagens por requisição (padrão: 120).")
+        parser.add_argument("--requests", type=int, default=50, help="Requisições simuladas (padrão: 50).")
+
+    def handle(self, *args, **options):
+        images = options["images"]
+        requests = options["requests"]
+        # Unsaved instances: only the storage names matter, no database access
+        files = [
+            VentureImages(image=f"venture_images/bench/{index}.jpg").image
+            for index in range(images)
+        ]
+
+        def per_request_ms(resolve, rounds):
+            started = time.perf_counter()
+            for _ in range(rounds):
+                for field_file in files:
+                    resolve(field_file)
+            return (time.perf_counter() - started) * 1000 / rounds
+
+        files[0].url  # build the boto3 client outside the timings
+        before = per_request_ms(lambda field_file: field_file.url, requests)
+
+        media_urls.clear()
+        cold = per_request_ms(media_urls.file_url, 1)
+        warm = per_request_ms(media_urls.file_url, requests)
+
+        self.stdout.write(f"{images} imagens por requisição, {requests} requisições")
+        self.stdout.write(f"  .url direto:            {before:8.3f} ms/requisição")
+        self.stdout.write(f"  file_url (cache vazio): {cold:8.3f} ms/requisição")
+        self.stdout.write(f"  file_url (em cache):    {warm:8.3f} ms/requisição")
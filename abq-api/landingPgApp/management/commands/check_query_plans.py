@@ -0,0 +1,208 @@
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.http import Http404
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from landingPgApp import site_images, views
+from landingPgApp.endpoints import ENDPOINTS
+from landingPgApp.models import (
+    BlogArticle,
+    BlogTag,
+    Ebook,
+    InstructionalVideo,
+    PageSnapshot,
+    ServiceSolicitationTerm,
+    SiteImages,
+    Venture,
+    VentureAmenities,
+    VentureAreas,
+    VentureFloorPlans,
+    VentureHeroHighlight,
+    VentureImages,
+    VentureStatus,
+)
+from landingPgApp.snapshots import snapshot_key
+from landingPgApp.urls import read_urlpatterns
+
+
+# Lookup tables that stay a handful of rows; scanning them is what Postgres should do
+LOOKUP_TABLES = {VentureStatus._meta.db_table, BlogTag._meta.db_table}
+
+
+class Command(BaseCommand):
+    help = (
+        "Popula (dentro de uma transação desfeita ao final) um volume grande de dados, "
+        "roda EXPLAIN nas consultas de cada requisição pública (validadores, snapshot e montagem) e falha se alguma usar Seq Scan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ventures", type=int, default=5000, help="Empreendimentos gerados (padrão: 5000).")
+        parser.add_argument("--images", type=int, default=20, help="Imagens por empreendimento (padrão: 20).")
+        parser.add_argument("--articles", type=int, default=5000, help="Artigos gerados (padrão: 5000).")
+        parser.add_argument("--no-seed", action="store_true", help="Usa os dados atuais em vez de gerar dados.")
+        parser.add_argument("--verbose-plans", action="store_true", help="Imprime o plano de cada consulta.")
+
+    def _seed(self, ventures, images, articles):
+        # Large and selective, like a long-lived catalog: most rows are archived
+        # (invisible, inactive), so only an index avoids reading them all.
+        statuses = VentureStatus.objects.bulk_create(
+            VentureStatus(name=f"Status {index}", order=index, is_visible=index % 2 == 0) for index in range(6)
+        )
+        tags = BlogTag.objects.bulk_create(BlogTag(name=f"Tag {index}") for index in range(10))
+
+        created = Venture.objects.bulk_create(
+            Venture(
+                slug=f"plan-check-{index}",
+                name=f"Venture {index}",
+                short_description="-",
+                location="-",
+                total_units=10,
+                is_visible=index % 20 == 0,
+                homepage_highlight=index % 100 == 0,
+                accepts_service_solicitation=index % 20 == 0,
+                order=index,
+                status=statuses[index % len(statuses)],
+            )
+            for index in range(ventures)
+        )
+        for model, field in ((VentureHeroHighlight, "label"), (VentureAmenities, "icon"), (VentureFloorPlans, "name"), (VentureAreas, "name")):
+            extra = {"info": "-"} if model is VentureHeroHighlight else {"value": "-"} if model is VentureAmenities else {}
+            model.objects.bulk_create(
+                model(venture=venture, **{field: f"{field} {index}"}, **extra)
+                for venture in created for index in range(2)
+            )
+        VentureImages.objects.bulk_create(
+            VentureImages(
+                venture=venture,
+                image=f"venture_images/plan-check/{venture.pk}-{index}.jpg",
+                order=index + 1,
+                is_cover=index == 0,
+                is_high_light=index < 3,
+            )
+            for venture in created for index in range(images)
+        )
+
+        BlogArticle.objects.bulk_create(
+            BlogArticle(
+                title=f"Article {index}",
+                short_description="-",
+                content="-",
+                slug=f"plan-check-{index}",
+                tag=tags[index % len(tags)],
+                is_active=index % 20 == 0,
+            )
+            for index in range(articles)
+        )
+        InstructionalVideo.objects.bulk_create(
+            InstructionalVideo(title=f"Video {index}", video_url="https://example.com", is_active=index % 20 == 0)
+            for index in range(articles // 2)
+        )
+        Ebook.objects.update(is_active=False)
+        Ebook.objects.bulk_create(
+            Ebook(title=f"Ebook {index}", file="ebooks/plan-check.pdf", is_active=index == 0) for index in range(1000)
+        )
+        ServiceSolicitationTerm.objects.update(is_active=False)
+        ServiceSolicitationTerm.objects.bulk_create(
+            ServiceSolicitationTerm(description=f"Termo {index}", text="-", is_active=index == 0) for index in range(1000)
+        )
+        SiteImages.objects.bulk_create(
+            SiteImages(image="site_images/plan-check.jpg", page=SiteImages.SitePage.HOME, is_active=False) for _ in range(2000)
+        )
+
+        # One snapshot per page, as after a rebuild of every endpoint
+        pages = [("venture_detail_page", venture.slug) for venture in created]
+        pages += [("blog_article_details", f"plan-check-{index}") for index in range(articles)]
+        PageSnapshot.objects.bulk_create(
+            (PageSnapshot(key=snapshot_key(name, slug), endpoint=name, slug=slug, body=b"{}") for name, slug in pages),
+            ignore_conflicts=True,
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def _captured_queries(self):
+        # The whole public request path, not just the payload builders: the
+        # validators, the response cache, the snapshot read by primary key and
+        # the rebuild behind it. A private cache keeps the real one untouched.
+        view_for = {}
+        for pattern in read_urlpatterns(views):
+            view_for.setdefault(pattern.callback.endpoint_name, pattern.callback)
+        private_cache = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "check-query-plans"}
+        request = RequestFactory().get("/")
+
+        with override_settings(CACHES={**settings.CACHES, "query-plans": private_cache}, LANDING_API_CACHE_ALIAS="query-plans"):
+            for endpoint in ENDPOINTS.values():
+                slugs = list(endpoint.all_slugs()[:1]) if endpoint.is_slugged else [None]
+                for slug in slugs:
+                    kwargs = {"slug": slug} if endpoint.is_slugged else {}
+                    PageSnapshot.objects.filter(pk=snapshot_key(endpoint.name, slug or "")).delete()
+                    # First GET rebuilds the snapshot, the second reads it back
+                    for _ in range(2):
+                        caches["query-plans"].clear()
+                        # The page images are cached per process; their query must run too
+                        site_images.invalidate()
+                        with CaptureQueriesContext(connection) as captured:
+                            try:
+                                view_for[endpoint.name](request, **kwargs)
+                            except Http404:
+                                pass
+                        for query in captured.captured_queries:
+                            if query["sql"].lstrip().upper().startswith("SELECT"):
+                                yield endpoint.name, query["sql"]
+
+    def _explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+            plan = cursor.fetchone()[0]
+        return (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+
+    def _seq_scans(self, plan):
+        if plan.get("Node Type") == "Seq Scan" and plan["Relation Name"] not in LOOKUP_TABLES:
+            yield plan["Relation Name"]
+        for child in plan.get("Plans", []):
+            yield from self._seq_scans(child)
+
+    def _indexes(self, plan):
+        if "Index Name" in plan:
+            yield plan["Index Name"]
+        for child in plan.get("Plans", []):
+            yield from self._indexes(child)
+
+    def _check(self, options):
+        failures = []
+        seen = set()
+        for endpoint_name, sql in self._captured_queries():
+            if sql in seen:
+                continue
+            seen.add(sql)
+            plan = self._explain(sql)
+
+            tables = sorted(set(self._seq_scans(plan)))
+            if options["verbose_plans"] or tables:
+                self.stdout.write(f"[{endpoint_name}] {sql[:160]}")
+            if options["verbose_plans"]:
+                self.stdout.write(json.dumps(plan, indent=2))
+            if tables:
+                failures.append((endpoint_name, tables))
+                self.stdout.write(self.style.ERROR(f"  Seq Scan em: {', '.join(tables)}"))
+        return len(seen), failures
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Requer PostgreSQL.")
+
+        with transaction.atomic():
+            if not options["no_seed"]:
+                self._seed(options["ventures"], options["images"], options["articles"])
+            checked, failures = self._check(options)
+            # Never keep the generated rows
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"{len(failures)} consulta(s) pública(s) com Seq Scan.")
+        self.stdout.write(self.style.SUCCESS(f"{checked} consulta(s) verificada(s), nenhuma com Seq Scan."))
@@ -0,0 +1,71 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from landingPgApp import orphans
+from landingPgApp.storage import shared_storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove do bucket os objetos de mídia que nenhum registro referencia mais "
+        "(imagens substituídas, empreendimentos excluídos)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Apenas lista os órfãos, sem excluir.")
+        parser.add_argument(
+            "--prefix",
+            action="append",
+            choices=orphans.GC_PREFIXES,
+            help="Limita a um prefixo (pode ser repetido; padrão: todos).",
+        )
+        parser.add_argument(
+            "--min-age",
+            type=float,
+            default=24,
+            help="Ignora objetos modificados há menos de N horas (padrão: 24).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=orphans.MAX_DELETE_BATCH,
+            help="Chaves por chamada DeleteObjects (máx. 1000).",
+        )
+
+    def handle(self, *args, **options):
+        storage = shared_storage()
+        # Honors AWS_S3_ENDPOINT_URL, so a local S3 stand-in works too
+        client = storage.connection.meta.client
+        bucket = storage.bucket_name
+        prefixes = [storage._normalize_name(prefix) for prefix in options["prefix"] or orphans.GC_PREFIXES]
+        modified_before = timezone.now() - datetime.timedelta(hours=options["min_age"])
+
+        referenced = orphans.referenced_keys(storage)
+        self.stdout.write(f"{len(referenced)} chave(s) referenciada(s) no banco.")
+
+        found = {"count": 0, "bytes": 0}
+
+        def orphan_keys():
+            for obj in orphans.find_orphans(client, bucket, prefixes, referenced, modified_before):
+                found["count"] += 1
+                found["bytes"] += obj.get("Size", 0)
+                if options["verbosity"] > 1 or options["dry_run"]:
+                    self.stdout.write(f"  {obj['Key']}")
+                yield obj["Key"]
+
+        if options["dry_run"]:
+            for _ in orphan_keys():
+                pass
+            self.stdout.write(self.style.WARNING(
+                f"[dry-run] {found['count']} órfão(s), {found['bytes'] / 1024 / 1024:.1f} MB."
+            ))
+            return
+
+        deleted, errors = orphans.delete_keys(client, bucket, orphan_keys(), options["batch_size"])
+        for error in errors:
+            self.stderr.write(f"{error.get('Key')}: {error.get('Code')} {error.get('Message')}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{deleted} de {found['count']} órfão(s) excluído(s), {found['bytes'] / 1024 / 1024:.1f} MB."
+        ))
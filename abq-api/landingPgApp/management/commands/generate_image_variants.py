@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from landingPgApp import imaging
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera as variações responsivas (WebP/AVIF em várias larguras) das imagens "
+        "que ainda não as têm ou cujo arquivo mudou."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            action="append",
+            choices=[model.__name__ for model in imaging.VARIANT_FIELDS],
+            help="Limita a um modelo (pode ser repetido).",
+        )
+        parser.add_argument("--force", action="store_true", help="Regera mesmo as variações já existentes.")
+        parser.add_argument("--workers", type=int, default=4, help="Imagens processadas em paralelo (padrão: 4).")
+        parser.add_argument(
+            "--pending",
+            action="store_true",
+            help="Processa só a fila de imagens salvas pelo admin (o mesmo que o cron de variações).",
+        )
+
+    def handle(self, *args, **options):
+        if options["pending"]:
+            stats = imaging.drain()
+            self.stdout.write(self.style.SUCCESS(
+                f"{stats['rendered']} imagem(ns) processada(s), {stats['retried']} a tentar de novo, "
+                f"{stats['failed']} desistida(s)."
+            ))
+            return
+
+        models = [
+            model for model in imaging.VARIANT_FIELDS
+            if not options["model"] or model.__name__ in options["model"]
+        ]
+        pending = []
+        for model in models:
+            field_name = imaging.VARIANT_FIELDS[model]
+            for instance in model.objects.only("pk", field_name, f"{field_name}_variants").iterator():
+                if options["force"] or imaging.needs_variants(instance):
+                    pending.append((model, instance.pk))
+
+        def generate(item):
+            try:
+                return imaging.generate_variants(*item)
+            finally:
+                close_old_connections()
+
+        # Threads download/upload; the resizing itself runs in imaging's process pool
+        failed = 0
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            futures = {executor.submit(generate, item): item for item in pending}
+            for future, (model, pk) in futures.items():
+                try:
+                    variants = future.result()
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(f"{model.__name__} {pk}: {error}")
+                else:
+                    self.stdout.write(f"{model.__name__} {pk}: {len(variants or [])} variação(ões)")
+
+        self.stdout.write(self.style.SUCCESS(f"{len(pending) - failed} imagem(ns) processada(s), {failed} com erro."))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from landingPgApp import snapshots
+from landingPgApp.endpoints import ENDPOINTS
+
+
+class Command(BaseCommand):
+    help = "Reconstrói os snapshots JSON das páginas públicas."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--endpoint",
+            action="append",
+            dest="endpoints",
+            help="Endpoint a reconstruir (pode ser repetido). Padrão: todos.",
+        )
+
+    def handle(self, *args, **options):
+        names = options["endpoints"] or list(ENDPOINTS)
+        unknown = set(names) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f"Endpoint(s) desconhecido(s): {', '.join(sorted(unknown))}")
+
+        for name in names:
+            snapshots.rebuild_endpoint(name)
+            self.stdout.write(f"{name}: ok")
+        self.stdout.write(self.style.SUCCESS("Snapshots reconstruídos."))
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from landingPgApp import outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Envia os e-mails pendentes da fila (formulários de contato e solicitações de serviço) "
+        "por uma única conexão SMTP, com novas tentativas e disjuntor."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Continua rodando e verifica a fila periodicamente.")
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=10,
+            help="Segundos entre verificações da fila com --loop (padrão: 10).",
+        )
+        parser.add_argument("--batch-size", type=int, help="Mensagens reservadas por vez (padrão: EMAIL_OUTBOX_BATCH_SIZE).")
+
+    def _drain(self, options):
+        stats = outbox.drain(batch_size=options["batch_size"])
+        if stats["breaker_open"]:
+            self.stderr.write(f"Disjuntor aberto até {outbox.CircuitBreaker().open_until()}; envio suspenso.")
+        if stats["sent"] or stats["retried"] or stats["failed"] or options["verbosity"] > 1:
+            self.stdout.write(
+                f"{stats['sent']} enviado(s), {stats['retried']} reagendado(s), {stats['failed']} com falha definitiva."
+            )
+
+    def handle(self, *args, **options):
+        if not options["loop"]:
+            self._drain(options)
+            return
+
+        try:
+            while True:
+                self._drain(options)
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("Encerrado.")
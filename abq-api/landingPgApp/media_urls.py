@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.encoding import filepath_to_uri
+from storages.backends.s3 import S3Storage
+from storages.utils import clean_name
+
+
+_lock = threading.Lock()
+_signed = OrderedDict()
+_unsigned_prefixes = {}
+
+
+def _storage_key(storage):
+    return (type(storage), getattr(storage, "bucket_name", None), getattr(storage, "location", ""))
+
+
+def _unsigned_url(storage, name):
+    # Public bucket: every URL is "<prefix><key>", so ask botocore once for the
+    # prefix and build the rest with string concatenation.
+    if storage.custom_domain:
+        return storage.url(name)
+
+    key = _storage_key(storage)
+    prefix = _unsigned_prefixes.get(key)
+    if prefix is None:
+        probe = filepath_to_uri(storage._normalize_name(clean_name("probe")))
+        probe_url = storage.url("probe")
+        prefix = probe_url[: -len(probe)]
+        _unsigned_prefixes[key] = prefix
+    return prefix + filepath_to_uri(storage._normalize_name(clean_name(name)))
+
+
+def _signed_url(storage, name):
+    # Reuse a presigned URL while it still has MEDIA_URL_MIN_LIFETIME seconds
+    # left, so payloads cached downstream never carry an expired link.
+    cache_key = (_storage_key(storage), name)
+    now = time.monotonic()
+    with _lock:
+        cached = _signed.get(cache_key)
+        if cached is not None and cached[1] > now:
+            _signed.move_to_end(cache_key)
+            return cached[0]
+
+    url = storage.url(name)
+    reusable_for = storage.querystring_expire - getattr(settings, "MEDIA_URL_MIN_LIFETIME", 3 * 60 * 60)
+    if reusable_for > 0:
+        with _lock:
+            _signed[cache_key] = (url, now + reusable_for)
+            _signed.move_to_end(cache_key)
+            while len(_signed) > getattr(settings, "MEDIA_URL_CACHE_SIZE", 5000):
+                _signed.popitem(last=False)
+    return url
+
+
+def storage_url(storage, name):
+    if not isinstance(storage, S3Storage):
+        return storage.url(name)
+    if storage.querystring_auth and not storage.cloudfront_signer:
+        return _signed_url(storage, name)
+    if not storage.querystring_auth:
+        return _unsigned_url(storage, name)
+    return storage.url(name)
+
+
+def file_url(field_file):
+    if not field_file:
+        return None
+    return storage_url(field_file.storage, field_file.name)
+
+
+def srcset(field_file, variants):
+    # Variants live next to the original, in the same storage
+    if not field_file:
+        return []
+    return [
+        {
+            "url": storage_url(field_file.storage, variant["name"]),
+            "width": variant["width"],
+            "height": variant["height"],
+            "type": f"image/{variant['format']}",
+        }
+        for variant in variants
+    ]
+
+
+def clear():
+    with _lock:
+        _signed.clear()
+        _unsigned_prefixes.clear()
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:10
+
+import landingPgApp.models
+import storages.backends.s3
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landingPgApp', '0021_venture_accepts_service_solicitation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venture',
+            name='cover_image',
+            field=models.ImageField(blank=True, editable=False, storage=storages.backends.s3.S3Storage(), upload_to=landingPgApp.models.venture_image_upload_to, verbose_name='Imagem de Capa'),
+        ),
+    ]
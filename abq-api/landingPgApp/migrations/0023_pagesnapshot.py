@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landingPgApp', '0022_venture_cover_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageSnapshot',
+            fields=[
+                ('key', models.CharField(max_length=150, primary_key=True, serialize=False)),
+                ('endpoint', models.CharField(db_index=True, max_length=50)),
+                ('slug', models.CharField(blank=True, max_length=100)),
+                ('body', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Snapshot de Página',
+                'verbose_name_plural': 'Snapshots de Páginas',
+            },
+        ),
+    ]
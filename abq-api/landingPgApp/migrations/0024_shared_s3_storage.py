@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:19
+
+import landingPgApp.models
+import landingPgApp.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landingPgApp', '0023_pagesnapshot'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='blogarticle',
+            name='cover_image',
+            field=models.ImageField(blank=True, null=True, storage=landingPgApp.storage.shared_storage, upload_to=landingPgApp.models.blog_article_image_upload_to, verbose_name='Imagem da Capa'),
+        ),
+        migrations.AlterField(
+            model_name='ebook',
+            name='file',
+            field=models.FileField(storage=landingPgApp.storage.shared_storage, upload_to='ebooks/', verbose_name='Arquivo PDF'),
+        ),
+        migrations.AlterField(
+            model_name='instructionalvideo',
+            name='cover_image',
+            field=models.ImageField(blank=True, null=True, storage=landingPgApp.storage.shared_storage, upload_to=landingPgApp.models.blog_article_image_upload_to, verbose_name='Imagem da Capa'),
+        ),
+        migrations.AlterField(
+            model_name='siteimages',
+            name='image',
+            field=models.ImageField(storage=landingPgApp.storage.shared_storage, upload_to=landingPgApp.models.site_image_upload_to, verbose_name='Imagem'),
+        ),
+        migrations.AlterField(
+            model_name='venture',
+            name='cover_image',
+            field=models.ImageField(blank=True, editable=False, storage=landingPgApp.storage.shared_storage, upload_to=landingPgApp.models.venture_image_upload_to, verbose_name='Imagem de Capa'),
+        ),
+        migrations.AlterField(
+            model_name='ventureimages',
+            name='image',
+            field=models.ImageField(storage=landingPgApp.storage.shared_storage, upload_to=landingPgApp.models.venture_image_upload_to, verbose_name='Imagem'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landingPgApp', '0024_shared_s3_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogarticle',
+            name='cover_image_variants',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Variações da Imagem da Capa'),
+        ),
+        migrations.AddField(
+            model_name='instructionalvideo',
+            name='cover_image_variants',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Variações da Imagem da Capa'),
+        ),
+        migrations.AddField(
+            model_name='siteimages',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Variações da Imagem'),
+        ),
+        migrations.AddField(
+            model_name='venture',
+            name='cover_image_variants',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Variações da Imagem de Capa'),
+        ),
+        migrations.AddField(
+            model_name='ventureimages',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Variações da Imagem'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landingPgApp', '0025_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogarticle',
+            name='cover_image_metadata',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Metadados da Imagem da Capa'),
+        ),
+        migrations.AddField(
+            model_name='instructionalvideo',
+            name='cover_image_metadata',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Metadados da Imagem da Capa'),
+        ),
+        migrations.AddField(
+            model_name='siteimages',
+            name='image_metadata',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Metadados da Imagem'),
+        ),
+        migrations.AddField(
+            model_name='venture',
+            name='cover_image_metadata',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Metadados da Imagem de Capa'),
+        ),
+        migrations.AddField(
+            model_name='ventureimages',
+            name='image_metadata',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Metadados da Imagem'),
+        ),
+    ]
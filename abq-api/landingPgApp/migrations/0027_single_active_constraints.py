@@ -0,0 +1,63 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:32
+
+from django.db import migrations, models
+
+
+def keep_single_active(apps, schema_editor):
+    # Existing duplicates would block the constraints. Keep the row the API
+    # already served: first by pk (site images, covers, terms), latest ebook.
+    SiteImages = apps.get_model('landingPgApp', 'SiteImages')
+    for flag in ('is_desktop', 'is_mobile'):
+        seen = set()
+        for image in SiteImages.objects.filter(is_active=True, **{flag: True}).order_by('pk'):
+            if image.page in seen:
+                SiteImages.objects.filter(pk=image.pk).update(**{flag: False})
+            seen.add(image.page)
+
+    VentureImages = apps.get_model('landingPgApp', 'VentureImages')
+    seen = set()
+    for image in VentureImages.objects.filter(is_cover=True).order_by('pk'):
+        if image.venture_id in seen:
+            VentureImages.objects.filter(pk=image.pk).update(is_cover=False)
+        seen.add(image.venture_id)
+
+    Ebook = apps.get_model('landingPgApp', 'Ebook')
+    active = Ebook.objects.filter(is_active=True).order_by('-updated_at').first()
+    if active:
+        Ebook.objects.filter(is_active=True).exclude(pk=active.pk).update(is_active=False)
+
+    ServiceSolicitationTerm = apps.get_model('landingPgApp', 'ServiceSolicitationTerm')
+    active = ServiceSolicitationTerm.objects.filter(is_active=True).order_by('pk').first()
+    if active:
+        ServiceSolicitationTerm.objects.filter(is_active=True).exclude(pk=active.pk).update(is_active=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landingPgApp', '0026_image_metadata'),
+    ]
+
+    operations = [
+        migrations.RunPython(keep_single_active, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='ebook',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('is_active',), name='unique_active_ebook'),
+        ),
+        migrations.AddConstraint(
+            model_name='servicesolicitationterm',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('is_active',), name='unique_active_service_solicitation_term'),
+        ),
+        migrations.AddConstraint(
+            model_name='siteimages',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True), ('is_desktop', True)), fields=('page',), name='unique_active_desktop_site_image'),
+        ),
+        migrations.AddConstraint(
+            model_name='siteimages',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True), ('is_mobile', True)), fields=('page',), name='unique_active_mobile_site_image'),
+        ),
+        migrations.AddConstraint(
+            model_name='ventureimages',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_cover', True)), fields=('venture',), name='unique_cover_image_per_venture'),
+        ),
+    ]
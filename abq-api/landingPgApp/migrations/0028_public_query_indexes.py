@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landingPgApp', '0027_single_active_constraints'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogarticle',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='blogarticle_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='instructionalvideo',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-updated_at'], name='video_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='siteimages',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['id'], name='siteimage_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venture',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['status', 'order', 'name'], name='venture_visible_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venture',
+            index=models.Index(condition=models.Q(('homepage_highlight', True), ('is_visible', True)), fields=['-created_at'], name='venture_home_highlight_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venture',
+            index=models.Index(condition=models.Q(('accepts_service_solicitation', True)), fields=['created_at'], name='venture_service_solic_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ventureimages',
+            index=models.Index(fields=['venture', 'order', 'id'], name='ventureimage_gallery_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landingPgApp', '0029_email_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContactMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Nome')),
+                ('phone', models.CharField(blank=True, max_length=20, verbose_name='Telefone')),
+                ('message', models.TextField(verbose_name='Mensagem')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('outbox_email', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='landingPgApp.outboxemail', verbose_name='E-mail de Notificação')),
+            ],
+            options={
+                'verbose_name': 'Mensagem de Contato',
+                'verbose_name_plural': 'Mensagens de Contato',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['-created_at'], name='contactmessage_created_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ServiceSolicitation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('venture_name', models.CharField(blank=True, max_length=100, verbose_name='Empreendimento Informado')),
+                ('unit', models.CharField(blank=True, max_length=100, verbose_name='Unidade')),
+                ('name', models.CharField(blank=True, max_length=100, verbose_name='Nome')),
+                ('document', models.CharField(blank=True, max_length=150, verbose_name='Documento (CPF/CNPJ)')),
+                ('phone', models.CharField(blank=True, max_length=20, verbose_name='Telefone')),
+                ('email', models.EmailField(blank=True, max_length=100, verbose_name='E-mail')),
+                ('description', models.TextField(blank=True, verbose_name='Descrição')),
+                ('accepted_terms', models.BooleanField(default=False, verbose_name='Aceitou os Termos?')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('outbox_email', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='landingPgApp.outboxemail', verbose_name='E-mail de Notificação')),
+                ('venture', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='service_solicitations', to='landingPgApp.venture', verbose_name='Empreendimento')),
+            ],
+            options={
+                'verbose_name': 'Solicitação de Serviço',
+                'verbose_name_plural': 'Solicitações de Serviço',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['venture', '-created_at'], name='solicitation_venture_idx'), models.Index(fields=['-created_at'], name='solicitation_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:27
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landingPgApp', '0031_idempotency_records'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageVariantJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(max_length=50, verbose_name='Modelo')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Tentativas')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Próxima Tentativa')),
+                ('last_error', models.TextField(blank=True, verbose_name='Último Erro')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Variação de Imagem Pendente',
+                'verbose_name_plural': 'Variações de Imagem Pendentes',
+                'indexes': [models.Index(fields=['next_attempt_at'], name='imagevariantjob_due_idx')],
+                'constraints': [models.UniqueConstraint(fields=('model_name', 'object_id'), name='imagevariantjob_unique_object')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landingPgApp', '0032_image_variant_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CircuitBreakerState',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('failures', models.PositiveIntegerField(default=0, verbose_name='Falhas Seguidas')),
+                ('open_until', models.DateTimeField(blank=True, null=True, verbose_name='Aberto até')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Disjuntor',
+                'verbose_name_plural': 'Disjuntores',
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_covers(apps, schema_editor):
+    # Same values as Venture.cover_image_values(), on the historical models: ventures
+    # created before 0022 would otherwise serve no cover until an admin save
+    Venture = apps.get_model('landingPgApp', 'Venture')
+    VentureImages = apps.get_model('landingPgApp', 'VentureImages')
+    PageSnapshot = apps.get_model('landingPgApp', 'PageSnapshot')
+
+    covers = VentureImages.objects.filter(venture=models.OuterRef('pk'), is_cover=True).order_by('id')
+    Venture.objects.update(
+        cover_image=Coalesce(models.Subquery(covers.values('image')[:1]), models.Value('')),
+        cover_image_variants=Coalesce(
+            models.Subquery(covers.values('image_variants')[:1]),
+            models.Value([], output_field=models.JSONField()),
+        ),
+        cover_image_metadata=Coalesce(
+            models.Subquery(covers.values('image_metadata')[:1]),
+            models.Value({}, output_field=models.JSONField()),
+        ),
+    )
+    # Snapshots rendered with the empty covers; reads rebuild them
+    PageSnapshot.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landingPgApp', '0033_outbox_circuit_breaker'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_covers, migrations.RunPython.noop),
+    ]
@@ -1,23 +1,61 @@
 import datetime
+import hashlib
 import os
 
-from django.db import models
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.db.models.functions import Coalesce
 from django.core.validators import MaxValueValidator
 from django.utils import timezone
 from django.utils.text import slugify
 from django.contrib import admin
 from django.contrib.postgres.fields import ArrayField
 
-from storages.backends.s3boto3 import S3Boto3Storage
-
 from django_ckeditor_5.fields import CKEditor5Field
 
+from .storage import shared_storage
+
+
+def advisory_lock(*key):
+  # Transaction-scoped Postgres advisory lock: serializes writers even when
+  # there is no row to lock yet (e.g. the first active Ebook)
+  with connection.cursor() as cursor:
+    cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [":".join(str(part) for part in key)])
+
+class ExclusiveFlagsMixin:
+  # save() unsets the flag on the previously flagged row before writing this one,
+  # so the partial unique constraints on these flags hold in the database. Form
+  # validation (full_clean) runs before save() and would reject every switch.
+  exclusive_flags = ('is_active',)
+
+  def validate_constraints(self, exclude=None):
+    super().validate_constraints(exclude={*(exclude or ()), *self.exclusive_flags})
+
+def content_addressed_name(instance, folder, ext):
+  # Opt-in via CONTENT_ADDRESSED_UPLOADS: "<folder>/<sha256><ext>" for the file
+  # being uploaded, so the same photo is stored once and served as immutable.
+  for field in instance._meta.fields:
+    if isinstance(field, models.FileField):
+      field_file = getattr(instance, field.attname)
+      upload = getattr(field_file, '_file', None)
+      if field_file and not field_file._committed and upload is not None:
+        digest = hashlib.sha256()
+        for chunk in upload.chunks():
+          digest.update(chunk)
+        upload.seek(0)
+        return f"{folder}/{digest.hexdigest()}{ext}"
+  return None
 
 def venture_image_upload_to(instance, filename):
   folder = 'venture_images'
   _, ext = os.path.splitext(filename)
   ext = (ext or '').lower() or '.img'
 
+  if getattr(settings, 'CONTENT_ADDRESSED_UPLOADS', False):
+    name = content_addressed_name(instance, folder, ext)
+    if name:
+      return name
+
   venture = getattr(instance, 'venture', None)
   if venture is not None:
     venture_id = getattr(venture, 'id', 'noid')
@@ -36,6 +74,11 @@ def site_image_upload_to(instance, filename):
   _, ext = os.path.splitext(filename)
   ext = (ext or '').lower() or '.img'
 
+  if getattr(settings, 'CONTENT_ADDRESSED_UPLOADS', False):
+    name = content_addressed_name(instance, folder, ext)
+    if name:
+      return name
+
   page = getattr(instance, 'page', None)
   if page:
     prefix = slugify(page)
@@ -52,6 +95,11 @@ def blog_article_image_upload_to(instance, filename):
   _, ext = os.path.splitext(filename)
   ext = (ext or '').lower() or '.img'
 
+  if getattr(settings, 'CONTENT_ADDRESSED_UPLOADS', False):
+    name = content_addressed_name(instance, folder, ext)
+    if name:
+      return name
+
   article = getattr(instance, 'article', None)
   if article is not None:
     article_id = getattr(article, 'id', 'noid')
@@ -181,6 +229,11 @@ class Venture(models.Model):
   status = models.ForeignKey(VentureStatus, on_delete=models.SET_NULL, null=True, blank=True, related_name='ventures')
   category = models.ForeignKey(VentureCategory, on_delete=models.SET_NULL, null=True, blank=True, related_name='ventures')
 
+  # Cópia desnormalizada da imagem de capa (mantida por VentureImages)
+  cover_image = models.ImageField(storage=shared_storage, upload_to=venture_image_upload_to, blank=True, editable=False, verbose_name="Imagem de Capa")
+  cover_image_variants = models.JSONField(default=list, blank=True, editable=False, verbose_name="Variações da Imagem de Capa")
+  cover_image_metadata = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Metadados da Imagem de Capa")
+
   created_at = models.DateTimeField(auto_now_add=True)
   updated_at = models.DateTimeField(auto_now=True)
 
@@ -188,14 +241,46 @@ class Venture(models.Model):
     verbose_name = "Empreendimento"
     verbose_name_plural = "..Empreendimentos"
     ordering = ['order', 'name']
+    # parciais: só cobrem as linhas que as páginas públicas consultam
+    indexes = [
+      models.Index(fields=['status', 'order', 'name'], condition=models.Q(is_visible=True), name='venture_visible_status_idx'),
+      models.Index(fields=['-created_at'], condition=models.Q(homepage_highlight=True, is_visible=True), name='venture_home_highlight_idx'),
+      models.Index(fields=['created_at'], condition=models.Q(accepts_service_solicitation=True), name='venture_service_solic_idx'),
+    ]
 
 
   def __str__(self):
     return self.name
+
+  @staticmethod
+  def cover_image_values():
+    covers = VentureImages.objects.filter(venture=models.OuterRef('pk'), is_cover=True).order_by('id')
+    return {
+      'cover_image': Coalesce(models.Subquery(covers.values('image')[:1]), models.Value('')),
+      'cover_image_variants': Coalesce(
+        models.Subquery(covers.values('image_variants')[:1]),
+        models.Value([], output_field=models.JSONField()),
+      ),
+      'cover_image_metadata': Coalesce(
+        models.Subquery(covers.values('image_metadata')[:1]),
+        models.Value({}, output_field=models.JSONField()),
+      ),
+    }
+
+  @classmethod
+  def lock(cls, venture_id):
+    # Row lock on the venture, held until the surrounding transaction ends
+    list(cls.objects.select_for_update().filter(pk=venture_id).values_list('pk', flat=True))
+
+  @classmethod
+  def sync_cover_image(cls, venture_id):
+    cls.objects.filter(pk=venture_id).update(**cls.cover_image_values())
   
-class VentureImages(models.Model):
+class VentureImages(ExclusiveFlagsMixin, models.Model):
   venture = models.ForeignKey(Venture, on_delete=models.CASCADE, related_name='images', verbose_name="Empreendimento")
-  image = models.ImageField(storage=S3Boto3Storage(), upload_to=venture_image_upload_to, verbose_name="Imagem")
+  image = models.ImageField(storage=shared_storage, upload_to=venture_image_upload_to, verbose_name="Imagem")
+  image_variants = models.JSONField(default=list, blank=True, editable=False, verbose_name="Variações da Imagem")
+  image_metadata = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Metadados da Imagem")
   caption = models.CharField(max_length=200, blank=True, verbose_name="Legenda")
   is_cover = models.BooleanField(default=False, verbose_name="Imagem de Capa")
   is_high_light = models.BooleanField(default=False, verbose_name="Imagem destacada")
@@ -208,10 +293,19 @@ class VentureImages(models.Model):
   created_at = models.DateTimeField(auto_now_add=True)
   updated_at = models.DateTimeField(auto_now=True)
 
+  exclusive_flags = ('is_cover',)
 
-
+  @transaction.atomic
   def save(self, *args, **kwargs):
-      # Ensure only one cover image per venture
+      # Serialize order changes per venture (concurrent editors, bulk uploads)
+      Venture.lock(self.venture_id)
+
+      previous_venture_id = (
+          VentureImages.objects.filter(pk=self.pk).values_list('venture_id', flat=True).first()
+          if self.pk else None
+      )
+
+      # Only one cover per venture (unique_cover_image_per_venture): unset the previous one
       if self.is_cover:
           VentureImages.objects.filter(venture=self.venture, is_cover=True).exclude(pk=self.pk).update(is_cover=False)
 
@@ -225,24 +319,56 @@ class VentureImages(models.Model):
           ) or 0
           self.order = max_order + 1
 
-      # If another image in the same venture already has this order, shift subsequent ones
-      if VentureImages.objects.filter(venture=self.venture, order=self.order).exclude(pk=self.pk).exists():
-          to_reorder = VentureImages.objects.filter(venture=self.venture, order__gte=self.order).exclude(pk=self.pk).order_by('-order')
-          for item in to_reorder:
-              item.order = (item.order or 0) + 1
-              super(VentureImages, item).save(update_fields=['order'])
+      # If another image in the same venture already has this order, shift subsequent ones in one UPDATE
+      siblings = VentureImages.objects.filter(venture=self.venture).exclude(pk=self.pk)
+      if siblings.filter(order=self.order).exists():
+          siblings.filter(order__gte=self.order).update(order=models.F('order') + 1, updated_at=timezone.now())
 
+      # post_save invalidates the new venture's pages; signals reads this for the old one's
+      moved = bool(previous_venture_id) and previous_venture_id != self.venture_id
+      self._moved_from_venture_id = previous_venture_id if moved else None
       super().save(*args, **kwargs)
 
+      # Keep the denormalized Venture.cover_image in sync (also when moved between ventures)
+      Venture.sync_cover_image(self.venture_id)
+      if moved:
+          Venture.sync_cover_image(previous_venture_id)
+
+  @classmethod
+  @transaction.atomic
+  def apply_order(cls, venture_id, image_ids):
+    # Drag-and-drop reorder: image_ids must list every image of the venture, in the new order
+    Venture.lock(venture_id)
+    images = {image.pk: image for image in cls.objects.filter(venture_id=venture_id).only('pk', 'order')}
+    if len(image_ids) != len(images) or set(image_ids) != set(images):
+      raise ValueError("image_ids must contain every image of the venture exactly once")
+
+    now = timezone.now()
+    changed = []
+    for position, image_id in enumerate(image_ids, start=1):
+      image = images[image_id]
+      if image.order != position:
+        image.order = position
+        image.updated_at = now
+        changed.append(image)
+    cls.objects.bulk_update(changed, ['order', 'updated_at'])
+    return changed
+
 
   class Meta:
     verbose_name = "Imagem do Empreendimento"
     verbose_name_plural = "Imagens dos Empreendimentos"
+    indexes = [
+      models.Index(fields=['venture', 'order', 'id'], name='ventureimage_gallery_idx'),
+    ]
+    constraints = [
+      models.UniqueConstraint(fields=['venture'], condition=models.Q(is_cover=True), name='unique_cover_image_per_venture'),
+    ]
 
   def __str__(self):
      return self.image.name
   
-class SiteImages(models.Model):
+class SiteImages(ExclusiveFlagsMixin, models.Model):
   class SitePage(models.TextChoices):
     HOME = "home", "Home"
     VENTURES = "ventures", "Nossas Obras"
@@ -251,7 +377,9 @@ class SiteImages(models.Model):
     BLOG = "blog", "Blog"
     SERVICE_SOLICITATION = "service_solicitation", "Solicitação de Serviços"
 
-  image = models.ImageField(storage=S3Boto3Storage(), upload_to=site_image_upload_to, verbose_name="Imagem")
+  image = models.ImageField(storage=shared_storage, upload_to=site_image_upload_to, verbose_name="Imagem")
+  image_variants = models.JSONField(default=list, blank=True, editable=False, verbose_name="Variações da Imagem")
+  image_metadata = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Metadados da Imagem")
   description = models.CharField(max_length=200, blank=True, verbose_name="Descrição")
   page = models.CharField(
     max_length=30,
@@ -267,13 +395,16 @@ class SiteImages(models.Model):
   created_at = models.DateTimeField(auto_now_add=True)
   updated_at = models.DateTimeField(auto_now=True)
 
+  @transaction.atomic
   def save(self, *args, **kwargs):
       # Imagem sem ambiente definido deve ser inativa
       if not self.is_desktop and not self.is_mobile:
           self.is_active = False
 
       if self.is_active:
-          # Garante apenas uma imagem ativa por ambiente (desktop/mobile) por página
+          # Garante apenas uma imagem ativa por ambiente (desktop/mobile) por página;
+          # as constraints parciais impedem duplicatas, o lock serializa as trocas
+          advisory_lock('siteimages', self.page)
           if self.is_desktop:
               SiteImages.objects.filter(page=self.page, is_active=True, is_desktop=True).exclude(pk=self.pk).update(is_desktop=False)
           if self.is_mobile:
@@ -284,6 +415,13 @@ class SiteImages(models.Model):
   class Meta:
     verbose_name = "Imagem do Site"
     verbose_name_plural = "Imagens do Site"
+    indexes = [
+      models.Index(fields=['id'], condition=models.Q(is_active=True), name='siteimage_active_idx'),
+    ]
+    constraints = [
+      models.UniqueConstraint(fields=['page'], condition=models.Q(is_active=True, is_desktop=True), name='unique_active_desktop_site_image'),
+      models.UniqueConstraint(fields=['page'], condition=models.Q(is_active=True, is_mobile=True), name='unique_active_mobile_site_image'),
+    ]
 
   def __str__(self):
      return f"{self.get_page_display()} - {self.image.name}"
@@ -295,7 +433,9 @@ class BlogArticle(models.Model):
   content = CKEditor5Field('Content', config_name='extends')
   slug = models.SlugField(unique=True, verbose_name="Slug")
   tag = models.ForeignKey('BlogTag', on_delete=models.SET_NULL, null=True, blank=True, related_name='articles', verbose_name="Tag")
-  cover_image = models.ImageField(storage=S3Boto3Storage(), upload_to=blog_article_image_upload_to, verbose_name="Imagem da Capa", null=True, blank=True)
+  cover_image = models.ImageField(storage=shared_storage, upload_to=blog_article_image_upload_to, verbose_name="Imagem da Capa", null=True, blank=True)
+  cover_image_variants = models.JSONField(default=list, blank=True, editable=False, verbose_name="Variações da Imagem da Capa")
+  cover_image_metadata = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Metadados da Imagem da Capa")
   is_highlight = models.BooleanField(default=False, verbose_name="Artigo em Destaque?")
   is_active = models.BooleanField(default=True, verbose_name="Artigo Ativo?")
 
@@ -305,6 +445,9 @@ class BlogArticle(models.Model):
   class Meta:
     verbose_name = "Artigo do Blog"
     verbose_name_plural = "..Artigos do Blog"
+    indexes = [
+      models.Index(fields=['-created_at'], condition=models.Q(is_active=True), name='blogarticle_active_idx'),
+    ]
 
   def __str__(self):
     return self.title
@@ -325,7 +468,9 @@ class BlogTag(models.Model):
 class InstructionalVideo(models.Model):
   title = models.CharField(max_length=200, verbose_name="Título")
   video_url = models.URLField(max_length=500, verbose_name="URL do Vídeo")
-  cover_image = models.ImageField(storage=S3Boto3Storage(), upload_to=blog_article_image_upload_to, verbose_name="Imagem da Capa", null=True, blank=True)
+  cover_image = models.ImageField(storage=shared_storage, upload_to=blog_article_image_upload_to, verbose_name="Imagem da Capa", null=True, blank=True)
+  cover_image_variants = models.JSONField(default=list, blank=True, editable=False, verbose_name="Variações da Imagem da Capa")
+  cover_image_metadata = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Metadados da Imagem da Capa")
   is_active = models.BooleanField(default=True, verbose_name="Vídeo Ativo?")
 
   created_at = models.DateTimeField(auto_now_add=True)
@@ -334,33 +479,41 @@ class InstructionalVideo(models.Model):
   class Meta:
     verbose_name = "Vídeo Instrucional"
     verbose_name_plural = "Vídeos Instrucionais"
+    indexes = [
+      models.Index(fields=['-updated_at'], condition=models.Q(is_active=True), name='video_active_idx'),
+    ]
 
   def __str__(self):
     return self.title
 
 
-class Ebook(models.Model):
+class Ebook(ExclusiveFlagsMixin, models.Model):
   title = models.CharField(max_length=200, verbose_name="Título")
-  file = models.FileField(storage=S3Boto3Storage(), upload_to="ebooks/", verbose_name="Arquivo PDF")
+  file = models.FileField(storage=shared_storage, upload_to="ebooks/", verbose_name="Arquivo PDF")
   is_active = models.BooleanField(default=True, verbose_name="Ativo?")
 
   created_at = models.DateTimeField(auto_now_add=True)
   updated_at = models.DateTimeField(auto_now=True)
 
+  @transaction.atomic
   def save(self, *args, **kwargs):
-      # Garante apenas um ebook ativo por vez
+      # Garante apenas um ebook ativo por vez (unique_active_ebook)
       if self.is_active:
+          advisory_lock('ebook')
           Ebook.objects.filter(is_active=True).exclude(pk=self.pk).update(is_active=False)
       super().save(*args, **kwargs)
 
   class Meta:
     verbose_name = "Ebook"
     verbose_name_plural = "Ebooks"
+    constraints = [
+      models.UniqueConstraint(fields=['is_active'], condition=models.Q(is_active=True), name='unique_active_ebook'),
+    ]
 
   def __str__(self):
     return self.title
   
-class ServiceSolicitationTerm(models.Model):
+class ServiceSolicitationTerm(ExclusiveFlagsMixin, models.Model):
   description = models.CharField(max_length=80, verbose_name='Descrição')
   text = CKEditor5Field('Texto do Termo', config_name='extends')
   is_active = models.BooleanField(default=True, verbose_name='Texto Ativo?')
@@ -368,11 +521,182 @@ class ServiceSolicitationTerm(models.Model):
   created_at = models.DateTimeField(auto_now_add=True)
   updated_at = models.DateTimeField(auto_now=True)
 
+  @transaction.atomic
   def save(self, *args, **kargs):
     if self.is_active:
+      advisory_lock('servicesolicitationterm')
       ServiceSolicitationTerm.objects.filter(is_active=True).exclude(pk=self.pk).update(is_active=False)
     super().save(*args,**kargs)
 
   class Meta:
     verbose_name = 'Termo de Solicitação de Serviço'
     verbose_name_plural = 'Termos de Solicitação de Serviço'
+    constraints = [
+      models.UniqueConstraint(fields=['is_active'], condition=models.Q(is_active=True), name='unique_active_service_solicitation_term'),
+    ]
+
+
+class PageSnapshot(models.Model):
+  # "<endpoint>:<slug>" so a read is a single primary-key lookup
+  key = models.CharField(max_length=150, primary_key=True)
+  endpoint = models.CharField(max_length=50, db_index=True)
+  slug = models.CharField(max_length=100, blank=True)
+  body = models.BinaryField()
+
+  updated_at = models.DateTimeField(auto_now=True)
+
+  class Meta:
+    verbose_name = 'Snapshot de Página'
+    verbose_name_plural = 'Snapshots de Páginas'
+
+  def __str__(self):
+    return self.key
+
+
+class OutboxEmail(models.Model):
+  # Forms only write here; the send_outbox_emails worker delivers over SMTP
+  class Status(models.TextChoices):
+    PENDING = "pending", "Pendente"
+    SENT = "sent", "Enviado"
+    FAILED = "failed", "Falhou"
+
+  subject = models.CharField(max_length=255, verbose_name='Assunto')
+  body = models.TextField(verbose_name='Corpo')
+  html_body = models.TextField(blank=True, verbose_name='Corpo HTML')
+  from_email = models.CharField(max_length=255, verbose_name='Remetente')
+  recipients = ArrayField(base_field=models.EmailField(), default=list, verbose_name='Destinatários')
+  status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING, verbose_name='Situação')
+  attempts = models.PositiveIntegerField(default=0, verbose_name='Tentativas')
+  # also the claim lease: a worker pushes it forward while a message is in flight
+  next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='Próxima Tentativa')
+  last_error = models.TextField(blank=True, verbose_name='Último Erro')
+  sent_at = models.DateTimeField(null=True, blank=True, verbose_name='Enviado em')
+
+  created_at = models.DateTimeField(auto_now_add=True)
+  updated_at = models.DateTimeField(auto_now=True)
+
+  class Meta:
+    verbose_name = 'E-mail na Fila'
+    verbose_name_plural = 'Fila de E-mails'
+    ordering = ['-created_at']
+    indexes = [
+      models.Index(fields=['next_attempt_at'], condition=models.Q(status='pending'), name='outbox_pending_idx'),
+    ]
+
+  def __str__(self):
+    return self.subject
+
+
+class CircuitBreakerState(models.Model):
+  # Outbox circuit breaker (landingPgApp.outbox.CircuitBreaker). In the database so
+  # every serverless instance and cron call sees an open circuit, not just the one
+  # that tripped it.
+  name = models.CharField(max_length=50, primary_key=True)
+  failures = models.PositiveIntegerField(default=0, verbose_name='Falhas Seguidas')
+  open_until = models.DateTimeField(null=True, blank=True, verbose_name='Aberto até')
+
+  updated_at = models.DateTimeField(auto_now=True)
+
+  class Meta:
+    verbose_name = 'Disjuntor'
+    verbose_name_plural = 'Disjuntores'
+
+  def __str__(self):
+    return self.name
+
+
+class ServiceSolicitation(models.Model):
+  # venture_name is what the form sent; venture is set when it matches a registered one
+  venture = models.ForeignKey(Venture, on_delete=models.SET_NULL, null=True, blank=True, related_name='service_solicitations', verbose_name='Empreendimento')
+  venture_name = models.CharField(max_length=100, blank=True, verbose_name='Empreendimento Informado')
+  unit = models.CharField(max_length=100, blank=True, verbose_name='Unidade')
+  name = models.CharField(max_length=100, blank=True, verbose_name='Nome')
+  document = models.CharField(max_length=150, blank=True, verbose_name='Documento (CPF/CNPJ)')
+  phone = models.CharField(max_length=20, blank=True, verbose_name='Telefone')
+  email = models.EmailField(max_length=100, blank=True, verbose_name='E-mail')
+  description = models.TextField(blank=True, verbose_name='Descrição')
+  accepted_terms = models.BooleanField(default=False, verbose_name='Aceitou os Termos?')
+  outbox_email = models.ForeignKey(OutboxEmail, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name='E-mail de Notificação')
+
+  created_at = models.DateTimeField(auto_now_add=True)
+  updated_at = models.DateTimeField(auto_now=True)
+
+  class Meta:
+    verbose_name = 'Solicitação de Serviço'
+    verbose_name_plural = 'Solicitações de Serviço'
+    ordering = ['-created_at']
+    indexes = [
+      models.Index(fields=['venture', '-created_at'], name='solicitation_venture_idx'),
+      models.Index(fields=['-created_at'], name='solicitation_created_idx'),
+    ]
+
+  def __str__(self):
+    return f"{self.name or '(sem nome)'} - {self.venture_name}"
+
+
+class ContactMessage(models.Model):
+  name = models.CharField(max_length=100, verbose_name='Nome')
+  phone = models.CharField(max_length=20, blank=True, verbose_name='Telefone')
+  message = models.TextField(verbose_name='Mensagem')
+  outbox_email = models.ForeignKey(OutboxEmail, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name='E-mail de Notificação')
+
+  created_at = models.DateTimeField(auto_now_add=True)
+  updated_at = models.DateTimeField(auto_now=True)
+
+  class Meta:
+    verbose_name = 'Mensagem de Contato'
+    verbose_name_plural = 'Mensagens de Contato'
+    ordering = ['-created_at']
+    indexes = [
+      models.Index(fields=['-created_at'], name='contactmessage_created_idx'),
+    ]
+
+  def __str__(self):
+    return self.name
+
+
+class IdempotencyRecord(models.Model):
+  # Responses of the public form endpoints, kept for replay (landingPgApp.idempotency).
+  # A table rather than the cache: every serverless instance must see the same keys.
+  key = models.CharField(max_length=150, primary_key=True)
+  fingerprint = models.CharField(max_length=64, blank=True)
+  # Null while the first request is still running
+  status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+  content = models.BinaryField(default=bytes)
+  content_type = models.CharField(max_length=100, blank=True)
+  expires_at = models.DateTimeField(db_index=True)
+
+  created_at = models.DateTimeField(auto_now_add=True)
+
+  class Meta:
+    verbose_name = 'Resposta Idempotente'
+    verbose_name_plural = 'Respostas Idempotentes'
+
+  def __str__(self):
+    return self.key
+
+
+class ImageVariantJob(models.Model):
+  # Images waiting for their responsive variants (landingPgApp.imaging). Saves only
+  # queue a row; the cron drain or generate_image_variants --pending renders them.
+  model_name = models.CharField(max_length=50, verbose_name='Modelo')
+  object_id = models.PositiveBigIntegerField(verbose_name='ID')
+  attempts = models.PositiveIntegerField(default=0, verbose_name='Tentativas')
+  # also the claim lease, as in OutboxEmail
+  next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='Próxima Tentativa')
+  last_error = models.TextField(blank=True, verbose_name='Último Erro')
+
+  created_at = models.DateTimeField(auto_now_add=True)
+
+  class Meta:
+    verbose_name = 'Variação de Imagem Pendente'
+    verbose_name_plural = 'Variações de Imagem Pendentes'
+    constraints = [
+      models.UniqueConstraint(fields=['model_name', 'object_id'], name='imagevariantjob_unique_object'),
+    ]
+    indexes = [
+      models.Index(fields=['next_attempt_at'], name='imagevariantjob_due_idx'),
+    ]
+
+  def __str__(self):
+    return f"{self.model_name} {self.object_id}"
@@ -0,0 +1,70 @@
+from django.apps import apps
+from django.db import models
+from storages.utils import clean_name
+
+
+GC_PREFIXES = ("venture_images/", "site_images/", "blog_articles/", "ebooks/")
+# DeleteObjects accepts at most 1000 keys per call
+MAX_DELETE_BATCH = 1000
+
+
+def referenced_keys(storage):
+    # Every S3 key the database still points at: file fields plus the width
+    # variants stored next to them. One streamed query per model.
+    keys = set()
+    for model in apps.get_app_config("landingPgApp").get_models():
+        field_names = {field.name for field in model._meta.concrete_fields}
+        file_fields = [
+            field.name for field in model._meta.concrete_fields
+            if isinstance(field, models.FileField) and field.storage is storage
+        ]
+        variant_fields = [f"{name}_variants" for name in file_fields if f"{name}_variants" in field_names]
+        if not file_fields:
+            continue
+
+        rows = model.objects.values_list(*file_fields, *variant_fields).iterator(chunk_size=2000)
+        for row in rows:
+            names = [name for name in row[:len(file_fields)] if name]
+            for variants in row[len(file_fields):]:
+                names.extend(variant["name"] for variant in variants or [])
+            keys.update(storage._normalize_name(clean_name(name)) for name in names)
+    return keys
+
+
+def iter_objects(client, bucket, prefixes):
+    paginator = client.get_paginator("list_objects_v2")
+    for prefix in prefixes:
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            yield from page.get("Contents", [])
+
+
+def find_orphans(client, bucket, prefixes, referenced, modified_before):
+    # Objects newer than modified_before are skipped: their row may not be
+    # committed yet (admin saves, presigned uploads).
+    for obj in iter_objects(client, bucket, prefixes):
+        if obj["Key"] not in referenced and obj["LastModified"] < modified_before:
+            yield obj
+
+
+def delete_keys(client, bucket, keys, batch_size=MAX_DELETE_BATCH):
+    batch_size = min(batch_size, MAX_DELETE_BATCH)
+    deleted, errors = 0, []
+
+    def flush(batch):
+        response = client.delete_objects(
+            Bucket=bucket,
+            Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+        )
+        failed = response.get("Errors", [])
+        errors.extend(failed)
+        return len(batch) - len(failed)
+
+    batch = []
+    for key in keys:
+        batch.append(key)
+        if len(batch) == batch_size:
+            deleted += flush(batch)
+            batch = []
+    if batch:
+        deleted += flush(batch)
+    return deleted, errors
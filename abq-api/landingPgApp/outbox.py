@@ -0,0 +1,198 @@
+import contextlib
+import datetime
+import logging
+import smtplib
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CircuitBreakerState, OutboxEmail
+
+
+logger = logging.getLogger(__name__)
+
+BREAKER_NAME = "email_outbox"
+
+# Errors that concern one message only: retry that message and carry on.
+# Any other SMTP or socket error (server down, timeout, bad credentials, sender
+# refused) would fail the next message the same way, so it aborts the pass and
+# counts against the circuit breaker.
+MESSAGE_ERRORS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPDataError,
+    smtplib.SMTPNotSupportedError,
+)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue(subject, message, from_email, recipient_list, html_message=""):
+    # Same arguments as send_mail
+    email = OutboxEmail.objects.create(
+        subject=subject,
+        body=message,
+        html_body=html_message or "",
+        from_email=from_email,
+        recipients=list(recipient_list),
+    )
+    if _setting("EMAIL_OUTBOX_SEND_ON_COMMIT", False):
+        # Opt-in: try this message once the row is committed, still inside the
+        # request, so with a short timeout; a failure leaves it to the drain
+        timeout = _setting("EMAIL_OUTBOX_INLINE_TIMEOUT", 5)
+        transaction.on_commit(lambda: drain(ids=[email.pk], timeout=timeout), robust=True)
+    return email
+
+
+def requeue(queryset):
+    # Back to pending with a fresh attempt budget; sent messages are sent again
+    now = timezone.now()
+    return queryset.update(status=OutboxEmail.Status.PENDING, attempts=0, next_attempt_at=now, updated_at=now)
+
+
+def retry_delay(attempts):
+    base = _setting("EMAIL_OUTBOX_RETRY_BASE", 60)
+    return datetime.timedelta(seconds=min(base * 2 ** (attempts - 1), _setting("EMAIL_OUTBOX_RETRY_MAX", 3600)))
+
+
+class CircuitBreaker:
+    # Kept in the database (CircuitBreakerState) so every instance and cron call
+    # shares it: a cold instance must not pay the SMTP timeout again.
+
+    def __init__(self, threshold=None, cooldown=None, name=BREAKER_NAME):
+        self.threshold = threshold or _setting("EMAIL_OUTBOX_BREAKER_THRESHOLD", 3)
+        self.cooldown = cooldown or _setting("EMAIL_OUTBOX_BREAKER_COOLDOWN", 300)
+        self.name = name
+
+    def open_until(self):
+        return (
+            CircuitBreakerState.objects.filter(name=self.name, open_until__gt=timezone.now())
+            .values_list("open_until", flat=True)
+            .first()
+        )
+
+    def record_success(self):
+        CircuitBreakerState.objects.filter(name=self.name).delete()
+
+    def record_failure(self):
+        # After the cooldown one pass is let through (half-open); failing again reopens at once
+        with transaction.atomic():
+            state, _ = CircuitBreakerState.objects.select_for_update().get_or_create(name=self.name)
+            state.failures += 1
+            if state.failures >= self.threshold:
+                state.open_until = timezone.now() + datetime.timedelta(seconds=self.cooldown)
+                logger.warning("Email outbox circuit open for %ss after %s failures", self.cooldown, state.failures)
+            state.save()
+
+
+def claim(batch_size, ids=None):
+    # Push next_attempt_at forward as a lease: concurrent workers skip these rows,
+    # and a worker that dies mid-send leaves them to be retried once it expires.
+    now = timezone.now()
+    lease = datetime.timedelta(seconds=_setting("EMAIL_OUTBOX_LEASE", 300))
+    due = OutboxEmail.objects.filter(status=OutboxEmail.Status.PENDING, next_attempt_at__lte=now)
+    if ids is not None:
+        due = due.filter(pk__in=ids)
+    with transaction.atomic():
+        ids = list(
+            due.select_for_update(skip_locked=True)
+            .order_by("next_attempt_at", "pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        OutboxEmail.objects.filter(pk__in=ids).update(next_attempt_at=now + lease)
+    return list(OutboxEmail.objects.filter(pk__in=ids).order_by("pk"))
+
+
+def _message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.recipients,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, "text/html")
+    return message
+
+
+def _mark_sent(email):
+    now = timezone.now()
+    OutboxEmail.objects.filter(pk=email.pk).update(
+        status=OutboxEmail.Status.SENT, attempts=email.attempts + 1, sent_at=now, last_error="", updated_at=now
+    )
+
+
+def _mark_failed(email, error, permanent=False):
+    # Returns True when the message is given up on
+    now = timezone.now()
+    attempts = email.attempts + 1
+    give_up = permanent or attempts >= _setting("EMAIL_OUTBOX_MAX_ATTEMPTS", 8)
+    OutboxEmail.objects.filter(pk=email.pk).update(
+        status=OutboxEmail.Status.FAILED if give_up else OutboxEmail.Status.PENDING,
+        attempts=attempts,
+        next_attempt_at=now if give_up else now + retry_delay(attempts),
+        last_error=f"{type(error).__name__}: {error}"[:2000],
+        updated_at=now,
+    )
+    return give_up
+
+
+def _release(emails, error):
+    # An outage is not the messages' fault: hand them back without spending an attempt
+    OutboxEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+        next_attempt_at=timezone.now(), last_error=f"{type(error).__name__}: {error}"[:2000]
+    )
+
+
+def drain(connection=None, batch_size=None, breaker=None, ids=None, max_batches=None, timeout=None):
+    # One pass over everything due (or only `ids`, at most `max_batches` claims),
+    # over a single connection that is opened lazily and closed when the queue
+    # is empty or the pass aborts. `timeout` overrides EMAIL_TIMEOUT.
+    stats = {"sent": 0, "retried": 0, "failed": 0, "breaker_open": False}
+    breaker = breaker or CircuitBreaker()
+    if breaker.open_until():
+        stats["breaker_open"] = True
+        return stats
+
+    batch_size = batch_size or _setting("EMAIL_OUTBOX_BATCH_SIZE", 50)
+    if connection is None:
+        connection = get_connection(fail_silently=False, **({"timeout": timeout} if timeout else {}))
+    try:
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            batch = claim(batch_size, ids)
+            if not batch:
+                return stats
+            batches += 1
+            for index, email in enumerate(batch):
+                if not email.recipients:
+                    _mark_failed(email, ValueError("no recipients"), permanent=True)
+                    stats["failed"] += 1
+                    continue
+                try:
+                    connection.open()
+                    connection.send_messages([_message(email, connection)])
+                except MESSAGE_ERRORS as error:
+                    stats["failed" if _mark_failed(email, error) else "retried"] += 1
+                except OSError as error:
+                    # SMTPException subclasses OSError, so this must follow MESSAGE_ERRORS
+                    _release(batch[index:], error)
+                    breaker.record_failure()
+                    stats["breaker_open"] = breaker.open_until() is not None
+                    logger.warning("Email outbox pass aborted: %s", error)
+                    return stats
+                except Exception as error:
+                    logger.exception("Email outbox message %s failed", email.pk)
+                    stats["failed" if _mark_failed(email, error) else "retried"] += 1
+                else:
+                    _mark_sent(email)
+                    breaker.record_success()
+                    stats["sent"] += 1
+        return stats
+    finally:
+        with contextlib.suppress(OSError):
+            connection.close()
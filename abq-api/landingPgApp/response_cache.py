@@ -0,0 +1,243 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.http import Http404, HttpResponse
+
+from .endpoints import ENDPOINTS
+
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "landing-api"
+
+_stats_lock = threading.Lock()
+_stats = Counter()
+_warned_per_process = False
+
+
+def _cache():
+    return caches[getattr(settings, "LANDING_API_CACHE_ALIAS", "default")]
+
+
+def is_per_process(cache):
+    return isinstance(cache, LocMemCache)
+
+
+def _warn_if_per_process(cache):
+    # System checks don't run on serverless deploys, so say it in the logs too
+    global _warned_per_process
+    if not _warned_per_process and not settings.DEBUG and is_per_process(cache):
+        _warned_per_process = True
+        logger.warning(
+            "Response cache %r is per process: other instances keep serving stale pages after a save",
+            getattr(settings, "LANDING_API_CACHE_ALIAS", "default"),
+        )
+
+
+def _version_key(model):
+    return f"{KEY_PREFIX}:model-version:{model._meta.label_lower}"
+
+
+def model_versions(models):
+    cache = _cache()
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Seed evicted/unknown versions with a fresh timestamp so they can
+            # never collide with a version used by an older cache entry.
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_model_version(model):
+    # A timestamp rather than incr(): conditional.py also derives Last-Modified from it
+    cache = _cache()
+    key = _version_key(model)
+    cache.set(key, max(time.time_ns(), (cache.get(key) or 0) + 1), timeout=None)
+
+
+def bump_on_commit(model):
+    # Bumping before commit would let a concurrent request cache the old rows
+    # under the new version.
+    transaction.on_commit(lambda: bump_model_version(model))
+
+
+def response_key(endpoint_name, slug=""):
+    endpoint = ENDPOINTS[endpoint_name]
+    versions = ":".join(str(v) for v in model_versions(endpoint.depends_on))
+    digest = hashlib.md5(versions.encode()).hexdigest()
+    return f"{KEY_PREFIX}:response:{endpoint_name}:{slug}:{digest}"
+
+
+def _record(endpoint_name, outcome):
+    with _stats_lock:
+        _stats[(endpoint_name, outcome)] += 1
+
+
+def stats():
+    with _stats_lock:
+        result = {}
+        for (endpoint_name, outcome), count in _stats.items():
+            result.setdefault(endpoint_name, {"hits": 0, "stale": 0, "misses": 0})[outcome] = count
+        return result
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def _stale_window(endpoint_name, default):
+    # LANDING_API_STALE_WHILE_REVALIDATE = {"<endpoint>": seconds} overrides the decorator
+    overrides = getattr(settings, "LANDING_API_STALE_WHILE_REVALIDATE", {})
+    return overrides.get(endpoint_name, default or 0)
+
+
+def _cached_response(entry, outcome):
+    content, content_type, _ = entry
+    if content is None:
+        # A cached 404: unknown slugs don't rebuild (and hit the database) every time
+        raise Http404
+    response = HttpResponse(content, content_type=content_type)
+    response["X-Cache"] = outcome
+    return response
+
+
+def _wait_for_rebuild(cache, key):
+    # Another worker holds the rebuild lock and there is nothing stale to
+    # serve: poll briefly for its result before rebuilding ourselves.
+    deadline = time.monotonic() + getattr(settings, "LANDING_API_CACHE_LOCK_WAIT", 2)
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        if cache.get(f"{key}:lock") is None:
+            # The holder finished without caching (e.g. it failed)
+            break
+    return None
+
+
+class _Lookup:
+    # One request's pass through the cache, split so the sync and async
+    # wrappers share it: hit() before the view, store() and release() after.
+
+    def __init__(self, endpoint_name, slug, timeout, stale_while_revalidate):
+        self.endpoint_name = endpoint_name
+        self.cache = _cache()
+        _warn_if_per_process(self.cache)
+        self.key = response_key(endpoint_name, slug)
+        self.lock_key = f"{self.key}:lock"
+        self.fresh_for = timeout if timeout is not None else getattr(settings, "LANDING_API_CACHE_TIMEOUT", 600)
+        self.stale_for = _stale_window(endpoint_name, stale_while_revalidate)
+        self.has_lock = False
+
+    def hit(self):
+        entry = self.cache.get(self.key)
+        if entry is not None and time.time() < entry[2]:
+            _record(self.endpoint_name, "hits")
+            return _cached_response(entry, "HIT")
+
+        # Single flight: only the lock holder rebuilds, everyone else keeps
+        # getting the previous payload (or waits for the new one).
+        lock_timeout = getattr(settings, "LANDING_API_CACHE_LOCK_TIMEOUT", 30)
+        self.has_lock = self.cache.add(self.lock_key, 1, lock_timeout)
+        if not self.has_lock:
+            if entry is not None:
+                _record(self.endpoint_name, "stale")
+                return _cached_response(entry, "STALE")
+            entry = _wait_for_rebuild(self.cache, self.key)
+            if entry is not None:
+                _record(self.endpoint_name, "hits")
+                return _cached_response(entry, "HIT")
+
+        _record(self.endpoint_name, "misses")
+        return None
+
+    def store(self, response):
+        if response.status_code == 200 and not response.streaming:
+            self._set(response.content, response["Content-Type"])
+        response["X-Cache"] = "MISS"
+
+    def store_not_found(self):
+        # Keyed by the model versions like any page, so creating the row serves it at once
+        self._set(None, None)
+
+    def _set(self, content, content_type):
+        self.cache.set(
+            self.key,
+            (content, content_type, time.time() + self.fresh_for),
+            self.fresh_for + self.stale_for,
+        )
+
+    def release(self):
+        if self.has_lock:
+            self.cache.delete(self.lock_key)
+
+
+def cached_endpoint(endpoint_name, timeout=None, stale_while_revalidate=None):
+    # Dependencies come from the endpoint declaration in endpoints.py
+    if endpoint_name not in ENDPOINTS:
+        raise ValueError(f"Unknown endpoint {endpoint_name!r}")
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ("GET", "HEAD"):
+                    return await view(request, *args, **kwargs)
+
+                # Cache calls block (and a shared cache is network I/O): keep them off the event loop
+                lookup = await sync_to_async(_Lookup)(endpoint_name, kwargs.get("slug", ""), timeout, stale_while_revalidate)
+                response = await sync_to_async(lookup.hit)()
+                if response is not None:
+                    return response
+                try:
+                    response = await view(request, *args, **kwargs)
+                    await sync_to_async(lookup.store)(response)
+                except Http404:
+                    await sync_to_async(lookup.store_not_found)()
+                    raise
+                finally:
+                    await sync_to_async(lookup.release)()
+                return response
+
+            async_wrapper.endpoint_name = endpoint_name
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+
+            lookup = _Lookup(endpoint_name, kwargs.get("slug", ""), timeout, stale_while_revalidate)
+            response = lookup.hit()
+            if response is not None:
+                return response
+            try:
+                response = view(request, *args, **kwargs)
+                lookup.store(response)
+            except Http404:
+                lookup.store_not_found()
+                raise
+            finally:
+                lookup.release()
+            return response
+
+        # Lets tooling map a view back to its endpoint (wraps() carries it to outer decorators)
+        wrapper.endpoint_name = endpoint_name
+        return wrapper
+
+    return decorator
@@ -0,0 +1,391 @@
+import asyncio
+from functools import partial
+from itertools import groupby
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.db.models import Prefetch
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+
+from .models import BlogArticle, Ebook, InstructionalVideo, ServiceSolicitationTerm, SiteImages, Venture, VentureImages
+from .media_urls import file_url, srcset
+from .site_images import page_cover_image_urls
+
+
+def _in_own_thread(section):
+    # Django connections are per thread: release this worker thread's one when done
+    def run():
+        try:
+            return section()
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=False)()
+
+
+async def gather_independent(*sections):
+    # The async ORM runs every query on the single sync thread, one after another,
+    # so independent sections each get a worker thread (and connection) of their
+    # own: the page then takes about as long as its slowest section.
+    return await asyncio.gather(*(_in_own_thread(section) for section in sections))
+
+
+def venture_detail_queryset():
+    # Fixed set of queries: venture + status, highlights, amenities, floor plans,
+    # areas and images. Every section of the payload is built from these.
+    return Venture.objects.select_related("status").prefetch_related(
+        "hero_highlights",
+        "amenities",
+        "floor_plans",
+        "areas",
+        Prefetch("images", queryset=VentureImages.objects.order_by("order", "id")),
+    )
+
+
+def serialize_venture_detail(venture):
+    floor_plans = list(venture.floor_plans.all())
+    areas = list(venture.areas.all())
+    images = list(venture.images.all())
+
+    floor_plan_names = {fp.id: fp.name for fp in floor_plans}
+    area_names = {area.id: area.name for area in areas}
+
+    images_by_floor_plan = {}
+    images_by_area = {}
+    highlighted = []
+
+    for img in images:
+        # Each image is serialized (and its URL resolved) only once
+        item = {
+            "is_highlight": img.is_high_light,
+            "url": file_url(img.image),
+            "srcset": srcset(img.image, img.image_variants),
+            "metadata": img.image_metadata or None,
+            "unit": floor_plan_names.get(img.floorPlan_id),
+            "area": area_names.get(img.area_id),
+        }
+        if img.is_high_light:
+            highlighted.append(item)
+        if img.floorPlan_id is not None:
+            images_by_floor_plan.setdefault(img.floorPlan_id, []).append(item)
+        if img.area_id is not None:
+            images_by_area.setdefault(img.area_id, []).append(item)
+
+    return {
+        "slug": venture.slug,
+        "name": venture.name,
+        "subtitle": venture.short_description,
+        "heroImage": file_url(venture.cover_image),
+        "heroImageSrcset": srcset(venture.cover_image, venture.cover_image_variants),
+        "heroImageMetadata": venture.cover_image_metadata or None,
+        "heroHighLights": [
+            {"label": h.label, "info": h.info} for h in venture.hero_highlights.all()
+        ],
+        "breadcrumb": [
+            {"label": "Empreendimentos", "url": "/nossas-obras/"},
+            {"label": venture.name, "url": f"/nossas-obras/{venture.slug}/"},
+        ],
+        "location": venture.location,
+        "unitsCount": venture.total_units,
+        "status": venture.status.name if venture.status else None,
+        "lastUnits": venture.is_last_units,
+        "amenities": [
+            {"label": amenity.icon, "value": amenity.value, "span": amenity.span}
+            for amenity in venture.amenities.all()
+        ],
+        "floorPlans": [
+            {
+                "id": fp.id,
+                "name": fp.name,
+                "descriptionList": fp.descriptionList,
+                "images": images_by_floor_plan.get(fp.id, []),
+            }
+            for fp in floor_plans
+        ],
+        "areas": [area.name for area in areas],
+        "ytVideoId": venture.yt_video_id if venture.yt_video_id else None,
+        "galeries": {
+            "highlighted": highlighted,
+            "units": [
+                {
+                    "id": fp.id,
+                    "name": fp.name,
+                    "images": images_by_floor_plan.get(fp.id, []),
+                }
+                for fp in floor_plans
+            ],
+            "areas": [
+                {
+                    "id": area.id,
+                    "name": area.name,
+                    "images": images_by_area.get(area.id, []),
+                }
+                for area in areas
+            ],
+        },
+    }
+
+
+def venture_detail_payload(slug):
+    venture = get_object_or_404(venture_detail_queryset(), slug=slug)
+    return serialize_venture_detail(venture)
+
+
+def ventures_listing_queryset():
+    # One query for the visible ventures, status joined and cover denormalized
+    return (
+        Venture.objects.filter(is_visible=True, status__is_visible=True)
+        .select_related("status")
+        .order_by("status__order", "status__name", "status_id", "order", "name")
+    )
+
+
+def serialize_ventures_by_status(ventures):
+    return [
+        {
+            "id": status.id,
+            "name": status.name,
+            "ventures": [
+                {
+                    "id": venture.id,
+                    "name": venture.name,
+                    "slug": venture.slug,
+                    "short_description": venture.short_description,
+                    "location": venture.location,
+                    "total_units": venture.total_units,
+                    "hero_image_url": file_url(venture.cover_image),
+                    "hero_image_srcset": srcset(venture.cover_image, venture.cover_image_variants),
+                    "hero_image_metadata": venture.cover_image_metadata or None,
+                }
+                for venture in group
+            ],
+        }
+        for status, group in groupby(ventures, key=lambda venture: venture.status)
+    ]
+
+
+def ventures_page_payload():
+    return {
+        "statuses": serialize_ventures_by_status(ventures_listing_queryset()),
+        **page_cover_image_urls(SiteImages.SitePage.VENTURES),
+    }
+
+
+def about_us_payload():
+    return page_cover_image_urls(SiteImages.SitePage.ABOUT_US)
+
+
+def serialize_instructional_videos():
+    return [
+        {
+            "id": video.id,
+            "title": video.title,
+            "video_url": video.video_url,
+            "cover_image_url": file_url(video.cover_image),
+            "cover_image_srcset": srcset(video.cover_image, video.cover_image_variants),
+            "cover_image_metadata": video.cover_image_metadata or None,
+            "created_at": video.created_at.isoformat() if video.created_at else None,
+            "updated_at": video.updated_at.isoformat() if video.updated_at else None,
+        }
+        for video in InstructionalVideo.objects.filter(is_active=True).order_by("-updated_at")
+    ]
+
+
+def active_ebook_url():
+    ebook = Ebook.objects.filter(is_active=True).order_by("-updated_at").first()
+    return file_url(ebook.file) if ebook else None
+
+
+def _your_dreams(cover_images, videos, ebook_url):
+    return {
+        **cover_images,
+        "instructional_videos": videos,
+        "ebook_url": ebook_url,
+    }
+
+
+def your_dreams_payload():
+    return _your_dreams(
+        page_cover_image_urls(SiteImages.SitePage.YOUR_DREAMS),
+        serialize_instructional_videos(),
+        active_ebook_url(),
+    )
+
+
+async def ayour_dreams_payload():
+    return _your_dreams(*await gather_independent(
+        partial(page_cover_image_urls, SiteImages.SitePage.YOUR_DREAMS),
+        serialize_instructional_videos,
+        active_ebook_url,
+    ))
+
+
+def blog_page_payload():
+    blogArticles = BlogArticle.objects.filter(is_active=True).select_related("tag").order_by("-created_at")
+    data = {"highlighted_articles": [], "regular_articles": []}
+
+    for article in blogArticles:
+        articleData = {
+            "id": article.id,
+            "title": article.title,
+            "slug": article.slug,
+            "tag": article.tag.name if article.tag else None,
+            "short_description": article.short_description,
+            "cover_image_url": file_url(article.cover_image),
+            "cover_image_srcset": srcset(article.cover_image, article.cover_image_variants),
+            "cover_image_metadata": article.cover_image_metadata or None,
+            # "content": article.content,
+            "created_at": (
+                article.created_at.isoformat() if article.created_at else None
+            ),
+        }
+        if article.is_highlight:
+            data["highlighted_articles"].append(articleData)
+        else:
+            data["regular_articles"].append(articleData)
+
+    data.update(page_cover_image_urls(SiteImages.SitePage.BLOG))
+    return data
+
+
+def blog_article_payload(slug):
+    article = get_object_or_404(BlogArticle.objects.select_related("tag"), slug=slug, is_active=True)
+    # The newest other articles: a snapshot must not freeze a random pick
+    suggested_articles = (
+        BlogArticle.objects.filter(is_active=True)
+        .exclude(id=article.id)
+        .order_by("-created_at")[:3]
+    )
+
+    return {
+        "article": {
+            "id": article.id,
+            "title": article.title,
+            "slug": article.slug,
+            "tag": article.tag.name if article.tag else None,
+            "short_description": article.short_description,
+            "cover_image_url": file_url(article.cover_image),
+            "cover_image_srcset": srcset(article.cover_image, article.cover_image_variants),
+            "cover_image_metadata": article.cover_image_metadata or None,
+            "content": article.content,
+            "created_at": article.created_at.isoformat() if article.created_at else None,
+        },
+        "suggested_articles": [
+            {
+                "id": suggested.id,
+                "title": suggested.title,
+                "slug": suggested.slug,
+                "short_description": suggested.short_description,
+                "cover_image_url": file_url(suggested.cover_image),
+                "cover_image_srcset": srcset(suggested.cover_image, suggested.cover_image_variants),
+                "cover_image_metadata": suggested.cover_image_metadata or None,
+            }
+            for suggested in suggested_articles
+        ],
+    }
+
+
+def serialize_home_page_ventures():
+    home_page_ventures = Venture.objects.filter(
+        homepage_highlight=True, is_visible=True
+    ).select_related("status").order_by("-created_at")
+    return [
+        {
+            "id": venture.id,
+            "name": venture.name,
+            "slug": venture.slug,
+            "short_description": venture.short_description,
+            "location": venture.location,
+            "status": venture.status.name if venture.status else None,
+            "total_units": venture.total_units,
+            "hero_image_url": file_url(venture.cover_image),
+            "hero_image_srcset": srcset(venture.cover_image, venture.cover_image_variants),
+            "hero_image_metadata": venture.cover_image_metadata or None,
+        }
+        for venture in home_page_ventures
+    ]
+
+
+def serialize_home_page_articles():
+    home_page_articles = BlogArticle.objects.filter(is_active=True).order_by(
+        "-created_at"
+    )[:3]
+    return [
+        {
+            "id": article.id,
+            "title": article.title,
+            "slug": article.slug,
+            "short_description": article.short_description,
+            "cover_image_url": file_url(article.cover_image),
+            "cover_image_srcset": srcset(article.cover_image, article.cover_image_variants),
+            "cover_image_metadata": article.cover_image_metadata or None,
+        }
+        for article in home_page_articles
+    ]
+
+
+def _home_page(ventures, articles, cover_images, videos, ebook_url):
+    return {
+        "home_page_ventures": ventures,
+        "home_page_articles": articles,
+        **cover_images,
+        "instructional_videos": videos,
+        "ebook_url": ebook_url,
+    }
+
+
+def home_page_payload():
+    return _home_page(
+        serialize_home_page_ventures(),
+        serialize_home_page_articles(),
+        page_cover_image_urls(SiteImages.SitePage.HOME),
+        serialize_instructional_videos(),
+        active_ebook_url(),
+    )
+
+
+async def ahome_page_payload():
+    return _home_page(*await gather_independent(
+        serialize_home_page_ventures,
+        serialize_home_page_articles,
+        partial(page_cover_image_urls, SiteImages.SitePage.HOME),
+        serialize_instructional_videos,
+        active_ebook_url,
+    ))
+
+
+def active_service_solicitation_term():
+    term = ServiceSolicitationTerm.objects.filter(is_active=True).first()
+    if term is None:
+        raise Http404("No active term found")
+    return term
+
+
+def service_solicitation_ventures():
+    ventures = Venture.objects.filter(accepts_service_solicitation=True).order_by('created_at')
+    return [{"id": venture.id, "name": venture.name} for venture in ventures]
+
+
+def _service_solicitation_term(term, cover_images, ventures):
+    return {
+        **cover_images,
+        "terms_text": term.text,
+        "ventures": ventures,
+    }
+
+
+def service_solicitation_term_payload():
+    return _service_solicitation_term(
+        active_service_solicitation_term(),
+        page_cover_image_urls(SiteImages.SitePage.SERVICE_SOLICITATION),
+        service_solicitation_ventures(),
+    )
+
+
+async def aservice_solicitation_term_payload():
+    return _service_solicitation_term(*await gather_independent(
+        active_service_solicitation_term,
+        partial(page_cover_image_urls, SiteImages.SitePage.SERVICE_SOLICITATION),
+        service_solicitation_ventures,
+    ))
@@ -0,0 +1,48 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import imaging
+from .endpoints import tracked_models
+from .invalidation import content_changed
+from .models import Venture, VentureImages
+
+
+@receiver(post_delete, sender=VentureImages)
+def sync_venture_cover_on_image_delete(sender, instance, **kwargs):
+    Venture.sync_cover_image(instance.venture_id)
+
+
+@receiver(post_save, sender=VentureImages)
+def invalidate_previous_venture(sender, instance, raw=False, **kwargs):
+    # An image moved to another venture also changes the old venture's pages and cover
+    previous_venture_id = getattr(instance, "_moved_from_venture_id", None)
+    if previous_venture_id and not raw:
+        content_changed(sender, VentureImages(pk=instance.pk, venture_id=previous_venture_id))
+
+
+def on_content_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    content_changed(sender, instance)
+
+
+for model in tracked_models():
+    post_save.connect(on_content_change, sender=model, dispatch_uid=f"content_change_save_{model.__name__}")
+    post_delete.connect(on_content_change, sender=model, dispatch_uid=f"content_change_delete_{model.__name__}")
+
+
+def fill_image_metadata(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    imaging.fill_metadata(instance)
+
+
+def schedule_image_variants(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    imaging.schedule_variants(instance)
+
+
+for model in imaging.VARIANT_FIELDS:
+    pre_save.connect(fill_image_metadata, sender=model, dispatch_uid=f"image_metadata_{model.__name__}")
+    post_save.connect(schedule_image_variants, sender=model, dispatch_uid=f"image_variants_{model.__name__}")
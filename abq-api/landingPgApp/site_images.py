@@ -0,0 +1,55 @@
+import threading
+import time
+
+from django.conf import settings
+
+from .media_urls import file_url, srcset
+from .models import SiteImages
+
+
+_lock = threading.Lock()
+_pages = None
+_loaded_at = 0.0
+
+
+def _load_pages():
+    # Single query for every page; the first active image per slot wins, as
+    # the old per-view `.first()` lookups did.
+    pages = {}
+    for image in SiteImages.objects.filter(is_active=True).order_by("pk"):
+        slots = pages.setdefault(image.page, {"desktop": None, "mobile": None})
+        if image.is_desktop and slots["desktop"] is None:
+            slots["desktop"] = image
+        if image.is_mobile and slots["mobile"] is None:
+            slots["mobile"] = image
+    return pages
+
+
+def get_page_images(page):
+    global _pages, _loaded_at
+
+    ttl = getattr(settings, "SITE_IMAGES_CACHE_TTL", 300)
+    with _lock:
+        if _pages is None or time.monotonic() - _loaded_at > ttl:
+            _pages = _load_pages()
+            _loaded_at = time.monotonic()
+        pages = _pages
+    return pages.get(page, {"desktop": None, "mobile": None})
+
+
+def page_cover_image_urls(page):
+    images = get_page_images(page)
+    return {
+        "desktop_cover_image_url": file_url(images["desktop"].image) if images["desktop"] else None,
+        "mobile_cover_image_url": file_url(images["mobile"].image) if images["mobile"] else None,
+        "desktop_cover_image_srcset": srcset(images["desktop"].image, images["desktop"].image_variants) if images["desktop"] else [],
+        "mobile_cover_image_srcset": srcset(images["mobile"].image, images["mobile"].image_variants) if images["mobile"] else [],
+        "desktop_cover_image_metadata": (images["desktop"].image_metadata or None) if images["desktop"] else None,
+        "mobile_cover_image_metadata": (images["mobile"].image_metadata or None) if images["mobile"] else None,
+    }
+
+
+def invalidate():
+    global _pages
+    with _lock:
+        _pages = None
@@ -0,0 +1,164 @@
+import json
+import logging
+import threading
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import Http404, HttpResponse
+from django.utils import timezone
+
+from .endpoints import ENDPOINTS, endpoints_depending_on
+from .models import PageSnapshot
+
+
+logger = logging.getLogger(__name__)
+
+_pending = threading.local()
+
+
+def snapshot_key(endpoint_name, slug=""):
+    return f"{endpoint_name}:{slug}"
+
+
+def _encode(payload):
+    return json.dumps(payload, cls=DjangoJSONEncoder).encode()
+
+
+def render(endpoint_name, slug=""):
+    endpoint = ENDPOINTS[endpoint_name]
+    return _encode(endpoint.build(slug) if endpoint.is_slugged else endpoint.build())
+
+
+async def arender(endpoint_name, slug=""):
+    endpoint = ENDPOINTS[endpoint_name]
+    if endpoint.abuild is None:
+        return await sync_to_async(render)(endpoint_name, slug)
+    return _encode(await (endpoint.abuild(slug) if endpoint.is_slugged else endpoint.abuild()))
+
+
+def rebuild(endpoint_name, slug=""):
+    key = snapshot_key(endpoint_name, slug)
+    try:
+        body = render(endpoint_name, slug)
+    except Http404:
+        PageSnapshot.objects.filter(pk=key).delete()
+        raise
+
+    # Single-row upsert: readers see either the previous or the new bytes
+    PageSnapshot.objects.update_or_create(
+        pk=key,
+        defaults={"endpoint": endpoint_name, "slug": slug, "body": body},
+    )
+    return body
+
+
+async def arebuild(endpoint_name, slug=""):
+    key = snapshot_key(endpoint_name, slug)
+    try:
+        body = await arender(endpoint_name, slug)
+    except Http404:
+        await PageSnapshot.objects.filter(pk=key).adelete()
+        raise
+
+    await PageSnapshot.objects.aupdate_or_create(
+        pk=key,
+        defaults={"endpoint": endpoint_name, "slug": slug, "body": body},
+    )
+    return body
+
+
+@transaction.atomic
+def rebuild_endpoint(endpoint_name):
+    endpoint = ENDPOINTS[endpoint_name]
+    if not endpoint.is_slugged:
+        try:
+            rebuild(endpoint_name)
+        except Http404:
+            pass
+        return
+
+    slugs = set(endpoint.all_slugs())
+    for slug in slugs:
+        try:
+            rebuild(endpoint_name, slug)
+        except Http404:
+            pass
+    PageSnapshot.objects.filter(endpoint=endpoint_name).exclude(slug__in=slugs).delete()
+
+
+def _is_expired(updated_at):
+    # Payloads embed signed S3 URLs, which stop working after AWS_QUERYSTRING_EXPIRE
+    max_age = getattr(settings, "PAGE_SNAPSHOT_MAX_AGE", 0)
+    return bool(max_age) and timezone.now() - updated_at > timedelta(seconds=max_age)
+
+
+def get_body(endpoint_name, slug=""):
+    row = (
+        PageSnapshot.objects.filter(pk=snapshot_key(endpoint_name, slug))
+        .values_list("body", "updated_at")
+        .first()
+    )
+    if row is not None and not _is_expired(row[1]):
+        return bytes(row[0])
+    return rebuild(endpoint_name, slug)
+
+
+async def aget_body(endpoint_name, slug=""):
+    row = await (
+        PageSnapshot.objects.filter(pk=snapshot_key(endpoint_name, slug))
+        .values_list("body", "updated_at")
+        .afirst()
+    )
+    if row is not None and not _is_expired(row[1]):
+        return bytes(row[0])
+    return await arebuild(endpoint_name, slug)
+
+
+def snapshot_response(endpoint_name, slug=""):
+    return HttpResponse(get_body(endpoint_name, slug), content_type="application/json")
+
+
+async def asnapshot_response(endpoint_name, slug=""):
+    return HttpResponse(await aget_body(endpoint_name, slug), content_type="application/json")
+
+
+def mark_stale(model, instance):
+    rebuilds = getattr(_pending, "rebuilds", None)
+    if rebuilds is None:
+        rebuilds = _pending.rebuilds = {}
+
+    for endpoint in endpoints_depending_on(model):
+        slugs = endpoint.slugs_for(instance) if endpoint.slugs_for else None
+        if slugs is None or (endpoint.name in rebuilds and rebuilds[endpoint.name] is None):
+            rebuilds[endpoint.name] = None
+        else:
+            rebuilds.setdefault(endpoint.name, set()).update(slugs)
+
+    # Rebuild once per transaction, after the admin save has committed. Extra
+    # callbacks registered by the same transaction find nothing left to do.
+    transaction.on_commit(flush)
+
+
+def flush():
+    rebuilds = getattr(_pending, "rebuilds", None)
+    if not rebuilds:
+        return
+    _pending.rebuilds = {}
+
+    for endpoint_name, slugs in rebuilds.items():
+        try:
+            if slugs is None:
+                rebuild_endpoint(endpoint_name)
+                continue
+            for slug in slugs:
+                try:
+                    rebuild(endpoint_name, slug)
+                except Http404:
+                    pass
+        except Exception:
+            # Never break the admin save: drop the rows and let reads rebuild lazily
+            logger.exception("Failed to rebuild page snapshot %s", endpoint_name)
+            PageSnapshot.objects.filter(endpoint=endpoint_name).delete()
@@ -0,0 +1,134 @@
+// Uploads admin files straight to S3 with a presigned POST and hands Django
+// only the resulting key ("<field>__key"); the file input is emptied so the
+// form submit stays small.
+(function () {
+  "use strict";
+
+  let pending = 0;
+
+  function csrfToken() {
+    const input = document.querySelector("input[name=csrfmiddlewaretoken]");
+    return input ? input.value : "";
+  }
+
+  function setStatus(input, text) {
+    const status = input.parentNode.querySelector(".direct-upload-status");
+    if (status) {
+      status.textContent = text;
+    }
+  }
+
+  function postToS3(presigned, file, input) {
+    return new Promise(function (resolve, reject) {
+      const body = new FormData();
+      Object.entries(presigned.fields).forEach(function ([name, value]) {
+        body.append(name, value);
+      });
+      body.append("file", file);
+
+      const request = new XMLHttpRequest();
+      request.open("POST", presigned.url);
+      request.upload.addEventListener("progress", function (event) {
+        if (event.lengthComputable) {
+          setStatus(input, "Enviando… " + Math.round((event.loaded / event.total) * 100) + "%");
+        }
+      });
+      request.addEventListener("load", function () {
+        if (request.status >= 200 && request.status < 300) {
+          resolve();
+        } else {
+          reject(new Error("S3 respondeu " + request.status));
+        }
+      });
+      request.addEventListener("error", function () {
+        reject(new Error("Falha de rede"));
+      });
+      request.send(body);
+    });
+  }
+
+  async function uploadFile(input, file) {
+    const response = await fetch(input.dataset.directUploadUrl, {
+      method: "POST",
+      headers: { "Content-Type": "application/json", "X-CSRFToken": csrfToken() },
+      body: JSON.stringify({ filename: file.name, content_type: file.type || "application/octet-stream" }),
+    });
+    const presigned = await response.json();
+    if (!response.ok) {
+      throw new Error(presigned.error || "Falha ao preparar o envio");
+    }
+    await postToS3(presigned, file, input);
+    return presigned.key;
+  }
+
+  async function upload(input) {
+    const file = input.files[0];
+    const keyInput = document.getElementsByName(input.name + "__key")[0];
+    if (!file || !keyInput) {
+      return;
+    }
+
+    pending += 1;
+    keyInput.value = "";
+    setStatus(input, "Preparando envio…");
+    try {
+      keyInput.value = await uploadFile(input, file);
+      input.value = "";
+      setStatus(input, "Enviado: " + file.name);
+    } catch (error) {
+      setStatus(input, "Erro: " + error.message);
+    } finally {
+      pending -= 1;
+    }
+  }
+
+  async function uploadMany(input) {
+    // One hidden "<name>__key" input per file, in the order they were selected
+    const keys = input.parentNode.querySelector(".direct-upload-keys");
+    const files = Array.from(input.files);
+    if (!keys || !files.length) {
+      return;
+    }
+
+    pending += 1;
+    keys.replaceChildren();
+    let done = 0;
+    setStatus(input, "Enviando 0/" + files.length + "…");
+    try {
+      const uploaded = await Promise.all(files.map(async function (file) {
+        const key = await uploadFile(input, file);
+        done += 1;
+        setStatus(input, "Enviando " + done + "/" + files.length + "…");
+        return key;
+      }));
+      uploaded.forEach(function (key) {
+        const hidden = document.createElement("input");
+        hidden.type = "hidden";
+        hidden.name = keys.dataset.name;
+        hidden.value = key;
+        keys.appendChild(hidden);
+      });
+      input.value = "";
+      setStatus(input, files.length + " arquivo(s) enviado(s)");
+    } catch (error) {
+      keys.replaceChildren();
+      setStatus(input, "Erro: " + error.message);
+    } finally {
+      pending -= 1;
+    }
+  }
+
+  document.addEventListener("change", function (event) {
+    const input = event.target;
+    if (input.matches && input.matches("input[type=file][data-direct-upload-url]")) {
+      (input.multiple ? uploadMany : upload)(input);
+    }
+  });
+
+  document.addEventListener("submit", function (event) {
+    if (pending > 0) {
+      event.preventDefault();
+      window.alert("Aguarde o término do envio dos arquivos.");
+    }
+  }, true);
+})();
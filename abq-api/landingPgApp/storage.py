@@ -0,0 +1,107 @@
+import re
+import threading
+
+from botocore.config import Config
+from django.conf import settings
+from storages.backends.s3 import S3Storage
+from storages.utils import clean_name
+
+
+_lock = threading.Lock()
+_storage = None
+_session = None
+_stats = {"storages": 0, "sessions": 0, "clients": 0}
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+_content_addressed = re.compile(r"(^|/)[0-9a-f]{64}\.\w+$")
+# Variants rendered from one ("<sha256>__w320.webp", see imaging.variant_name)
+_derived_variant = re.compile(r"(^|/)[0-9a-f]{64}__w\d+\.\w+$")
+
+
+def is_content_addressed(name):
+    # "<folder>/<sha256><ext>": the key changes whenever the bytes do
+    return bool(_content_addressed.search(name))
+
+
+def is_immutable(name):
+    # Variant keys change with the original's bytes, width and format, so they
+    # are cached like it; _save still writes them (a quality change re-renders).
+    return is_content_addressed(name) or bool(_derived_variant.search(name))
+
+
+def _client_config():
+    # Connection pooling, timeouts and retries for every S3 client live here
+    return Config(
+        max_pool_connections=getattr(settings, "AWS_S3_MAX_POOL_CONNECTIONS", 10),
+        connect_timeout=getattr(settings, "AWS_S3_CONNECT_TIMEOUT", 5),
+        read_timeout=getattr(settings, "AWS_S3_READ_TIMEOUT", 30),
+        retries={"max_attempts": getattr(settings, "AWS_S3_MAX_ATTEMPTS", 3), "mode": "standard"},
+        s3={"addressing_style": getattr(settings, "AWS_S3_ADDRESSING_STYLE", None)},
+        signature_version=getattr(settings, "AWS_S3_SIGNATURE_VERSION", None),
+    )
+
+
+class SharedS3Storage(S3Storage):
+    # One boto3 session per process. boto3 resources are not thread-safe, so
+    # each thread still gets its own resource/client, built from that session
+    # under a lock; a single-threaded serverless instance builds exactly one.
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("client_config", _client_config())
+        super().__init__(**kwargs)
+
+    def get_available_name(self, name, max_length=None):
+        if is_content_addressed(name):
+            return clean_name(name)
+        return super().get_available_name(name, max_length)
+
+    def get_object_parameters(self, name):
+        params = super().get_object_parameters(name)
+        if is_immutable(name):
+            params.setdefault("CacheControl", IMMUTABLE_CACHE_CONTROL)
+        return params
+
+    def _save(self, name, content):
+        # Same hash, same bytes: reuse the stored object instead of uploading again
+        if is_content_addressed(name) and self.exists(name):
+            return clean_name(name)
+        return super()._save(name, content)
+
+    def _create_session(self):
+        global _session
+        if _session is None:
+            _session = super()._create_session()
+            _stats["sessions"] += 1
+        return _session
+
+    @property
+    def connection(self):
+        connection = getattr(self._connections, "connection", None)
+        if connection is None:
+            with _lock:
+                connection = self._create_session().resource(
+                    "s3",
+                    region_name=self.region_name,
+                    use_ssl=self.use_ssl,
+                    endpoint_url=self.endpoint_url,
+                    config=self.client_config,
+                    verify=self.verify,
+                )
+                _stats["clients"] += 1
+            self._connections.connection = connection
+        return connection
+
+
+def shared_storage():
+    # Used as a callable `storage=` on every model file field
+    global _storage
+    if _storage is None:
+        with _lock:
+            if _storage is None:
+                _storage = SharedS3Storage()
+                _stats["storages"] += 1
+    return _storage
+
+
+def stats():
+    return dict(_stats)
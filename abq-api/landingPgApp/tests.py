@@ -1,3 +1,1596 @@
-from django.test import TestCase
+import csv
+import datetime
+import hashlib
+import importlib
+import io
+import json
+import smtplib
+import threading
+import time
+from types import ModuleType, SimpleNamespace
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import boto3
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.db import IntegrityError, close_old_connections, connection
+from django.forms import modelform_factory
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path
+from django.utils import timezone
+from django.utils.datastructures import MultiValueDict
+from django.utils.http import parse_http_date
+from PIL import Image
+from storages.backends.s3 import S3Storage
+
+from . import (
+    async_views,
+    bulk_upload,
+    checks,
+    direct_uploads,
+    exports,
+    idempotency,
+    imaging,
+    orphans,
+    outbox,
+    response_cache,
+    serializers,
+    site_images,
+    snapshots,
+    throttling,
+    views,
+)
+from .admin import VentureBulkUploadForm
+from .cdn import LocMemPurgeBackend
+from .endpoints import ENDPOINTS
+from .management.commands import check_query_plans
+from .models import (
+    BlogArticle,
+    ContactMessage,
+    Ebook,
+    IdempotencyRecord,
+    ImageVariantJob,
+    OutboxEmail,
+    PageSnapshot,
+    ServiceSolicitationTerm,
+    SiteImages,
+    Venture,
+    VentureAmenities,
+    VentureAreas,
+    VentureFloorPlans,
+    VentureHeroHighlight,
+    VentureImages,
+    VentureStatus,
+)
+from .forms import EmailMessageForm
+from .serializers import (
+    serialize_venture_detail,
+    serialize_ventures_by_status,
+    venture_detail_queryset,
+    ventures_listing_queryset,
+)
+from .storage import IMMUTABLE_CACHE_CONTROL, SharedS3Storage, shared_storage
+from .urls import read_urlpatterns
+
+
+requires_postgres = skipUnless(connection.vendor == "postgresql", "needs PostgreSQL")
+
+
+def offline_s3(test_class):
+    # Signing URLs and POST policies is local, but botocore still wants
+    # credentials, and CI has none: sign with dummy keys instead. Patched for
+    # the whole class, so setUp and its on-commit snapshot rebuilds sign too.
+    storage = shared_storage()
+    resource = boto3.Session(aws_access_key_id="test", aws_secret_access_key="test").resource(
+        "s3", region_name=storage.region_name, endpoint_url=storage.endpoint_url, config=storage.client_config
+    )
+    patchers = (
+        mock.patch.object(SharedS3Storage, "connection", mock.PropertyMock(return_value=resource)),
+        mock.patch.object(storage, "_bucket", resource.Bucket(storage.bucket_name)),
+    )
+    set_up_class = test_class.setUpClass
+
+    def setUpClass(cls):
+        for patcher in patchers:
+            patcher.start()
+            cls.addClassCleanup(patcher.stop)
+        set_up_class()
+
+    test_class.setUpClass = classmethod(setUpClass)
+    return test_class
+
+
+def make_venture(index=0, **fields):
+    defaults = {
+        "slug": f"venture-{index}",
+        "name": f"Venture {index}",
+        "short_description": "-",
+        "location": "-",
+        "total_units": 10,
+        "order": index,
+    }
+    defaults.update(fields)
+    return Venture.objects.create(**defaults)
+
+
+def add_venture_content(venture, count):
+    # `count` of every related row, images spread over the floor plans and areas
+    VentureHeroHighlight.objects.bulk_create(
+        VentureHeroHighlight(venture=venture, label=f"Label {index}", info="-") for index in range(count)
+    )
+    VentureAmenities.objects.bulk_create(
+        VentureAmenities(venture=venture, icon=f"icon-{index}", value="-") for index in range(count)
+    )
+    floor_plans = VentureFloorPlans.objects.bulk_create(
+        VentureFloorPlans(venture=venture, name=f"Plan {index}") for index in range(count)
+    )
+    areas = VentureAreas.objects.bulk_create(VentureAreas(venture=venture, name=f"Area {index}") for index in range(count))
+    VentureImages.objects.bulk_create(
+        VentureImages(
+            venture=venture,
+            image=f"venture_images/{venture.slug}/{index}.jpg",
+            order=index + 1,
+            is_high_light=index % 2 == 0,
+            floorPlan=floor_plans[index % count],
+            area=areas[index % count],
+        )
+        for index in range(count * 3)
+    )
+
+
+@offline_s3
+class VentureDetailQueryTests(TestCase):
+    def serialize(self, slug):
+        return serialize_venture_detail(venture_detail_queryset().get(slug=slug))
+
+    def test_query_count_does_not_grow_with_related_rows(self):
+        status = VentureStatus.objects.create(name="Em obras")
+        for index, count in ((1, 4), (2, 8)):
+            add_venture_content(make_venture(index, status=status), count)
+
+        # venture + status, highlights, amenities, floor plans, areas, images
+        with self.assertNumQueries(6):
+            small = self.serialize("venture-1")
+        with self.assertNumQueries(6):
+            large = self.serialize("venture-2")
+
+        self.assertEqual(len(small["galeries"]["units"]), 4)
+        self.assertEqual(len(large["galeries"]["units"]), 8)
+        self.assertEqual(sum(len(unit["images"]) for unit in large["galeries"]["units"]), 24)
+        self.assertEqual(len(large["galeries"]["highlighted"]), 12)
+        self.assertEqual(large["status"], "Em obras")
+
+
+@offline_s3
+class VenturesListingQueryTests(TestCase):
+    def setUp(self):
+        # Created out of display order; "Oculto" is not shown
+        self.statuses = [
+            VentureStatus.objects.create(name="Concluído", order=3),
+            VentureStatus.objects.create(name="Lançamento", order=1),
+            VentureStatus.objects.create(name="Em obras", order=2),
+            VentureStatus.objects.create(name="Oculto", order=0, is_visible=False),
+        ]
+        self.created = 0
+
+    def add_ventures(self, per_status):
+        for status in self.statuses:
+            for _ in range(per_status):
+                make_venture(self.created, status=status, cover_image=f"venture_images/{self.created}.jpg")
+                self.created += 1
+        make_venture(self.created, status=self.statuses[0], is_visible=False)
+        self.created += 1
+
+    def listing(self):
+        return serialize_ventures_by_status(ventures_listing_queryset())
+
+    def test_query_count_stays_flat_as_the_catalog_grows(self):
+        self.add_ventures(2)
+        with self.assertNumQueries(1):
+            small = self.listing()
+
+        self.add_ventures(4)
+        with self.assertNumQueries(1):
+            large = self.listing()
+
+        self.assertEqual([len(status["ventures"]) for status in small], [2, 2, 2])
+        self.assertEqual([len(status["ventures"]) for status in large], [6, 6, 6])
+
+    def test_groups_follow_status_order_and_hide_invisible_rows(self):
+        self.add_ventures(1)
+
+        listing = self.listing()
+
+        self.assertEqual([status["name"] for status in listing], ["Lançamento", "Em obras", "Concluído"])
+        # venture-3 has the hidden status, venture-4 is itself hidden
+        slugs = [venture["slug"] for status in listing for venture in status["ventures"]]
+        self.assertEqual(slugs, ["venture-1", "venture-2", "venture-0"])
+        self.assertTrue(all(venture["hero_image_url"] for status in listing for venture in status["ventures"]))
+
+
+@requires_postgres
+@offline_s3
+class QueryPlanTests(TestCase):
+    # Partial indexes added for the public pages, one group per query shape;
+    # where several fit, the planner may pick any of them
+    expected_indexes = (
+        {"venture_visible_status_idx"},
+        {"venture_home_highlight_idx"},
+        {"venture_service_solic_idx"},
+        {"siteimage_active_idx", "unique_active_desktop_site_image", "unique_active_mobile_site_image"},
+        {"blogarticle_active_idx"},
+        {"video_active_idx"},
+        {"unique_active_ebook"},
+        {"unique_active_service_solicitation_term"},
+    )
+
+    def test_public_queries_use_indexes_on_a_large_catalog(self):
+        command = check_query_plans.Command()
+        command._seed(ventures=5000, images=5, articles=5000)
+
+        seq_scans, used, endpoints = [], set(), set()
+        for endpoint_name, sql in command._captured_queries():
+            plan = command._explain(sql)
+            seq_scans += [(endpoint_name, table) for table in command._seq_scans(plan)]
+            used.update(command._indexes(plan))
+            endpoints.add(endpoint_name)
+
+        self.assertEqual(seq_scans, [])
+        self.assertEqual([group for group in self.expected_indexes if not group & used], [])
+        self.assertEqual(endpoints, set(ENDPOINTS))
+        # The snapshot read every request makes, not only the builders
+        self.assertTrue([name for name in used if name.startswith(PageSnapshot._meta.db_table)])
+
+
+@override_settings(IMAGE_VARIANTS_MODE="off")
+class SingleActiveValidationTests(TestCase):
+    # The admin forms validate before save() moves the flag off the old row
+
+    def test_new_active_term_passes_form_validation(self):
+        old = ServiceSolicitationTerm.objects.create(description="Old", text="-", is_active=True)
+        form = modelform_factory(ServiceSolicitationTerm, fields=["description", "text", "is_active"])(
+            {"description": "New", "text": "-", "is_active": True}
+        )
+
+        self.assertTrue(form.is_valid(), form.errors)
+        new = form.save()
+
+        old.refresh_from_db()
+        self.assertFalse(old.is_active)
+        self.assertEqual(list(ServiceSolicitationTerm.objects.filter(is_active=True)), [new])
+
+    def test_switching_flags_passes_full_clean(self):
+        Ebook.objects.create(title="Old", file="ebooks/old.pdf", is_active=True)
+        SiteImages.objects.create(image="site_images/old.jpg", page="home", is_desktop=True, is_mobile=True)
+        venture = make_venture()
+        VentureImages.objects.create(venture=venture, image="venture_images/old.jpg", is_cover=True)
+
+        for instance in (
+            Ebook(title="New", file="ebooks/new.pdf", is_active=True),
+            SiteImages(image="site_images/new.jpg", page="home", is_desktop=True, is_mobile=True),
+            VentureImages(venture=venture, image="venture_images/new.jpg", is_cover=True, order=2),
+        ):
+            with self.subTest(model=type(instance).__name__):
+                instance.full_clean()
+                instance.save()
+
+        self.assertEqual(Ebook.objects.filter(is_active=True).get().title, "New")
+        self.assertEqual(SiteImages.objects.filter(is_active=True, is_desktop=True).get().image.name, "site_images/new.jpg")
+        self.assertEqual(SiteImages.objects.filter(is_active=True, is_mobile=True).get().image.name, "site_images/new.jpg")
+        self.assertEqual(VentureImages.objects.filter(is_cover=True).get().image.name, "venture_images/new.jpg")
+
+
+@requires_postgres
+@offline_s3
+@override_settings(IMAGE_VARIANTS_MODE="off")
+class SingleActiveConcurrencyTests(TransactionTestCase):
+    threads = 8
+    saves = 10
+
+    def hammer(self, flip):
+        # Every thread flips rows on its own connection, all starting together
+        barrier = threading.Barrier(self.threads)
+        errors = []
+
+        def worker(number):
+            try:
+                barrier.wait()
+                for index in range(self.saves):
+                    flip(number + index)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        workers = [threading.Thread(target=worker, args=(number,)) for number in range(self.threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_one_active_ebook_survives(self):
+        pks = [Ebook.objects.create(title=f"Ebook {index}", file="ebooks/e.pdf", is_active=False).pk for index in range(4)]
+
+        def flip(index):
+            ebook = Ebook.objects.get(pk=pks[index % len(pks)])
+            ebook.is_active = True
+            ebook.save()
+
+        self.hammer(flip)
+        self.assertEqual(Ebook.objects.filter(is_active=True).count(), 1)
+
+    def test_one_active_term_survives(self):
+        pks = [
+            ServiceSolicitationTerm.objects.create(description=f"Term {index}", text="-", is_active=False).pk
+            for index in range(4)
+        ]
+
+        def flip(index):
+            term = ServiceSolicitationTerm.objects.get(pk=pks[index % len(pks)])
+            term.is_active = True
+            term.save()
+
+        self.hammer(flip)
+        self.assertEqual(ServiceSolicitationTerm.objects.filter(is_active=True).count(), 1)
+
+    def test_one_desktop_and_mobile_image_per_page_survive(self):
+        pks = [
+            SiteImages.objects.create(image=f"site_images/{index}.jpg", page="home", is_active=False).pk
+            for index in range(4)
+        ]
+
+        def flip(index):
+            image = SiteImages.objects.get(pk=pks[index % len(pks)])
+            image.is_active = True
+            image.is_desktop = True
+            image.is_mobile = index % 2 == 0
+            image.save()
+
+        self.hammer(flip)
+        active = SiteImages.objects.filter(page="home", is_active=True)
+        self.assertEqual(active.filter(is_desktop=True).count(), 1)
+        self.assertLessEqual(active.filter(is_mobile=True).count(), 1)
+
+    def test_one_cover_per_venture_survives(self):
+        venture = make_venture()
+        pks = [
+            VentureImages.objects.create(venture=venture, image=f"venture_images/{index}.jpg", order=index + 1).pk
+            for index in range(4)
+        ]
+
+        def flip(index):
+            image = VentureImages.objects.get(pk=pks[index % len(pks)])
+            image.is_cover = True
+            image.save()
+
+        self.hammer(flip)
+        self.assertEqual(VentureImages.objects.filter(venture=venture, is_cover=True).count(), 1)
+        venture.refresh_from_db()
+        self.assertEqual(venture.cover_image.name, VentureImages.objects.get(venture=venture, is_cover=True).image.name)
+
+
+class StandInBackend(locmem.EmailBackend):
+    # Local SMTP stand-in: delivers to mail.outbox, refuses some recipients or,
+    # while down, every connection attempt
+    def __init__(self, refused=(), down=False, **kwargs):
+        super().__init__(**kwargs)
+        self.refused = set(refused)
+        self.down = down
+        self.is_open = False
+        self.connections = 0
+
+    def open(self):
+        if self.down:
+            raise ConnectionRefusedError("stand-in is down")
+        if not self.is_open:
+            self.is_open = True
+            self.connections += 1
+
+    def close(self):
+        self.is_open = False
+
+    def send_messages(self, messages):
+        for message in messages:
+            refused = self.refused.intersection(message.to)
+            if refused:
+                raise smtplib.SMTPRecipientsRefused({address: (550, b"mailbox unavailable") for address in refused})
+        return super().send_messages(messages)
+
+
+@override_settings(
+    EMAIL_OUTBOX_SEND_ON_COMMIT=False,
+    EMAIL_OUTBOX_BREAKER_THRESHOLD=2,
+    EMAIL_RECIPIENT_LIST=["team@example.com"],
+    EMAIL_HOST_USER="site@example.com",
+)
+class OutboxTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def queue(self, count, recipient="team@example.com"):
+        return [
+            outbox.enqueue(f"Subject {index}", "Body", "site@example.com", [recipient]) for index in range(count)
+        ]
+
+    def test_drain_sends_everything_over_one_connection(self):
+        self.queue(4)
+        backend = StandInBackend()
+
+        stats = outbox.drain(connection=backend, batch_size=3)
+
+        self.assertEqual(stats["sent"], 4)
+        self.assertEqual(backend.connections, 1)
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.Status.SENT).count(), 4)
+
+    def test_refused_recipient_is_retried_later(self):
+        refused, = self.queue(1, recipient="gone@example.com")
+        self.queue(1)
+
+        stats = outbox.drain(connection=StandInBackend(refused={"gone@example.com"}))
+
+        self.assertEqual((stats["sent"], stats["retried"]), (1, 1))
+        refused.refresh_from_db()
+        self.assertEqual(refused.status, OutboxEmail.Status.PENDING)
+        self.assertEqual(refused.attempts, 1)
+        self.assertGreater(refused.next_attempt_at, timezone.now())
+        self.assertIn("SMTPRecipientsRefused", refused.last_error)
+
+    def test_message_fails_after_max_attempts(self):
+        email, = self.queue(1, recipient="gone@example.com")
+        OutboxEmail.objects.filter(pk=email.pk).update(attempts=7)
+
+        stats = outbox.drain(connection=StandInBackend(refused={"gone@example.com"}))
+
+        self.assertEqual(stats["failed"], 1)
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.Status.FAILED)
+
+    def test_outage_releases_messages_and_opens_the_breaker(self):
+        self.queue(2)
+
+        for _ in range(2):
+            stats = outbox.drain(connection=StandInBackend(down=True))
+
+        self.assertTrue(stats["breaker_open"])
+        self.assertFalse(OutboxEmail.objects.exclude(attempts=0).exists())
+        self.assertFalse(OutboxEmail.objects.filter(next_attempt_at__gt=timezone.now()).exists())
+
+        # While open, nothing is attempted; afterwards the queue goes out
+        backend = StandInBackend()
+        self.assertTrue(outbox.drain(connection=backend)["breaker_open"])
+        self.assertEqual(backend.connections, 0)
+        outbox.CircuitBreaker().record_success()
+        self.assertEqual(outbox.drain(connection=backend)["sent"], 2)
+
+    def test_open_breaker_is_shared_through_the_database(self):
+        breaker = outbox.CircuitBreaker()
+        breaker.record_failure()
+        breaker.record_failure()
+        cache.clear()  # a cold instance starts with an empty cache
+
+        self.assertIsNotNone(outbox.CircuitBreaker().open_until())
+        self.assertTrue(outbox.drain(connection=StandInBackend())["breaker_open"])
+
+    def test_drain_skips_messages_not_due(self):
+        email, = self.queue(1)
+        OutboxEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now() + datetime.timedelta(minutes=5))
+
+        self.assertEqual(outbox.drain(connection=StandInBackend())["sent"], 0)
+
+    @override_settings(EMAIL_OUTBOX_SEND_ON_COMMIT=True, EMAIL_OUTBOX_INLINE_TIMEOUT=3)
+    def test_form_submission_is_sent_after_commit(self):
+        with mock.patch.object(outbox, "get_connection", wraps=outbox.get_connection) as get_connection:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    "/landing-api/send-email/",
+                    {"name": "Ana", "phone": "99", "message": "Olá"},
+                    content_type="application/json",
+                )
+
+        self.assertEqual(response.status_code, 200)
+        get_connection.assert_called_once_with(fail_silently=False, timeout=3)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["team@example.com"])
+        contact = ContactMessage.objects.select_related("outbox_email").get()
+        self.assertEqual(contact.outbox_email.status, OutboxEmail.Status.SENT)
+
+    def test_form_submission_stays_queued_when_delivery_is_off(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                "/landing-api/send-email/",
+                {"name": "Ana", "phone": "99", "message": "Olá"},
+                content_type="application/json",
+            )
+
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(OutboxEmail.objects.get().status, OutboxEmail.Status.PENDING)
+
+    def test_drain_endpoint_requires_the_token(self):
+        self.queue(1)
+        url = "/landing-api/outbox/drain/"
+
+        with override_settings(EMAIL_OUTBOX_DRAIN_TOKEN=""):
+            self.assertEqual(self.client.get(url, headers={"Authorization": "Bearer "}).status_code, 404)
+        with override_settings(EMAIL_OUTBOX_DRAIN_TOKEN="secret"):
+            self.assertEqual(self.client.get(url).status_code, 401)
+            self.assertEqual(self.client.get(url, headers={"Authorization": "Bearer wrong"}).status_code, 401)
+            response = self.client.get(url, headers={"Authorization": "Bearer secret"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["sent"], 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class StandInS3:
+    # In-memory stand-in for the S3 calls the orphan collector makes: paginated
+    # list_objects_v2 (1000 keys per page) and DeleteObjects (at most 1000 keys)
+    def __init__(self, objects):
+        self.objects = dict(objects)  # key -> LastModified
+        self.deletes = []
+        self.meta = SimpleNamespace(client=self)
+
+    def get_paginator(self, operation):
+        assert operation == "list_objects_v2"
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        keys = sorted(key for key in self.objects if key.startswith(Prefix))
+        for start in range(0, len(keys), 1000):
+            yield {
+                "Contents": [
+                    {"Key": key, "LastModified": self.objects[key], "Size": 1024} for key in keys[start:start + 1000]
+                ]
+            }
+
+    def delete_objects(self, Bucket, Delete):
+        keys = [item["Key"] for item in Delete["Objects"]]
+        if len(keys) > 1000:
+            raise ValueError("DeleteObjects accepts at most 1000 keys")
+        self.deletes.append(keys)
+        for key in keys:
+            del self.objects[key]
+        return {}
+
+
+@override_settings(IMAGE_VARIANTS_MODE="off")
+class OrphanCollectionTests(TestCase):
+    def setUp(self):
+        self.old = timezone.now() - datetime.timedelta(days=3)
+        self.recent = timezone.now() - datetime.timedelta(minutes=5)
+        VentureImages.objects.create(
+            venture=make_venture(),
+            image="venture_images/kept.jpg",
+            image_variants=[{"name": "venture_images/kept__w320.webp", "width": 320, "format": "webp"}],
+        )
+        Ebook.objects.create(title="Ebook", file="ebooks/kept.pdf")
+
+    def run_gc(self, s3, *args):
+        stdout = io.StringIO()
+        with mock.patch.object(SharedS3Storage, "connection", new_callable=mock.PropertyMock, return_value=s3):
+            call_command("gc_s3_orphans", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_referenced_keys_include_variants(self):
+        keys = orphans.referenced_keys(shared_storage())
+
+        self.assertLessEqual({"venture_images/kept.jpg", "venture_images/kept__w320.webp", "ebooks/kept.pdf"}, keys)
+
+    def test_dry_run_lists_orphans_without_deleting(self):
+        s3 = StandInS3({"venture_images/kept.jpg": self.old, "venture_images/gone.jpg": self.old})
+
+        output = self.run_gc(s3, "--dry-run")
+
+        self.assertIn("venture_images/gone.jpg", output)
+        self.assertNotIn("venture_images/kept.jpg", output)
+        self.assertEqual(s3.deletes, [])
+        self.assertEqual(len(s3.objects), 2)
+
+    def test_deletes_only_old_unreferenced_objects(self):
+        s3 = StandInS3({
+            "venture_images/kept.jpg": self.old,
+            "venture_images/kept__w320.webp": self.old,
+            "ebooks/kept.pdf": self.old,
+            "venture_images/gone.jpg": self.old,
+            "site_images/gone__w640.avif": self.old,
+            # Possibly an upload whose row is not committed yet
+            "blog_articles/just-uploaded.jpg": self.recent,
+            # Outside the collected prefixes
+            "other/gone.jpg": self.old,
+        })
+
+        self.run_gc(s3)
+
+        self.assertEqual(
+            sorted(s3.objects),
+            [
+                "blog_articles/just-uploaded.jpg",
+                "ebooks/kept.pdf",
+                "other/gone.jpg",
+                "venture_images/kept.jpg",
+                "venture_images/kept__w320.webp",
+            ],
+        )
+
+        self.run_gc(s3, "--min-age", "0")
+        self.assertNotIn("blog_articles/just-uploaded.jpg", s3.objects)
+
+    def test_deletes_in_batches_of_at_most_1000_keys(self):
+        s3 = StandInS3({f"site_images/gone-{index:04}.jpg": self.old for index in range(2500)})
+
+        self.run_gc(s3, "--batch-size", "5000")
+
+        self.assertEqual([len(batch) for batch in s3.deletes], [1000, 1000, 500])
+        self.assertEqual(s3.objects, {})
+
+
+@override_settings(
+    CDN_PURGE_BACKEND="landingPgApp.cdn.LocMemPurgeBackend",
+    IMAGE_VARIANTS_MODE="off",
+)
+class CdnPurgeTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.venture = make_venture()
+        LocMemPurgeBackend.purged = []
+
+    def test_save_purges_the_page_tag_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            VentureHeroHighlight.objects.create(venture=self.venture, label="Suítes", info="3")
+            self.assertEqual(LocMemPurgeBackend.purged, [])
+
+        self.assertEqual(LocMemPurgeBackend.purged, [["venture:venture-0"]])
+
+    def test_one_purge_per_transaction(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            VentureHeroHighlight.objects.create(venture=self.venture, label="Suítes", info="3")
+            VentureAmenities.objects.create(venture=self.venture, icon="pool", value="Piscina")
+            BlogArticle.objects.create(title="Post", short_description="-", content="-", slug="post")
+
+        self.assertEqual(LocMemPurgeBackend.purged, [["blog", "blog-page", "home", "venture:venture-0"]])
+
+    @override_settings(CDN_PURGE_BATCH_SIZE=2)
+    def test_purges_are_batched(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.venture.name = "Renamed"
+            self.venture.save()
+
+        self.assertEqual(LocMemPurgeBackend.purged, [["home", "service-solicitation"], ["venture", "ventures"]])
+
+    def test_response_is_tagged_with_the_purged_keys(self):
+        response = self.client.get("/landing-api/venture/venture-0/")
+
+        self.assertEqual(response["Surrogate-Key"], "venture venture:venture-0")
+
+
+@offline_s3
+class DirectUploadContentTypeTests(TestCase):
+    def test_presigns_only_listed_image_types(self):
+        for content_type in direct_uploads.IMAGE_CONTENT_TYPES:
+            with self.subTest(content_type=content_type):
+                presigned = direct_uploads.presigned_post("siteimages", "photo.img", content_type)
+                self.assertTrue(presigned["key"].startswith("site_images/direct/"))
+                self.assertEqual(presigned["fields"]["Content-Type"], content_type)
+
+        for content_type in ("image/svg+xml", "image/x-icon", "text/html", "application/pdf"):
+            with self.subTest(content_type=content_type), self.assertRaises(ValidationError):
+                direct_uploads.presigned_post("siteimages", "photo.svg", content_type)
+
+    def test_rejects_uploaded_object_with_another_type(self):
+        head = {"ContentLength": 10, "ContentType": "image/svg+xml"}
+        with mock.patch.object(SharedS3Storage, "connection", new_callable=mock.PropertyMock) as connection:
+            connection.return_value.meta.client.head_object.return_value = head
+            with self.assertRaises(ValidationError):
+                direct_uploads.validate_uploaded_key(SiteImages, "image", "site_images/direct/abc.svg")
+
+            head["ContentType"] = "image/webp"
+            self.assertEqual(
+                direct_uploads.validate_uploaded_key(SiteImages, "image", "site_images/direct/abc.webp"),
+                "site_images/direct/abc.webp",
+            )
+
+
+@override_settings(
+    EMAIL_OUTBOX_SEND_ON_COMMIT=False,
+    EMAIL_RECIPIENT_LIST=["team@example.com"],
+    LANDING_API_THROTTLES={"send_email": {"ip": None, "global": None}},
+)
+class IdempotencyTests(TestCase):
+    url = "/landing-api/send-email/"
+
+    def post(self, data=None, **headers):
+        data = data or {"name": "Ana", "phone": "99", "message": "Olá"}
+        return self.client.post(self.url, data, content_type="application/json", headers=headers)
+
+    def test_repeated_key_replays_without_sending_again(self):
+        first = self.post(**{"Idempotency-Key": "abc"})
+        cache.clear()  # the store is the database, shared by every instance
+        second = self.post(**{"Idempotency-Key": "abc"})
+
+        self.assertEqual((first.status_code, second.status_code), (200, 200))
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+    def test_key_reused_with_another_body_is_rejected(self):
+        self.post(**{"Idempotency-Key": "abc"})
+        response = self.post({"name": "Bia", "message": "Outra"}, **{"Idempotency-Key": "abc"})
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+    def test_same_fields_without_key_replay(self):
+        self.post({"name": "Ana", "message": "Olá  mundo"})
+        response = self.post({"name": " ana ", "message": "olá mundo"})
+
+        self.assertEqual(response["Idempotent-Replayed"], "true")
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+    def test_in_progress_request_gets_409(self):
+        record = IdempotencyRecord.objects.create(
+            key=f"send_email:key:{idempotency._digest('abc')}",
+            fingerprint=idempotency.fingerprint(json.dumps({"name": "Ana", "phone": "99", "message": "Olá"}), EmailMessageForm),
+            expires_at=timezone.now() + datetime.timedelta(seconds=30),
+        )
+
+        response = self.post(**{"Idempotency-Key": "abc"})
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertTrue(IdempotencyRecord.objects.filter(pk=record.pk).exists())
+
+    def test_expired_record_is_claimed_again(self):
+        self.post(**{"Idempotency-Key": "abc"})
+        IdempotencyRecord.objects.update(expires_at=timezone.now() - datetime.timedelta(seconds=1))
+
+        response = self.post(**{"Idempotency-Key": "abc"})
+
+        self.assertFalse(response.has_header("Idempotent-Replayed"))
+        self.assertEqual(OutboxEmail.objects.count(), 2)
+        self.assertEqual(IdempotencyRecord.objects.count(), 1)
+
+    def test_rejected_request_is_not_stored(self):
+        response = self.post({"name": "", "message": ""}, **{"Idempotency-Key": "abc"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(IdempotencyRecord.objects.exists())
+
+    def test_record_released_during_claim_reads_as_in_progress(self):
+        with mock.patch.object(IdempotencyRecord.objects, "create", side_effect=IntegrityError):
+            record = idempotency.claim("send_email:key:x", "fingerprint", 30)
+
+        self.assertIsNone(record.status_code)
+        self.assertEqual(record.fingerprint, "fingerprint")
+
+
+@override_settings(EMAIL_OUTBOX_SEND_ON_COMMIT=False, EMAIL_RECIPIENT_LIST=["team@example.com"])
+class ThrottleTests(TestCase):
+    url = "/landing-api/send-email/"
+
+    def setUp(self):
+        cache.clear()
+        throttling.local_buckets.clear()
+        clock = mock.patch("landingPgApp.throttling.time.time", return_value=1000.0)
+        self.now = clock.start()
+        self.addCleanup(clock.stop)
+        self.sent = 0
+
+    def post(self, ip="203.0.113.1"):
+        # A different message each time, so idempotency never replays
+        self.sent += 1
+        data = {"name": "Ana", "phone": "99", "message": f"Mensagem {self.sent}"}
+        return self.client.post(self.url, data, content_type="application/json", headers={"X-Forwarded-For": ip})
+
+    @override_settings(LANDING_API_THROTTLES={"send_email": {"ip": "2/m", "global": None}})
+    def test_per_ip_burst_then_429_with_retry_after(self):
+        statuses = [self.post().status_code for _ in range(3)]
+        blocked = self.post()
+
+        self.assertEqual(statuses, [200, 200, 429])
+        self.assertEqual(blocked["Retry-After"], "30")
+        self.assertEqual(self.post(ip="203.0.113.2").status_code, 200)
+        self.assertEqual(OutboxEmail.objects.count(), 3)
+
+    @override_settings(LANDING_API_THROTTLES={"send_email": {"ip": "2/m", "global": None}})
+    def test_bucket_refills(self):
+        self.post(), self.post()
+        self.now.return_value += 30
+
+        self.assertEqual(self.post().status_code, 200)
+        self.assertEqual(self.post().status_code, 429)
+
+    @override_settings(LANDING_API_THROTTLES={"send_email": {"ip": None, "global": "2/h"}})
+    def test_global_bucket_is_shared_between_clients(self):
+        self.post(ip="203.0.113.1"), self.post(ip="203.0.113.2")
+        response = self.post(ip="203.0.113.3")
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "1800")
+
+    @override_settings(LANDING_API_THROTTLES={"send_email": {"ip": "1/m", "global": None}})
+    def test_unreachable_cache_falls_back_to_local_buckets(self):
+        with mock.patch.object(throttling, "_cache", side_effect=ConnectionError), self.assertLogs(
+            "landingPgApp.throttling", "WARNING"
+        ):
+            statuses = [self.post().status_code for _ in range(2)]
+
+        self.assertEqual(statuses, [200, 429])
+
+    @override_settings(DEBUG=False)
+    def test_check_flags_per_process_caches(self):
+        self.assertEqual([m.id for m in checks.check_throttle_cache(None)], ["landingPgApp.W001"])
+
+        dummy = {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+        with override_settings(CACHES={"default": dummy}):
+            self.assertEqual([m.id for m in checks.check_throttle_cache(None)], ["landingPgApp.E002"])
+
+        shared = {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "throttle"}
+        with override_settings(CACHES={"default": shared}):
+            self.assertEqual(checks.check_throttle_cache(None), [])
+
+
+def read_urlconf(read_views):
+    urlconf = ModuleType(f"test_urls_{read_views.__name__.rsplit('.', 1)[-1]}")
+    urlconf.urlpatterns = [path("landing-api/", include(read_urlpatterns(read_views)))]
+    return urlconf
+
+
+class AsyncViewParityTests(TransactionTestCase):
+    # The async views and payload builders duplicate the sync ones; these keep the
+    # two stacks from drifting apart. TransactionTestCase because the concurrent
+    # builds query from worker threads, each with its own connection.
+    urls = (
+        "/landing-api/venture/",
+        "/landing-api/venture/venture-0/",
+        "/landing-api/venture/missing/",
+        "/landing-api/about-us/",
+        "/landing-api/your-dreams/",
+        "/landing-api/blog/",
+        "/landing-api/blog/article/",
+        "/landing-api/home-page-info/",
+        "/landing-api/service-solicitation/",
+    )
+    headers = ("Content-Type", "ETag", "Cache-Control", "Surrogate-Key")
+
+    def setUp(self):
+        make_venture()
+        make_venture(1, status=VentureStatus.objects.create(name="Lançamento", order=1))
+        BlogArticle.objects.create(title="Artigo", short_description="-", content="<p>-</p>", slug="article")
+        ServiceSolicitationTerm.objects.create(description="Termo", text="<p>-</p>")
+
+    def reset(self):
+        # Keep the model versions: the validators derive from them, so both
+        # stacks must see the same ones to hand out the same ETag
+        versions = cache.get_many(
+            response_cache._version_key(model) for endpoint in ENDPOINTS.values() for model in endpoint.depends_on
+        )
+        PageSnapshot.objects.all().delete()
+        cache.clear()
+        cache.set_many(versions, timeout=None)
+        site_images.invalidate()
+
+    async def fetch(self, read_views, url):
+        # Built from scratch, then served from the response cache, then revalidated
+        await sync_to_async(self.reset)()
+        client = AsyncClient()
+        with override_settings(ROOT_URLCONF=read_urlconf(read_views)):
+            built = await client.get(url)
+            cached = await client.get(url)
+            revalidated = await client.get(url, headers={"If-None-Match": built.get("ETag", "")})
+        return built, cached, revalidated
+
+    async def test_async_views_answer_like_sync_views(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                sync_responses = await self.fetch(views, url)
+                async_responses = await self.fetch(async_views, url)
+
+                for sync_response, async_response in zip(sync_responses, async_responses):
+                    self.assertEqual(async_response.status_code, sync_response.status_code)
+                    self.assertEqual(async_response.content, sync_response.content)
+                    self.assertEqual(async_response.get("X-Cache"), sync_response.get("X-Cache"))
+                    for header in self.headers:
+                        self.assertEqual(async_response.get(header), sync_response.get(header), header)
+
+                built, cached, revalidated = async_responses
+                if built.status_code == 200:
+                    self.assertEqual((built["X-Cache"], cached["X-Cache"]), ("MISS", "HIT"))
+                    self.assertEqual(revalidated.status_code, 304)
+
+    async def test_concurrent_payload_builders_match_sequential_ones(self):
+        pairs = (
+            (serializers.your_dreams_payload, serializers.ayour_dreams_payload),
+            (serializers.home_page_payload, serializers.ahome_page_payload),
+            (serializers.service_solicitation_term_payload, serializers.aservice_solicitation_term_payload),
+        )
+        for build, abuild in pairs:
+            with self.subTest(build=build.__name__):
+                self.assertEqual(await abuild(), await sync_to_async(build)())
+
+
+@offline_s3
+class ImageVariantQueueTests(TestCase):
+    def setUp(self):
+        self.venture = make_venture()
+
+    def add_image(self, name="venture_images/a.jpg"):
+        return VentureImages.objects.create(venture=self.venture, image=name, order=1)
+
+    def test_save_only_queues_the_image(self):
+        with mock.patch.object(imaging, "generate_variants") as generate, self.captureOnCommitCallbacks(execute=True):
+            image = self.add_image()
+
+        generate.assert_not_called()
+        self.assertQuerySetEqual(
+            ImageVariantJob.objects.values_list("model_name", "object_id"), [("VentureImages", image.pk)]
+        )
+
+    def test_drain_renders_and_dequeues(self):
+        image = self.add_image()
+
+        with mock.patch.object(imaging, "generate_variants") as generate:
+            stats = imaging.drain()
+
+        generate.assert_called_once_with(VentureImages, image.pk)
+        self.assertEqual(stats, {"rendered": 1, "retried": 0, "failed": 0})
+        self.assertFalse(ImageVariantJob.objects.exists())
+
+    @override_settings(IMAGE_VARIANTS_MAX_ATTEMPTS=2)
+    def test_failures_back_off_then_give_up(self):
+        self.add_image()
+
+        with mock.patch.object(imaging, "generate_variants", side_effect=OSError("S3 down")), self.assertLogs(
+            "landingPgApp.imaging", "ERROR"
+        ):
+            first = imaging.drain()
+            ImageVariantJob.objects.update(next_attempt_at=timezone.now())
+            second = imaging.drain()
+            ImageVariantJob.objects.update(next_attempt_at=timezone.now())
+            third = imaging.drain()
+
+        self.assertEqual((first["retried"], second["failed"], third), (1, 1, {"rendered": 0, "retried": 0, "failed": 0}))
+        job = ImageVariantJob.objects.get()
+        self.assertEqual((job.attempts, job.last_error), (2, "OSError: S3 down"))
+
+    def test_image_replaced_while_rendering_stays_queued(self):
+        image = self.add_image()
+
+        def replace(model, pk):
+            image.image = "venture_images/b.jpg"
+            image.save()
+
+        with mock.patch.object(imaging, "generate_variants", side_effect=replace):
+            imaging.drain(max_seconds=0.0001)
+
+        self.assertEqual(ImageVariantJob.objects.get().attempts, 0)
+
+    def test_background_rendering_reuses_the_uploaded_bytes(self):
+        image = self.add_image()
+
+        storage = type(image.image.storage)
+        with mock.patch.object(storage, "open") as download:
+            loaded = imaging._load(VentureImages, image.pk, (image.image.name, b"uploaded"))
+        self.assertEqual(loaded[2], b"uploaded")
+        download.assert_not_called()
+
+        with mock.patch.object(storage, "open", return_value=io.BytesIO(b"stored")):
+            loaded = imaging._load(VentureImages, image.pk, ("venture_images/other.jpg", b"uploaded"))
+        self.assertEqual(loaded[2], b"stored")
+
+    def test_drain_endpoint(self):
+        self.add_image()
+        url = "/landing-api/image-variants/drain/"
+
+        with override_settings(IMAGE_VARIANTS_DRAIN_TOKEN=""):
+            self.assertEqual(self.client.get(url).status_code, 404)
+        with override_settings(IMAGE_VARIANTS_DRAIN_TOKEN="secret"), mock.patch.object(imaging, "generate_variants"):
+            self.assertEqual(self.client.get(url, headers={"Authorization": "Bearer wrong"}).status_code, 401)
+            response = self.client.get(url, headers={"Authorization": "Bearer secret"})
+
+        self.assertEqual(response.json()["rendered"], 1)
+
+
+@override_settings(IMAGE_VARIANTS_MODE="off")
+@offline_s3
+class VentureCoverSyncTests(TestCase):
+    def setUp(self):
+        self.venture = make_venture()
+        self.other = make_venture(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cover = VentureImages.objects.create(venture=self.venture, image="venture_images/cover.jpg", is_cover=True)
+
+    def cover_of(self, venture):
+        return Venture.objects.values_list("cover_image", flat=True).get(pk=venture.pk)
+
+    def test_saving_a_cover_sets_it(self):
+        self.assertEqual(self.cover_of(self.venture), "venture_images/cover.jpg")
+
+    def test_clearing_the_flag_clears_the_cover(self):
+        self.cover.is_cover = False
+        self.cover.save()
+
+        self.assertEqual(self.cover_of(self.venture), "")
+
+    def test_new_cover_replaces_the_old_one(self):
+        VentureImages.objects.create(venture=self.venture, image="venture_images/new.jpg", is_cover=True)
+
+        self.assertEqual(self.cover_of(self.venture), "venture_images/new.jpg")
+        self.cover.refresh_from_db()
+        self.assertFalse(self.cover.is_cover)
+
+    def test_deleting_the_cover_clears_it(self):
+        self.cover.delete()
+
+        self.assertEqual(self.cover_of(self.venture), "")
+
+    def test_moving_the_cover_updates_both_ventures_and_their_pages(self):
+        old_page = snapshots.get_body("venture_detail_page", self.venture.slug)
+        self.assertIn(b"cover.jpg", old_page)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cover.venture = self.other
+            self.cover.save()
+
+        self.assertEqual((self.cover_of(self.venture), self.cover_of(self.other)), ("", "venture_images/cover.jpg"))
+        stored = PageSnapshot.objects.get(pk=snapshots.snapshot_key("venture_detail_page", self.venture.slug))
+        self.assertNotIn(b"cover.jpg", bytes(stored.body))
+
+    def test_backfill_command_invalidates_the_pages(self):
+        Venture.objects.update(cover_image="")
+
+        with mock.patch("landingPgApp.management.commands.backfill_venture_covers.content_changed") as changed:
+            call_command("backfill_venture_covers", stdout=io.StringIO())
+
+        self.assertEqual(self.cover_of(self.venture), "venture_images/cover.jpg")
+        changed.assert_called_once_with(Venture, None)
+
+    def test_migration_backfills_existing_ventures(self):
+        from django.apps import apps
+
+        Venture.objects.update(cover_image="")
+        snapshots.get_body("ventures_page")
+        migration = importlib.import_module("landingPgApp.migrations.0034_backfill_venture_covers")
+
+        migration.backfill_covers(apps, None)
+
+        self.assertEqual(self.cover_of(self.venture), "venture_images/cover.jpg")
+        self.assertFalse(PageSnapshot.objects.exists())
+
+
+def image_upload(name, size=(40, 30)):
+    content = io.BytesIO()
+    Image.new("RGB", size, "white").save(content, "PNG")
+    return SimpleUploadedFile(name, content.getvalue(), content_type="image/png")
+
+
+def stored_as_named(storage, name, content, max_length=None):
+    return name
+
+
+@override_settings(IMAGE_VARIANTS_MODE="queue")
+class BulkUploadTests(TestCase):
+    def setUp(self):
+        self.venture = make_venture()
+        VentureImages.objects.create(venture=self.venture, image="venture_images/existing.jpg", order=1)
+        ImageVariantJob.objects.all().delete()
+        self.url = f"/admin/landingPgApp/venture/{self.venture.pk}/bulk-upload/"
+        self.keys = ["venture_images/direct/a.jpg", "venture_images/direct/b.jpg"]
+
+    def login(self):
+        user = get_user_model().objects.create_superuser("admin", "admin@example.com", "secret")
+        self.client.force_login(user)
+
+    def test_uploads_append_to_the_gallery_and_queue_one_batch(self):
+        files = [image_upload(f"photo-{index}.png") for index in range(3)]
+
+        with mock.patch.object(SharedS3Storage, "save", autospec=True, side_effect=stored_as_named) as save, \
+                mock.patch.object(imaging, "enqueue", wraps=imaging.enqueue) as enqueue:
+            created = bulk_upload.upload_gallery(self.venture, files, is_high_light=True)
+
+        self.assertEqual(save.call_count, 3)
+        self.assertEqual([image.order for image in created], [2, 3, 4])
+        self.assertEqual(len({image.image.name for image in created}), 3)
+        self.assertEqual(created[0].image_metadata["width"], 40)
+        self.assertTrue(all(image.is_high_light for image in created))
+        enqueue.assert_called_once()
+        self.assertEqual(ImageVariantJob.objects.count(), 3)
+
+    def test_direct_upload_keys_are_not_uploaded_again(self):
+        with mock.patch.object(SharedS3Storage, "save") as save:
+            created = bulk_upload.upload_gallery(self.venture, self.keys)
+
+        save.assert_not_called()
+        self.assertEqual([image.image.name for image in created], self.keys)
+        self.assertEqual(ImageVariantJob.objects.count(), 2)
+
+    @override_settings(DIRECT_UPLOADS=True)
+    def test_form_takes_validated_keys_when_direct_uploads_are_on(self):
+        with mock.patch.object(direct_uploads, "validate_uploaded_key", side_effect=lambda model, field, key: key):
+            form = VentureBulkUploadForm(MultiValueDict({"files__key": self.keys}), venture=self.venture)
+            self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data["files"], self.keys)
+
+        form = VentureBulkUploadForm(MultiValueDict({"files__key": ["ebooks/other.pdf"]}), venture=self.venture)
+        self.assertFalse(form.is_valid())
+
+    def test_form_requires_images(self):
+        form = VentureBulkUploadForm(
+            {}, MultiValueDict({"files": [SimpleUploadedFile("notes.txt", b"text")]}), venture=self.venture
+        )
+
+        self.assertFalse(form.is_valid())
+        self.assertIn("files", form.errors)
+
+    def test_view_uploads_through_the_request(self):
+        self.login()
+
+        with mock.patch.object(SharedS3Storage, "save", autospec=True, side_effect=stored_as_named):
+            response = self.client.post(self.url, {"files": [image_upload("a.png"), image_upload("b.png")]})
+
+        self.assertRedirects(
+            response, f"/admin/landingPgApp/venture/{self.venture.pk}/change/", fetch_redirect_response=False
+        )
+        self.assertEqual(self.venture.images.count(), 3)
+
+    @override_settings(DIRECT_UPLOADS=True)
+    def test_view_takes_direct_upload_keys(self):
+        self.login()
+        page = self.client.get(self.url)
+        self.assertContains(page, "landingPgApp/direct_upload.js")
+        self.assertContains(page, 'data-name="files__key"')
+
+        with mock.patch.object(direct_uploads, "validate_uploaded_key", side_effect=lambda model, field, key: key), \
+                mock.patch.object(SharedS3Storage, "save") as save:
+            response = self.client.post(self.url, {"files__key": self.keys})
+
+        self.assertEqual(response.status_code, 302)
+        save.assert_not_called()
+        self.assertEqual(
+            list(self.venture.images.order_by("order").values_list("image", flat=True)),
+            ["venture_images/existing.jpg", *self.keys],
+        )
+
+
+@offline_s3
+@override_settings(IMAGE_VARIANTS_MODE="off")
+class GalleryOrderTests(TestCase):
+    def setUp(self):
+        self.venture = make_venture()
+        self.url = f"/admin/landingPgApp/venture/{self.venture.pk}/reorder-images/"
+
+    def add_images(self, count, venture=None):
+        return VentureImages.objects.bulk_create(
+            VentureImages(venture=venture or self.venture, image=f"venture_images/{index}.jpg", order=index + 1)
+            for index in range(count)
+        )
+
+    def orders(self):
+        return list(VentureImages.objects.filter(venture=self.venture).order_by("order").values_list("image", "order"))
+
+    def insert_at_two(self):
+        with CaptureQueriesContext(connection) as captured:
+            VentureImages.objects.create(venture=self.venture, image="venture_images/new.jpg", order=2)
+        table = VentureImages._meta.db_table
+        updates = [query["sql"] for query in captured.captured_queries if query["sql"].startswith(f'UPDATE "{table}"')]
+        return len(captured.captured_queries), updates
+
+    def test_insert_at_an_occupied_order_shifts_the_rest_in_one_update(self):
+        self.add_images(3)
+        small, updates = self.insert_at_two()
+
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            self.orders(),
+            [("venture_images/0.jpg", 1), ("venture_images/new.jpg", 2), ("venture_images/1.jpg", 3), ("venture_images/2.jpg", 4)],
+        )
+
+        # The same queries whatever the gallery size
+        VentureImages.objects.all().delete()
+        self.add_images(30)
+        large, _ = self.insert_at_two()
+        self.assertEqual(large, small)
+
+    def test_apply_order_persists_only_the_moved_rows(self):
+        images = self.add_images(3)
+
+        changed = VentureImages.apply_order(self.venture.pk, [images[2].pk, images[1].pk, images[0].pk])
+
+        self.assertEqual(sorted(image.pk for image in changed), sorted([images[0].pk, images[2].pk]))
+        self.assertEqual(self.orders(), [("venture_images/2.jpg", 1), ("venture_images/1.jpg", 2), ("venture_images/0.jpg", 3)])
+
+    def test_reorder_endpoint_rejects_foreign_and_missing_ids(self):
+        images = self.add_images(2)
+        foreign = self.add_images(1, venture=make_venture(1))[0]
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "secret"))
+
+        for ids in ([images[0].pk], [images[0].pk, images[1].pk, foreign.pk], [images[0].pk, foreign.pk], [images[0].pk, images[0].pk]):
+            with self.subTest(ids=ids):
+                response = self.client.post(self.url, {"ids": ids}, content_type="application/json")
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.orders(), [("venture_images/0.jpg", 1), ("venture_images/1.jpg", 2)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {"ids": [images[1].pk, images[0].pk]}, content_type="application/json")
+        self.assertEqual(response.json(), {"updated": 2})
+        self.assertEqual(self.orders(), [("venture_images/1.jpg", 1), ("venture_images/0.jpg", 2)])
+
+
+class ResponseCacheTests(TestCase):
+    url = "/landing-api/venture/"
+
+    def setUp(self):
+        cache.clear()
+        response_cache.reset_stats()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.venture = make_venture(status=VentureStatus.objects.create(name="Lançamento"))
+
+    def test_hit_after_miss_and_stats(self):
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+
+        self.assertEqual((first["X-Cache"], second["X-Cache"]), ("MISS", "HIT"))
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(response_cache.stats()["ventures_page"], {"hits": 1, "stale": 0, "misses": 1})
+
+        response_cache.reset_stats()
+        self.assertEqual(response_cache.stats(), {})
+
+    def test_save_bumps_the_version_after_commit(self):
+        self.client.get(self.url)
+        key = response_cache.response_key("ventures_page")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.venture.name = "Renomeado"
+            self.venture.save()
+            # Not before commit: a concurrent request would cache the old rows under the new key
+            self.assertEqual(response_cache.response_key("ventures_page"), key)
+
+        self.assertNotEqual(response_cache.response_key("ventures_page"), key)
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertIn(b"Renomeado", response.content)
+
+    def test_unrelated_model_keeps_the_entry(self):
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ServiceSolicitationTerm.objects.create(description="Termo", text="<p>-</p>")
+
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "HIT")
+
+    def test_cache_hits_and_revalidations_run_no_queries(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.assertNumQueries(0):
+            hit = self.client.get(self.url)
+            not_modified = self.client.get(self.url, headers={"If-None-Match": etag})
+
+        self.assertEqual((hit["X-Cache"], hit["ETag"]), ("HIT", etag))
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_validators_follow_the_model_versions(self):
+        first = self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.venture.save()
+
+        second = self.client.get(self.url, headers={"If-None-Match": first["ETag"]})
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second["ETag"], first["ETag"])
+        self.assertGreaterEqual(parse_http_date(second["Last-Modified"]), parse_http_date(first["Last-Modified"]))
+
+    def test_evicted_version_is_reseeded_with_a_new_value(self):
+        key = response_cache.response_key("ventures_page")
+        cache.delete(response_cache._version_key(Venture))
+
+        self.assertNotEqual(response_cache.response_key("ventures_page"), key)
+
+    @override_settings(DEBUG=False)
+    def test_check_flags_a_per_process_cache(self):
+        self.assertEqual([m.id for m in checks.check_response_cache(None)], ["landingPgApp.W002"])
+
+        shared = {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "responses"}
+        with override_settings(CACHES={"default": shared}):
+            self.assertEqual(checks.check_response_cache(None), [])
+
+
+@offline_s3
+class PageSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.venture = make_venture(status=VentureStatus.objects.create(name="Lançamento"))
+
+    def stored(self, endpoint_name, slug=""):
+        return bytes(PageSnapshot.objects.get(pk=snapshots.snapshot_key(endpoint_name, slug)).body)
+
+    def test_save_rebuilds_the_pages_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.venture.name = "Renomeado"
+            self.venture.save()
+            self.assertNotIn(b"Renomeado", self.stored("ventures_page"))
+
+        self.assertIn(b"Renomeado", self.stored("ventures_page"))
+        self.assertIn(b"Renomeado", self.stored("venture_detail_page", self.venture.slug))
+
+    def test_deleting_a_venture_drops_its_page(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.venture.delete()
+
+        self.assertFalse(PageSnapshot.objects.filter(endpoint="venture_detail_page").exists())
+        self.assertNotIn(b"Venture 0", self.stored("ventures_page"))
+
+    def test_failed_endpoint_rebuild_keeps_every_previous_page(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            make_venture(1, status=self.venture.status)
+        before = dict(PageSnapshot.objects.filter(endpoint="venture_detail_page").values_list("slug", "body"))
+        Venture.objects.update(name="Renomeado")
+
+        # The first page renders, the second fails: the first must not be swapped in alone
+        render, rendered = snapshots.render, []
+
+        def render_once(endpoint_name, slug=""):
+            if rendered:
+                raise RuntimeError("S3 down")
+            rendered.append(slug)
+            return render(endpoint_name, slug)
+
+        with mock.patch.object(snapshots, "render", side_effect=render_once), self.assertRaises(RuntimeError):
+            snapshots.rebuild_endpoint("venture_detail_page")
+
+        after = dict(PageSnapshot.objects.filter(endpoint="venture_detail_page").values_list("slug", "body"))
+        self.assertEqual({slug: bytes(body) for slug, body in after.items()}, {slug: bytes(body) for slug, body in before.items()})
+
+    def test_endpoint_rebuild_drops_removed_slugs(self):
+        PageSnapshot.objects.create(
+            key=snapshots.snapshot_key("venture_detail_page", "gone"), endpoint="venture_detail_page", slug="gone", body=b"{}"
+        )
+
+        snapshots.rebuild_endpoint("venture_detail_page")
+
+        self.assertQuerySetEqual(
+            PageSnapshot.objects.filter(endpoint="venture_detail_page").values_list("slug", flat=True), [self.venture.slug]
+        )
+
+    @override_settings(PAGE_SNAPSHOT_MAX_AGE=60)
+    def test_expired_snapshot_is_rebuilt_on_read(self):
+        snapshot = PageSnapshot.objects.filter(pk=snapshots.snapshot_key("ventures_page"))
+
+        snapshot.update(body=b"old", updated_at=timezone.now() - datetime.timedelta(seconds=30))
+        self.assertEqual(snapshots.get_body("ventures_page"), b"old")
+
+        snapshot.update(body=b"old", updated_at=timezone.now() - datetime.timedelta(seconds=90))
+        body = snapshots.get_body("ventures_page")
+        self.assertIn(b"Venture 0", body)
+        self.assertEqual(self.stored("ventures_page"), body)
+
+    def test_unknown_slug_is_answered_from_the_cache(self):
+        url = "/landing-api/venture/missing/"
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_venture(1, slug="missing", status=self.venture.status)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_suggestions_are_the_newest_other_articles(self):
+        for index in range(5):
+            article = BlogArticle.objects.create(title=f"Artigo {index}", short_description="-", content="-", slug=f"article-{index}")
+            BlogArticle.objects.filter(pk=article.pk).update(created_at=timezone.now() - datetime.timedelta(days=index))
+
+        payload = serializers.blog_article_payload("article-2")
+
+        self.assertEqual([suggested["slug"] for suggested in payload["suggested_articles"]], ["article-0", "article-1", "article-3"])
+
+
+class SingleFlightTests(TestCase):
+    # A stand-in view, so only the cache decides who rebuilds
+    threads = 6
+
+    def setUp(self):
+        cache.clear()
+        self.calls = []
+        self.request = RequestFactory().get("/landing-api/venture/")
+
+        @response_cache.cached_endpoint("ventures_page")
+        def view(request):
+            self.calls.append(threading.get_ident())
+            time.sleep(0.2)
+            return HttpResponse(b"fresh", content_type="application/json")
+
+        self.view = view
+        self.key = response_cache.response_key("ventures_page")
+
+    def hold_lock(self):
+        cache.add(f"{self.key}:lock", 1, 30)
+
+    def test_concurrent_misses_rebuild_once(self):
+        barrier = threading.Barrier(self.threads)
+        responses = []
+
+        def worker():
+            barrier.wait()
+            responses.append(self.view(self.request))
+
+        workers = [threading.Thread(target=worker) for _ in range(self.threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual([response.content for response in responses], [b"fresh"] * self.threads)
+        self.assertEqual(sorted(response["X-Cache"] for response in responses), ["HIT"] * (self.threads - 1) + ["MISS"])
+
+    def test_stale_body_is_served_while_another_worker_rebuilds(self):
+        cache.set(self.key, (b"old", "application/json", time.time() - 1), 60)
+        self.hold_lock()
+
+        response = self.view(self.request)
+
+        self.assertEqual((response.content, response["X-Cache"]), (b"old", "STALE"))
+        self.assertEqual(self.calls, [])
+
+    @override_settings(LANDING_API_CACHE_LOCK_WAIT=0.2)
+    def test_waiter_rebuilds_itself_after_the_timeout(self):
+        self.hold_lock()
+
+        started = time.monotonic()
+        response = self.view(self.request)
+
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+        self.assertEqual((response.content, response["X-Cache"]), (b"fresh", "MISS"))
+        self.assertEqual(len(self.calls), 1)
+
+
+class ExportTests(TestCase):
+    columns = (("id", "ID"), ("created_at", "Data"), ("name", "Nome"), ("phone", "Telefone"), ("message", "Mensagem"))
+
+    def setUp(self):
+        self.messages = [
+            ContactMessage.objects.create(name="=HYPERLINK(\"http://evil\")", phone="+55 (11) 99999-0000", message="@SUM(A1)"),
+            ContactMessage.objects.create(name="Ana", phone="=cmd|' /C calc'!A0", message="-1+1"),
+            ContactMessage.objects.create(name="Bia", phone="", message="Olá\nmundo"),
+        ]
+
+    def export_csv(self, **options):
+        return exports.csv_response(ContactMessage.objects.order_by("id"), self.columns, "mensagens", **options)
+
+    def body(self, response):
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_streams_in_chunks_and_escapes_formulas(self):
+        # The header, then one block per two rows
+        self.assertEqual(len(list(self.export_csv(chunk_size=2, phone_fields=("phone",)).streaming_content)), 3)
+        response = self.export_csv(chunk_size=2, phone_fields=("phone",))
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="mensagens.csv"')
+        rows = list(csv.reader(io.StringIO(self.body(response).lstrip("﻿"))))
+
+        self.assertEqual(rows[0], ["ID", "Data", "Nome", "Telefone", "Mensagem"])
+        self.assertEqual(
+            [row[2:] for row in rows[1:]],
+            [
+                ["'=HYPERLINK(\"http://evil\")", "+55 (11) 99999-0000", "'@SUM(A1)"],
+                ["Ana", "'=cmd|' /C calc'!A0", "'-1+1"],
+                ["Bia", "", "Olá\nmundo"],
+            ],
+        )
+        self.assertEqual(rows[1][1], timezone.localtime(self.messages[0].created_at).isoformat())
+
+    def test_phone_numbers_are_escaped_outside_phone_columns(self):
+        rows = list(csv.reader(io.StringIO(self.body(self.export_csv()))))
+
+        self.assertEqual(rows[1][3], "'+55 (11) 99999-0000")
+
+    def test_jsonl_keeps_values_verbatim(self):
+        response = exports.jsonl_response(ContactMessage.objects.order_by("id"), self.columns, "mensagens", chunk_size=2)
+
+        records = [json.loads(line) for line in self.body(response).splitlines()]
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="mensagens.jsonl"')
+        self.assertEqual([record["message"] for record in records], ["@SUM(A1)", "-1+1", "Olá\nmundo"])
+        self.assertEqual(records[0]["id"], self.messages[0].pk)
+
+    def test_admin_action_exports_the_selection(self):
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "secret"))
+
+        response = self.client.post(
+            "/admin/landingPgApp/contactmessage/",
+            {"action": "export_csv", "_selected_action": [self.messages[0].pk, self.messages[2].pk]},
+        )
+
+        phones = {row[0]: row[3] for row in csv.reader(io.StringIO(self.body(response).lstrip("﻿")))}
+        self.assertEqual(phones, {"ID": "Telefone", str(self.messages[0].pk): "+55 (11) 99999-0000", str(self.messages[2].pk): ""})
+
+
+class ContentAddressedStorageTests(TestCase):
+    digest = "ab" * 32
+
+    def setUp(self):
+        self.venture = make_venture()
+        self.storage = shared_storage()
+
+    def upload_name(self, filename):
+        instance = VentureImages(venture=self.venture)
+        instance.image = image_upload(filename)
+        return instance._meta.get_field("image").generate_filename(instance, filename)
+
+    def test_uploads_are_named_after_their_bytes(self):
+        digest = hashlib.sha256(image_upload("probe.png").read()).hexdigest()
+
+        with override_settings(CONTENT_ADDRESSED_UPLOADS=True):
+            self.assertEqual(
+                [self.upload_name("a.PNG"), self.upload_name("b.png")], [f"venture_images/{digest}.png"] * 2
+            )
+        self.assertNotIn(digest, self.upload_name("a.png"))
+
+    def test_save_reuses_an_existing_object(self):
+        name = f"venture_images/{self.digest}.png"
+
+        with mock.patch.object(SharedS3Storage, "exists", return_value=True), \
+                mock.patch.object(S3Storage, "_save", return_value=name) as upload:
+            self.assertEqual(self.storage._save(name, ContentFile(b"-")), name)
+            upload.assert_not_called()
+
+            # Variants (re-rendered when their settings change) and plain names are always written
+            for other in (f"venture_images/{self.digest}__w320.webp", "venture_images/1-venture/20260101_000000_1.png"):
+                self.storage._save(other, ContentFile(b"-"))
+            self.assertEqual(upload.call_count, 2)
+
+        with mock.patch.object(SharedS3Storage, "exists", return_value=False), \
+                mock.patch.object(S3Storage, "_save", return_value=name) as upload:
+            self.storage._save(name, ContentFile(b"-"))
+        upload.assert_called_once()
+
+    def test_originals_and_their_variants_are_cached_as_immutable(self):
+        for name, immutable in (
+            (f"venture_images/{self.digest}.png", True),
+            (imaging.variant_name(f"venture_images/{self.digest}.png", 320, "webp"), True),
+            ("venture_images/1-venture/20260101_000000_1.png", False),
+            ("venture_images/1-venture/20260101_000000_1__w320.webp", False),
+        ):
+            with self.subTest(name=name):
+                cache_control = self.storage.get_object_parameters(name).get("CacheControl")
+                self.assertEqual(cache_control == IMMUTABLE_CACHE_CONTROL, immutable)
+
+
+@offline_s3
+@override_settings(IMAGE_VARIANTS_MODE="off")
+class SiteImagesResolverTests(TestCase):
+    def setUp(self):
+        site_images.invalidate()
+
+    def test_resolver_is_dropped_after_commit_before_the_pages_rebuild(self):
+        self.assertIsNone(site_images.get_page_images("home")["desktop"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image = SiteImages.objects.create(image="site_images/hero.jpg", page="home", is_desktop=True)
+            # Still the committed state: a concurrent read must not cache this transaction's rows
+            self.assertIsNone(site_images.get_page_images("home")["desktop"])
+
+        self.assertEqual(site_images.get_page_images("home")["desktop"], image)
+        stored = PageSnapshot.objects.get(pk=snapshots.snapshot_key("home_page_info"))
+        self.assertIn(b"site_images/hero.jpg", bytes(stored.body))
+
+    def test_rolled_back_change_keeps_the_resolver(self):
+        site_images.get_page_images("home")
+
+        with mock.patch.object(site_images, "_load_pages", wraps=site_images._load_pages) as load:
+            with self.captureOnCommitCallbacks(execute=False):
+                SiteImages.objects.create(image="site_images/hero.jpg", page="home", is_desktop=True)
+            site_images.get_page_images("home")
+
+        load.assert_not_called()
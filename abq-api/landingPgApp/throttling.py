@@ -0,0 +1,156 @@
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import JsonResponse
+
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "landing-api:throttle"
+PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+
+def parse_rate(rate):
+    # "5/m", "100/h", "5/10m": N requests per period, which is also the burst size
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d*)\s*([smhd])\s*", rate)
+    if not match:
+        raise ValueError(f"Invalid rate {rate!r}")
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * PERIODS[unit]
+
+
+def take(state, capacity, period, now):
+    # Token bucket: refill capacity/period tokens per second, spend one per request.
+    # Returns (allowed, new state, seconds until a token is available).
+    tokens, updated = state or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * capacity / period)
+    if tokens >= 1:
+        return True, (tokens - 1, now), 0
+    return False, (tokens, now), math.ceil((1 - tokens) * period / capacity)
+
+
+class LocalBuckets:
+    # Used while the shared cache is unreachable: per process, so limits loosen
+    # by the number of workers, but a bot still can't go unthrottled.
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def take(self, key, capacity, period, now):
+        with self._lock:
+            state = self._buckets.pop(key, None)
+            allowed, state, retry_after = take(state, capacity, period, now)
+            self._buckets[key] = state
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+            return allowed, retry_after
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+local_buckets = LocalBuckets()
+_last_cache_warning = 0
+_warned_per_process = False
+
+
+def _cache():
+    return caches[getattr(settings, "LANDING_API_THROTTLE_CACHE_ALIAS", "default")]
+
+
+def is_per_process(cache):
+    # LocMem keeps one bucket per process (and Dummy none at all), so the global
+    # limit would be multiplied by the number of instances
+    return isinstance(cache, (LocMemCache, DummyCache))
+
+
+def _warn_if_per_process(cache):
+    # System checks don't run on serverless deploys, so say it in the logs too
+    global _warned_per_process
+    if not _warned_per_process and not settings.DEBUG and is_per_process(cache):
+        _warned_per_process = True
+        logger.warning(
+            "Throttle cache %r is per process: limits are not shared between instances",
+            getattr(settings, "LANDING_API_THROTTLE_CACHE_ALIAS", "default"),
+        )
+
+
+def _take(key, capacity, period):
+    now = time.time()
+    try:
+        cache = _cache()
+        _warn_if_per_process(cache)
+        # Not atomic: concurrent requests can overshoot by a few tokens, which is
+        # fine for abuse control. An idle bucket expires once it would be full again.
+        allowed, state, retry_after = take(cache.get(key), capacity, period, now)
+        cache.set(key, state, period)
+        return allowed, retry_after
+    except Exception:
+        global _last_cache_warning
+        if now - _last_cache_warning > 60:
+            # Once a minute, not once per request, while the cache is down
+            _last_cache_warning = now
+            logger.warning("Throttle cache unavailable, using in-process buckets", exc_info=True)
+        return local_buckets.take(key, capacity, period, now)
+
+
+def client_ip(request):
+    # LANDING_API_CLIENT_IP_HEADER names the META key the proxy sets (e.g.
+    # HTTP_X_FORWARDED_FOR). Its rightmost entry is the one our proxy appended;
+    # anything to the left came from the client.
+    header = getattr(settings, "LANDING_API_CLIENT_IP_HEADER", "")
+    forwarded = request.META.get(header, "") if header else ""
+    if forwarded:
+        return forwarded.split(",")[-1].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def _rates(endpoint_name, per_ip, global_rate):
+    # LANDING_API_THROTTLES = {"<endpoint>": {"ip": "5/m", "global": "100/h"}}; None disables a scope
+    rates = {"ip": per_ip, "global": global_rate}
+    rates.update(getattr(settings, "LANDING_API_THROTTLES", {}).get(endpoint_name, {}))
+    return rates
+
+
+def _too_many_requests(retry_after):
+    response = JsonResponse({"error": "Too many requests, please try again later"}, status=429)
+    response["Retry-After"] = str(max(1, retry_after))
+    return response
+
+
+def throttled_endpoint(endpoint_name, per_ip=None, global_rate=None, methods=("POST",)):
+    # The per-IP bucket is checked first, so one client hitting its own limit
+    # does not spend the global budget shared by everyone else.
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return view(request, *args, **kwargs)
+
+            rates = _rates(endpoint_name, per_ip, global_rate)
+            scopes = (
+                ("ip", f"{KEY_PREFIX}:{endpoint_name}:ip:{client_ip(request)}"),
+                ("global", f"{KEY_PREFIX}:{endpoint_name}:global"),
+            )
+            for scope, key in scopes:
+                if rates.get(scope):
+                    allowed, retry_after = _take(key, *parse_rate(rates[scope]))
+                    if not allowed:
+                        return _too_many_requests(retry_after)
+            return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -1,29 +1,39 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 
-urlpatterns = [
+
+def read_urlpatterns(read_views):
+    # The GET endpoints, from either views or async_views
+    return [
+        path("venture/<slug:slug>/", read_views.Venture_detail_page, name="venture_detail_page"),
+        path("venture/<slug:slug>",read_views.Venture_detail_page,name="venture_detail_page_no_slash"),
+        path("venture/", read_views.Ventures_page, name="ventures_page"),
+        path("venture", read_views.Ventures_page, name="ventures_page_no_slash"),
+        path("blog/", read_views.BlogPage_details, name="blog_page_details"),
+        path("blog", read_views.BlogPage_details, name="blog_page_details_no_slash"),
+        path("blog/<slug:slug>/", read_views.BlogArticle_details, name="blog_article_detail_page"),
+        path("blog/<slug:slug>", read_views.BlogArticle_details, name="blog_article_detail_page_no_slash"),
+        path("home-page-info/", read_views.Home_page_info, name="home_page_info"),
+        path("home-page-info", read_views.Home_page_info, name="home_page_info_no_slash"),
+        path("about-us/", read_views.About_us_page, name="about_us_page"),
+        path("about-us", read_views.About_us_page, name="about_us_page_no_slash"),
+        path("your-dreams/", read_views.Your_dreams_page, name="your_dreams_page"),
+        path("your-dreams", read_views.Your_dreams_page, name="your_dreams_page_no_slash"),
+        path("service-solicitation/", read_views.service_solicitation_term, name="service_solicitation_term"),
+        path("service-solicitation", read_views.service_solicitation_term, name="service_solicitation_term_no_slash"),
+    ]
+
+
+urlpatterns = read_urlpatterns(async_views if settings.LANDING_API_ASYNC_VIEWS else views) + [
     # path('', views.index, name='index'),
     # path('<int:question_id>/', views.detail, name='detail'),
     # path('<int:question_id>/results/', views.results, name='results'),
     # path('<int:question_id>/vote/', views.vote, name='vote'),
-    path("venture/<slug:slug>/", views.Venture_detail_page, name="venture_detail_page"),
-    path("venture/<slug:slug>",views.Venture_detail_page,name="venture_detail_page_no_slash"),
-    path("venture/", views.Ventures_page, name="ventures_page"),
-    path("venture", views.Ventures_page, name="ventures_page_no_slash"),
-    path("blog/", views.BlogPage_details, name="blog_page_details"),
-    path("blog", views.BlogPage_details, name="blog_page_details_no_slash"),
-    path("blog/<slug:slug>/", views.BlogArticle_details, name="blog_article_detail_page"),
-    path("blog/<slug:slug>", views.BlogArticle_details, name="blog_article_detail_page_no_slash"),
-    path("home-page-info/", views.Home_page_info, name="home_page_info"),
-    path("home-page-info", views.Home_page_info, name="home_page_info_no_slash"),
-    path("about-us/", views.About_us_page, name="about_us_page"),
-    path("about-us", views.About_us_page, name="about_us_page_no_slash"),
-    path("your-dreams/", views.Your_dreams_page, name="your_dreams_page"),
-    path("your-dreams", views.Your_dreams_page, name="your_dreams_page_no_slash"),
     path("send-email/", views.send_message_email, name="send_email"),
     path("send-email", views.send_message_email, name="send_email_no_slash"),
-    path("service-solicitation/", views.service_solicitation_term, name="service_solicitation_term"),
-    path("service-solicitation", views.service_solicitation_term, name="service_solicitation_term_no_slash"),
     path("send-service-solicitation/", views.send_service_solicitation_email, name="send_service_solicitation_email"),
     path("send-service-solicitation", views.send_service_solicitation_email, name="send_service_solicitation_email_no_slash"),
+    path("outbox/drain/", views.drain_outbox, name="drain_outbox"),
+    path("image-variants/drain/", views.drain_image_variants, name="drain_image_variants"),
 ]
@@ -1,309 +1,75 @@
+import hmac
 import json
 import os
+from functools import wraps
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
 
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.core.mail import send_mail
+from django.http import Http404, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 
-from .models import BlogArticle, Ebook, InstructionalVideo, ServiceSolicitationTerm, SiteImages, Venture, VentureStatus
+from . import imaging, outbox
+from .cdn import cdn_cache_endpoint
+from .conditional import conditional_endpoint
 from .forms import EmailMessageForm, EmailServiceSolicitationForm
+from .idempotency import idempotent_endpoint
+from .models import ContactMessage, ServiceSolicitation, Venture
+from .response_cache import cached_endpoint
+from .snapshots import snapshot_response
+from .throttling import throttled_endpoint
 
 
+@cdn_cache_endpoint("ventures_page")
+@conditional_endpoint("ventures_page")
+@cached_endpoint("ventures_page", stale_while_revalidate=300)
 def Ventures_page(request):
-    ventures = Venture.objects.filter(is_visible=True)
-    statuses = VentureStatus.objects.filter(ventures__in=ventures, is_visible=True).distinct()
-
-    ventures_page_desktop_cover_image = SiteImages.objects.filter(page="ventures", is_active=True, is_desktop=True).first()
-    ventures_page_mobile_cover_image = SiteImages.objects.filter(page="ventures", is_active=True, is_mobile=True).first()
-
-    data = {
-        "statuses": [
-            {
-                "id": status.id,
-                "name": status.name,
-                "ventures": [
-                    {
-                        "id": venture.id,
-                        "name": venture.name,
-                        "slug": venture.slug,
-                        "short_description": venture.short_description,
-                        "location": venture.location,
-                        "total_units": venture.total_units,
-                        "hero_image_url": (
-                            image.image.url
-                            if (image := venture.images.filter(is_cover=True).first())
-                            else None
-                        ),
-                    }
-                    for venture in ventures.filter(status=status)
-                ],
-            }
-            for status in statuses
-        ],
-        "desktop_cover_image_url": ventures_page_desktop_cover_image.image.url if ventures_page_desktop_cover_image else None,
-        "mobile_cover_image_url": ventures_page_mobile_cover_image.image.url if ventures_page_mobile_cover_image else None,
-    }
-
-    return JsonResponse(data)
+    return snapshot_response("ventures_page")
 
 
+@cdn_cache_endpoint("venture_detail_page")
+@conditional_endpoint("venture_detail_page")
+@cached_endpoint("venture_detail_page")
 def Venture_detail_page(request, slug):
-    venture = get_object_or_404(Venture, slug=slug)
-
-    venturePageInfo = {
-        "slug": venture.slug,
-        "name": venture.name,
-        "subtitle": venture.short_description,
-        "heroImage": venture.images.filter(is_cover=True).first().image.url,
-        "heroHighLights": [
-            {"label": h.label, "info": h.info} for h in venture.hero_highlights.all()
-        ],
-        "breadcrumb": [
-            {"label": "Empreendimentos", "url": "/nossas-obras/"},
-            {"label": venture.name, "url": f"/nossas-obras/{venture.slug}/"},
-        ],
-        "location": venture.location,
-        "unitsCount": venture.total_units,
-        "status": venture.status.name if venture.status else None,
-        "lastUnits": venture.is_last_units,
-        "amenities": [
-            {"label": amenity.icon, "value": amenity.value, "span": amenity.span}
-            for amenity in venture.amenities.all()
-        ],
-        "floorPlans": [
-            {
-                "id": fp.id,
-                "name": fp.name,
-                "descriptionList": fp.descriptionList,
-                "images": [
-                    {
-                        "is_highlight": img.is_high_light,
-                        "url": img.image.url,
-                        "unit": img.floorPlan.name if img.floorPlan else None,
-                        "area": img.area.name if img.area else None,
-                    }
-                    for img in fp.images.all()
-                ],
-            }
-            for fp in venture.floor_plans.all()
-        ],
-        "areas": [area.name for area in venture.areas.all()],
-        "ytVideoId": venture.yt_video_id if venture.yt_video_id else None,
-        "galeries": {
-            "highlighted": [
-                {
-                    "is_highlight": img.is_high_light,
-                    "url": img.image.url,
-                    "unit": img.floorPlan.name if img.floorPlan else None,
-                    "area": img.area.name if img.area else None,
-                }
-                for img in venture.images.filter(is_high_light=True)
-            ],
-            "units": [
-                {
-                    "id": fp.id,
-                    "name": fp.name,
-                    "images": [
-                        {
-                            "is_highlight": img.is_high_light,
-                            "url": img.image.url,
-                            "unit": img.floorPlan.name if img.floorPlan else None,
-                            "area": img.area.name if img.area else None,
-                        }
-                        for img in fp.images.all()
-                    ],
-                }
-                for fp in venture.floor_plans.all()
-            ],
-            "areas": [
-                {
-                    "id": area.id,
-                    "name": area.name,
-                    "images": [
-                        {
-                            "is_highlight": img.is_high_light,
-                            "url": img.image.url,
-                            "unit": img.floorPlan.name if img.floorPlan else None,
-                            "area": img.area.name if img.area else None,
-                        }
-                        for img in area.images.all()
-                    ],
-                }
-                for area in venture.areas.all()
-            ],
-        },
-    }
-
-    return JsonResponse(venturePageInfo)
+    return snapshot_response("venture_detail_page", slug)
 
+@cdn_cache_endpoint("about_us_page")
+@conditional_endpoint("about_us_page")
+@cached_endpoint("about_us_page")
 def About_us_page(request):
-    about_us_desktop_cover_image = SiteImages.objects.filter(page="about_us", is_active=True, is_desktop=True).first()
-    about_us_mobile_cover_image = SiteImages.objects.filter(page="about_us", is_active=True, is_mobile=True).first()
-
-    data = {
-        "desktop_cover_image_url": about_us_desktop_cover_image.image.url if about_us_desktop_cover_image else None,
-        "mobile_cover_image_url": about_us_mobile_cover_image.image.url if about_us_mobile_cover_image else None,
-    }
-    return JsonResponse(data)
+    return snapshot_response("about_us_page")
 
+@cdn_cache_endpoint("your_dreams_page")
+@conditional_endpoint("your_dreams_page")
+@cached_endpoint("your_dreams_page")
 def Your_dreams_page(request):
-    your_dreams_desktop_cover_image = SiteImages.objects.filter(page="your_dreams", is_active=True, is_desktop=True).first()
-    your_dreams_mobile_cover_image = SiteImages.objects.filter(page="your_dreams", is_active=True, is_mobile=True).first()
-
-    instructional_videos = InstructionalVideo.objects.filter(is_active=True).order_by("-updated_at")
-    ebook = Ebook.objects.filter(is_active=True).order_by("-updated_at").first()
-
-    data = {
-        "desktop_cover_image_url": your_dreams_desktop_cover_image.image.url if your_dreams_desktop_cover_image else None,
-        "mobile_cover_image_url": your_dreams_mobile_cover_image.image.url if your_dreams_mobile_cover_image else None,
-        "instructional_videos": [
-            {
-                "id": video.id,
-                "title": video.title,
-                "video_url": video.video_url,
-                "cover_image_url": video.cover_image.url if video.cover_image else None,
-                "created_at": video.created_at.isoformat() if video.created_at else None,
-                "updated_at": video.updated_at.isoformat() if video.updated_at else None,
-            }
-            for video in instructional_videos
-        ],
-        "ebook_url": ebook.file.url if ebook and ebook.file else None,
-
-    }
-    return JsonResponse(data)
+    return snapshot_response("your_dreams_page")
 
 
+@cdn_cache_endpoint("blog_page_details")
+@conditional_endpoint("blog_page_details")
+@cached_endpoint("blog_page_details")
 def BlogPage_details(request):
-    blogArticles = BlogArticle.objects.filter(is_active=True).order_by("-created_at")
-    data = {"highlighted_articles": [], "regular_articles": []}
-
-    blog_page_desktop_cover_image = SiteImages.objects.filter(page="blog", is_active=True, is_desktop=True).first()
-    blog_page_mobile_cover_image = SiteImages.objects.filter(page="blog", is_active=True, is_mobile=True).first()
-
-    for article in blogArticles:
-        articleData = {
-            "id": article.id,
-            "title": article.title,
-            "slug": article.slug,
-            "tag": article.tag.name if article.tag else None,
-            "short_description": article.short_description,
-            "cover_image_url": article.cover_image.url if article.cover_image else None,
-            # "content": article.content,
-            "created_at": (
-                article.created_at.isoformat() if article.created_at else None
-            ),
-        }
-        if article.is_highlight:
-            data["highlighted_articles"].append(articleData)
-        else:
-            data["regular_articles"].append(articleData)
-
-    data["desktop_cover_image_url"] = blog_page_desktop_cover_image.image.url if blog_page_desktop_cover_image else None
-    data["mobile_cover_image_url"] = blog_page_mobile_cover_image.image.url if blog_page_mobile_cover_image else None
-
-    return JsonResponse(data)
+    return snapshot_response("blog_page_details")
 
 
+@cdn_cache_endpoint("blog_article_details")
+@conditional_endpoint("blog_article_details")
+@cached_endpoint("blog_article_details")
 def BlogArticle_details(request, slug):
-    article = get_object_or_404(BlogArticle, slug=slug, is_active=True)
-    suggested_articles = (
-        BlogArticle.objects.filter(is_active=True)
-        .exclude(id=article.id)
-        .order_by("?")[:3]
-    )
-
-    response = {"article": {}, "suggested_articles": []}
-    response["article"] = {
-        "id": article.id,
-        "title": article.title,
-        "slug": article.slug,
-        "tag": article.tag.name if article.tag else None,
-        "short_description": article.short_description,
-        "cover_image_url": article.cover_image.url if article.cover_image else None,
-        "content": article.content,
-        "created_at": article.created_at.isoformat() if article.created_at else None,
-    }
-    response["suggested_articles"] = [
-        {
-            "id": suggested.id,
-            "title": suggested.title,
-            "slug": suggested.slug,
-            "short_description": suggested.short_description,
-            "cover_image_url": (
-                suggested.cover_image.url if suggested.cover_image else None
-            ),
-        }
-        for suggested in suggested_articles
-    ]
-
-    return JsonResponse(response)
+    return snapshot_response("blog_article_details", slug)
 
 
+@cdn_cache_endpoint("home_page_info")
+@conditional_endpoint("home_page_info")
+@cached_endpoint("home_page_info", stale_while_revalidate=300)
 def Home_page_info(request):
-    home_page_ventures = Venture.objects.filter(
-        homepage_highlight=True, is_visible=True
-    ).order_by("-created_at")
-    home_page_articles = BlogArticle.objects.filter(is_active=True).order_by(
-        "-created_at"
-    )[:3]
-    
-    home_page_desktop_cover_image = SiteImages.objects.filter(page="home", is_active=True, is_desktop=True).first()
-    home_page_mobile_cover_image = SiteImages.objects.filter(page="home", is_active=True, is_mobile=True).first()
-    
-    instructional_videos = InstructionalVideo.objects.filter(is_active=True).order_by("-updated_at")
-    ebook = Ebook.objects.filter(is_active=True).order_by("-updated_at").first()
-
-    data = {
-        "home_page_ventures": [
-            {
-                "id": venture.id,
-                "name": venture.name,
-                "slug": venture.slug,
-                "short_description": venture.short_description,
-                "location": venture.location,
-                "status": venture.status.name if venture.status else None,
-                "total_units": venture.total_units,
-                "hero_image_url": (
-                    image.image.url
-                    if (image := venture.images.filter(is_cover=True).first())
-                    else None
-                ),
-            }
-            for venture in home_page_ventures
-        ],
-        "home_page_articles": [
-            {
-                "id": article.id,
-                "title": article.title,
-                "slug": article.slug,
-                "short_description": article.short_description,
-                "cover_image_url": (
-                    article.cover_image.url if article.cover_image else None
-                ),
-            }
-            for article in home_page_articles
-        ],
-        "desktop_cover_image_url": home_page_desktop_cover_image.image.url if home_page_desktop_cover_image else None,
-        "mobile_cover_image_url": home_page_mobile_cover_image.image.url if home_page_mobile_cover_image else None,
-        "instructional_videos": [
-            {
-                "id": video.id,
-                "title": video.title,
-                "video_url": video.video_url,
-                "cover_image_url": video.cover_image.url if video.cover_image else None,
-                "created_at": video.created_at.isoformat() if video.created_at else None,
-                "updated_at": video.updated_at.isoformat() if video.updated_at else None,
-            }
-            for video in instructional_videos
-        ],
-            "ebook_url": ebook.file.url if ebook and ebook.file else None,
-    }
-    return JsonResponse(data)
+    return snapshot_response("home_page_info")
 
 
 @csrf_exempt
+@throttled_endpoint("send_email", per_ip="5/10m", global_rate="120/h")
+@idempotent_endpoint("send_email", EmailMessageForm)
 def send_message_email(request):
     if request.method == "POST":
         try:
@@ -317,17 +83,19 @@ def send_message_email(request):
             phone = form.cleaned_data["phone"]
             message = form.cleaned_data["message"]
 
-            send_mail(
-                subject=f"[CONTATO VIA SITE] Mensagem de {name}",
-                message=f"Nome: {name}\nTelefone: {phone}\nMensagem: {message}",
-                from_email=f"Contato via Site - Albuquerque Engenharia <{settings.EMAIL_HOST_USER}>",
-                recipient_list=settings.EMAIL_RECIPIENT_LIST,
-                html_message=(
-                    f"<strong>Nome:</strong> {name}<br>"
-                    f"<strong>Telefone:</strong> {phone}<br>"
-                    f"<strong>Mensagem:</strong> {message}"
-                ),
-            )
+            with transaction.atomic():
+                notification = outbox.enqueue(
+                    subject=f"[CONTATO VIA SITE] Mensagem de {name}",
+                    message=f"Nome: {name}\nTelefone: {phone}\nMensagem: {message}",
+                    from_email=f"Contato via Site - Albuquerque Engenharia <{settings.EMAIL_HOST_USER}>",
+                    recipient_list=settings.EMAIL_RECIPIENT_LIST,
+                    html_message=(
+                        f"<strong>Nome:</strong> {name}<br>"
+                        f"<strong>Telefone:</strong> {phone}<br>"
+                        f"<strong>Mensagem:</strong> {message}"
+                    ),
+                )
+                ContactMessage.objects.create(name=name, phone=phone, message=message, outbox_email=notification)
 
             return JsonResponse({"success": "Message sent successfully"})
         else:
@@ -341,26 +109,18 @@ def send_message_email(request):
     )
 
 
+@cdn_cache_endpoint("service_solicitation_term")
+@conditional_endpoint("service_solicitation_term")
+@cached_endpoint("service_solicitation_term")
 def service_solicitation_term(request):
-    term = ServiceSolicitationTerm.objects.filter(is_active=True).first()
-    ventures = Venture.objects.filter(accepts_service_solicitation=True).order_by('created_at')
-
-    service_solicitation_page_desktop_cover_image = SiteImages.objects.filter(page="service_solicitation", is_active=True, is_desktop=True).first()
-    service_solicitation_page_mobile_cover_image = SiteImages.objects.filter(page="service_solicitation", is_active=True, is_mobile=True).first()
-
-    if term is None:
+    try:
+        return snapshot_response("service_solicitation_term")
+    except Http404:
         return JsonResponse({"error": "No active term found"}, status=404)
-    
-    data = {
-        "desktop_cover_image_url": service_solicitation_page_desktop_cover_image.image.url if service_solicitation_page_desktop_cover_image else None,
-        "mobile_cover_image_url": service_solicitation_page_mobile_cover_image.image.url if service_solicitation_page_mobile_cover_image else None,
-        "terms_text": term.text,
-        "ventures": [{"id": venture.id, "name": venture.name} for venture in ventures],
-    }
-
-    return JsonResponse(data=data)
 
 @csrf_exempt
+@throttled_endpoint("send_service_solicitation", per_ip="5/10m", global_rate="120/h")
+@idempotent_endpoint("send_service_solicitation", EmailServiceSolicitationForm)
 def send_service_solicitation_email(request):
     if request.method == 'POST':
         try:
@@ -379,47 +139,60 @@ def send_service_solicitation_email(request):
             description = form.cleaned_data["description"]
             accepted_terms = form.cleaned_data["accepted_terms"]
 
-            send_mail(
-                subject=f"Nova solicitação de serviço para empreendimento {venture}",
-                message=(
-                    f"Olá!\n\n"
-                    f"Você recebeu uma nova solicitação de serviço pelo site. Veja os detalhes abaixo:\n\n"
-                    f"  Empreendimento: {venture}\n"
-                    f"  Unidade: {unit}\n\n"
-                    f"  Nome: {name}\n"
-                    f"  Documento (CPF/CNPJ): {document}\n"
-                    f"  Telefone: {phone}\n"
-                    f"  E-mail: {email}\n\n"
-                    f"  Descrição do serviço solicitado:\n"
-                    f"  {description}\n\n"
-                    f"  Aceitou os termos: {'Sim' if accepted_terms else 'Não'}\n\n"
-                    f"Entre em contato com o cliente o quanto antes!\n\n"
-                    f"— Sistema de solicitações Albuquerque Engenharia"
-                ),
-                from_email=f"Solicitação de Serviço via Site - Albuquerque Engenharia <{settings.EMAIL_HOST_USER}>",
-                recipient_list=settings.EMAIL_RECIPIENT_LIST,
-                html_message=(
-                    f"<p>Olá!</p>"
-                    f"<p>Você recebeu uma nova solicitação de serviço pelo site. Veja os detalhes abaixo:</p>"
-                    f"<p>"
-                    f"<strong>Empreendimento:</strong> {venture}<br>"
-                    f"<strong>Unidade:</strong> {unit}"
-                    f"</p>"
-                    f"<p>"
-                    f"<strong>Nome:</strong> {name}<br>"
-                    f"<strong>Documento (CPF/CNPJ):</strong> {document}<br>"
-                    f"<strong>Telefone:</strong> {phone}<br>"
-                    f"<strong>E-mail:</strong> {email}"
-                    f"</p>"
-                    f"<p>"
-                    f"<strong>Descrição do serviço solicitado:</strong><br>"
-                    f"{description}"
-                    f"</p>"
-                    f"<p><strong>Aceitou os termos:</strong> {'Sim' if accepted_terms else 'Não'}</p>"
-                    f"<p>Entre em contato com o cliente o quanto antes!</p>"
-                    f"<p>— Sistema de solicitações Albuquerque Engenharia</p>"
-                ),
-            )
+            with transaction.atomic():
+                notification = outbox.enqueue(
+                    subject=f"Nova solicitação de serviço para empreendimento {venture}",
+                    message=(
+                        f"Olá!\n\n"
+                        f"Você recebeu uma nova solicitação de serviço pelo site. Veja os detalhes abaixo:\n\n"
+                        f"  Empreendimento: {venture}\n"
+                        f"  Unidade: {unit}\n\n"
+                        f"  Nome: {name}\n"
+                        f"  Documento (CPF/CNPJ): {document}\n"
+                        f"  Telefone: {phone}\n"
+                        f"  E-mail: {email}\n\n"
+                        f"  Descrição do serviço solicitado:\n"
+                        f"  {description}\n\n"
+                        f"  Aceitou os termos: {'Sim' if accepted_terms else 'Não'}\n\n"
+                        f"Entre em contato com o cliente o quanto antes!\n\n"
+                        f"— Sistema de solicitações Albuquerque Engenharia"
+                    ),
+                    from_email=f"Solicitação de Serviço via Site - Albuquerque Engenharia <{settings.EMAIL_HOST_USER}>",
+                    recipient_list=settings.EMAIL_RECIPIENT_LIST,
+                    html_message=(
+                        f"<p>Olá!</p>"
+                        f"<p>Você recebeu uma nova solicitação de serviço pelo site. Veja os detalhes abaixo:</p>"
+                        f"<p>"
+                        f"<strong>Empreendimento:</strong> {venture}<br>"
+                        f"<strong>Unidade:</strong> {unit}"
+                        f"</p>"
+                        f"<p>"
+                        f"<strong>Nome:</strong> {name}<br>"
+                        f"<strong>Documento (CPF/CNPJ):</strong> {document}<br>"
+                        f"<strong>Telefone:</strong> {phone}<br>"
+                        f"<strong>E-mail:</strong> {email}"
+                        f"</p>"
+                        f"<p>"
+                        f"<strong>Descrição do serviço solicitado:</strong><br>"
+                        f"{description}"
+                        f"</p>"
+                        f"<p><strong>Aceitou os termos:</strong> {'Sim' if accepted_terms else 'Não'}</p>"
+                        f"<p>Entre em contato com o cliente o quanto antes!</p>"
+                        f"<p>— Sistema de solicitações Albuquerque Engenharia</p>"
+                    ),
+                )
+                ServiceSolicitation.objects.create(
+                    venture=Venture.objects.filter(Q(slug=venture) | Q(name__iexact=venture)).first() if venture else None,
+                    venture_name=venture,
+                    unit=unit,
+                    name=name,
+                    document=document,
+                    phone=phone,
+                    email=email,
+                    description=description,
+                    accepted_terms=accepted_terms,
+                    outbox_email=notification,
+                )
 
             return JsonResponse({"success": "Service solicitation sent successfully"})
         else:
@@ -431,3 +204,37 @@ def send_service_solicitation_email(request):
         {"error": "Invalid request method, this endpoint only accepts POST requests"},
         status=405,
     )
+
+
+def cron_endpoint(token_setting):
+    # Vercel cron calls these with "Authorization: Bearer <CRON_SECRET>"; there is
+    # no worker process between requests. Disabled (404) while no token is set.
+    def decorator(view):
+        @csrf_exempt
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            token = getattr(settings, token_setting, "")
+            if not token:
+                raise Http404
+            supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+            if not hmac.compare_digest(supplied.encode(), token.encode()):
+                return JsonResponse({"error": "Unauthorized"}, status=401)
+            if request.method not in ("GET", "POST"):
+                return JsonResponse({"error": "Invalid request method"}, status=405)
+            return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@cron_endpoint("EMAIL_OUTBOX_DRAIN_TOKEN")
+def drain_outbox(request):
+    # One claim per call keeps the request well inside the function timeout
+    return JsonResponse(outbox.drain(max_batches=1))
+
+
+@cron_endpoint("IMAGE_VARIANTS_DRAIN_TOKEN")
+def drain_image_variants(request):
+    # Renders for at most IMAGE_VARIANTS_DRAIN_SECONDS, then leaves the rest to the next call
+    return JsonResponse(imaging.drain(max_seconds=settings.IMAGE_VARIANTS_DRAIN_SECONDS))